@@ -1,10 +1,12 @@
 import argparse
 import json
+import multiprocessing
 import os.path
 import fileinput
 import shutil
 import sys
 import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
 
 from quisby import util
@@ -85,9 +87,14 @@ from quisby.benchmarks.speccpu.comparison import compare_speccpu_results
 
 from quisby.benchmarks.etcd.etcd import extract_etcd_data, create_summary_etcd_data, graph_etcd_data, compare_etcd_results
 
-from quisby.util import read_config, write_config
-from quisby.sheet.sheet_util import clear_sheet_charts, clear_sheet_data, get_sheet, create_sheet, append_to_sheet, create_spreadsheet, permit_users
+from quisby.benchmarks import extract_cache
+from quisby.pricing import price_cache
+from quisby.pricing.catalog import import_catalog
+from quisby.pricing.cloud_pricing import remember_instances, resolve_instances
+from quisby.util import get_config, read_config, write_config
+from quisby.sheet.sheet_util import get_sheet_titles, get_spreadsheet_title, prefetch_sheets, replace_sheet_contents, create_spreadsheet, permit_users
 from quisby import custom_logger
+from quisby.logging_configure.custom_logging import log_to_queue, queue_listener
 
 
 def check_test_is_hammerdb(test_name):
@@ -116,12 +123,8 @@ def process_results(results, test_name, cloud_type, os_type, os_release, spreads
 
     # Append data
     try:
-        create_sheet(spreadsheetid, test_name)
-        custom_logger.info("Deleting existing charts and data from the sheet...")
-        clear_sheet_charts(spreadsheetid, test_name)
-        clear_sheet_data(spreadsheetid, test_name)
-        custom_logger.info("Appending new " + test_name + " data to sheet...")
-        append_to_sheet(spreadsheetid, results, test_name)
+        custom_logger.info("Replacing existing charts and data in the sheet...")
+        replace_sheet_contents(spreadsheetid, test_name, results)
     except Exception as exc:
         custom_logger.error(str(exc))
         custom_logger.error("Failed to append data to sheet")
@@ -159,16 +162,162 @@ def register_details_json(spreadsheet_name, spreadsheet_id):
     custom_logger.info({spreadsheet_name: spreadsheet_id})
 
 
+# Benchmarks whose extractors or summaries call get_cloud_pricing or
+# get_cloud_cpu_count; hammerdb variants are matched by check_test_is_hammerdb
+PRICED_TESTS = ("coremark", "coremark_pro", "linpack", "passmark", "phoronix", "pig", "pyperf", "speccpu",
+                "specjbb", "streams")
+
+
+def read_manifest(lines, test_path, proc_list, exclude_list):
+    """
+    Result files listed in the results location file for the tests to be processed.
+
+    :return: list of (test_name, [(path, system_name), ...]) in file order,
+             and list of (test_name, line, error) for lines that could not be read
+    """
+    manifest = []
+    errors = []
+    selected = False
+    for data in lines:
+        if "test " in data:
+            test_name = data.replace("test ", "").strip()
+            selected = test_name in proc_list or proc_list == [] and test_name not in exclude_list
+            if selected:
+                manifest.append((test_name, []))
+        elif "new_series" in data or not selected:
+            continue
+        else:
+            try:
+                if test_name == "fio_run":
+                    data = data.strip("\n").strip("'").strip()
+                else:
+                    data = data.strip("\n").strip("'")
+                path, system_name = data.split(",")
+                manifest[-1][1].append((test_path + "/" + path.strip(), system_name.strip()))
+            except Exception as exc:
+                custom_logger.error(str(exc))
+                errors.append((test_name, data.strip(), str(exc)))
+    return manifest, errors
+
+
+def uses_pricing(test_name):
+    """Whether the results of test_name are priced or need vCPU counts"""
+    return test_name in PRICED_TESTS or check_test_is_hammerdb(test_name)
+
+
+def extract_result(test_name, path, system_name, os_release, source="results"):
+    """
+    Extract one result file.
+
+    :return: rows to add to the results of test_name
+    """
+    custom_logger.debug(path)
+    if test_name == "streams":
+        ret_val = extract_streams_data(path, system_name, os_release)
+    elif test_name == "uperf":
+        ret_val = extract_uperf_data(path, system_name)
+    elif test_name == "linpack":
+        ret_val = extract_linpack_data(path, system_name)
+    elif test_name == "specjbb":
+        ret_value = extract_specjbb_data(path, system_name, os_release)
+        return [ret_value] if ret_value is not None else []
+    elif test_name == "pig":
+        ret_val = extract_pig_data(path, system_name, os_release)
+    elif check_test_is_hammerdb(test_name):
+        ret_val = extract_hammerdb_data(path, system_name, test_name, os_release)
+    elif test_name == "fio_run":
+        ret_val = None
+        if source == "results":
+            ret_val = extract_fio_run_data(path, system_name, os_release)
+        elif source == "pbench":
+            ret_val = process_fio_run_result(path, system_name)
+    elif test_name == "boot":
+        ret_val = extract_boot_data(path, system_name)
+    elif test_name == "aim":
+        ret_val = extract_aim_data(path, system_name)
+    elif test_name == "auto_hpl":
+        ret_val = extract_auto_hpl_data(path, system_name)
+    elif test_name == "speccpu":
+        ret_val = extract_speccpu_data(path, system_name, os_release)
+    elif test_name == "etcd":
+        ret_val = extract_etcd_data(path, system_name)
+    elif test_name == "coremark":
+        ret_val = extract_coremark_data(path, system_name, os_release)
+    elif test_name == "coremark_pro":
+        ret_val = extract_coremark_pro_data(path, system_name, os_release)
+    elif test_name == "passmark":
+        ret_val = extract_passmark_data(path, system_name, os_release)
+    elif test_name == "pyperf":
+        ret_val = extract_pyperf_data(path, system_name, os_release)
+    elif test_name == "phoronix":
+        ret_val = extract_phoronix_data(path, system_name, os_release)
+    else:
+        custom_logger.info("Mentioned benchmark not yet supported ! ")
+        return []
+    return ret_val if ret_val else []
+
+
+def _init_extract_worker(log_queue, config_location, refresh_prices, offline_prices, use_extract_cache, prices):
+    # Worker processes start from scratch: they need the options set from
+    # the command line and the prices resolved by the parent, and log
+    # through it
+    log_to_queue(log_queue)
+    util.config_location = config_location
+    price_cache.refresh = refresh_prices
+    price_cache.offline = offline_prices
+    extract_cache.enabled = use_extract_cache
+    if prices:
+        remember_instances(*prices)
+
+
+def _extract_job(job):
+    """
+    Run extract_result for a (test_name, path, system_name, os_release) job,
+    reusing the rows cached for an unchanged file, returning (rows, error)
+    """
+    try:
+        return extract_cache.cached_extract(extract_result, *job), None
+    except Exception as exc:
+        return [], f"{type(exc).__name__}: {exc}"
+
+
+def extract_results(extract_jobs, jobs=1, prices=None):
+    """
+    Extract result files, on a pool of worker processes when jobs > 1.
+
+    Workers are spawned rather than forked, so they share no lock or
+    thread state with the parent, and get the prices it resolved through
+    the pool initializer. Their log records are written by the parent.
+
+    :extract_jobs: list of (test_name, path, system_name, os_release)
+    :prices: (instances, region, cloud_type, os_type), instances as
+             returned by resolve_instances
+    :return: list of (rows, error) in the order of extract_jobs, error is
+             None for files extracted without an exception
+    """
+    if jobs > 1 and len(extract_jobs) > 1:
+        custom_logger.info("Extracting " + str(len(extract_jobs)) + " result files with " + str(jobs) + " parallel jobs...")
+        context = multiprocessing.get_context("spawn")
+        log_queue = context.Queue()
+        listener = queue_listener(log_queue)
+        listener.start()
+        try:
+            with ProcessPoolExecutor(max_workers=jobs, mp_context=context, initializer=_init_extract_worker,
+                                     initargs=(log_queue, util.config_location, price_cache.refresh,
+                                               price_cache.offline, extract_cache.enabled, prices)) as executor:
+                return list(executor.map(_extract_job, extract_jobs,
+                                         chunksize=max(1, len(extract_jobs) // (jobs * 4))))
+        finally:
+            listener.stop()
+    return [_extract_job(job) for job in extract_jobs]
+
+
 # TODO: simplify functions once data location is exact
-def data_handler(proc_list, noti_flag, exclude_list):
+def data_handler(proc_list, noti_flag, exclude_list, jobs=1):
     """"""
-    global test_name
-    global source
-    global count
-    results = []
-
     custom_logger.info("Loading configurations...")
     cloud_type = read_config('cloud', 'cloud_type')
+    region = get_config().get('cloud', 'region', None)
     os_type = read_config('test', 'OS_TYPE')
     os_release = read_config('test', 'OS_RELEASE')
     spreadsheet_name = read_config('spreadsheet', 'spreadsheet_name')
@@ -202,130 +351,75 @@ def data_handler(proc_list, noti_flag, exclude_list):
 
     with open(results_path) as file:
         custom_logger.info("Reading data files path provided in file : " + results_path)
-        test_result_path = file.readlines()
-        flag = False
-        test_name = ""
-        for data in test_result_path:
-            if "test " in data:
-                flag = False
-                if results:
-                    spreadsheetid = process_results(results, test_name, cloud_type, os_type, os_release, spreadsheet_name, spreadsheetid)
-                results = []
-                test_name = data.replace("test ", "").strip()
-                source = "results"
-                if test_name in proc_list or proc_list == [] and test_name not in exclude_list:
-                    flag = True
-                    custom_logger.info(
-                        "********************** Extracting and preprocessing " + str(test_name) + " data "
-                                                                                                  "**********************")
-
-            elif "new_series" in data:
-                continue
+        manifest, errors = read_manifest(file.readlines(), test_path, proc_list, exclude_list)
+
+    # Warms the price and vCPU count memos of this process, see resolve_instances;
+    # extraction workers get the table
+    prices = None
+    priced_instances = [system_name for test_name, entries in manifest if uses_pricing(test_name)
+                        for _, system_name in entries]
+    if priced_instances and region:
+        try:
+            prices = (resolve_instances(priced_instances, region, cloud_type.lower(), os_type),
+                      region, cloud_type.lower(), os_type)
+        except Exception as exc:
+            custom_logger.debug(str(exc))
+            custom_logger.warning("Unable to resolve instance prices up front, fetching them per instance")
+
+    extract_jobs = [(test_name, path, system_name, os_release)
+                    for test_name, entries in manifest for path, system_name in entries]
+    outcomes = iter(extract_results(extract_jobs, jobs, prices))
+
+    for test_name, entries in manifest:
+        custom_logger.info(
+            "********************** Extracting and preprocessing " + str(test_name) + " data "
+                                                                                      "**********************")
+        results = []
+        for path, system_name in entries:
+            rows, error = next(outcomes)
+            if error:
+                custom_logger.error("Unable to extract " + path + ": " + error)
+                errors.append((test_name, path, error))
             else:
-                try:
-                    if test_name == "fio_run":
-                        data = data.strip("\n").strip("'").strip()
-                        path, system_name = data.split(",")
-                    else:
-                        data = data.strip("\n").strip("'")
-                        path, system_name = data.split(",")
-                    path = test_path + "/" + path.strip()
-                    custom_logger.debug(path)
-                    if test_name == "streams" and flag == True:
-                        ret_val = extract_streams_data(path, system_name, os_release)
-                        if ret_val:
-                            results += ret_val
-                    elif test_name == "uperf" and flag == True:
-                        ret_val = extract_uperf_data(path, system_name)
-                        if ret_val:
-                            results += ret_val
-                    elif test_name == "linpack" and flag == True:
-                        ret_val = extract_linpack_data(path, system_name)
-                        if ret_val:
-                            results += ret_val
-                    elif test_name == "specjbb" and flag == True:
-                        ret_value = extract_specjbb_data(path, system_name, os_release)
-                        if ret_value is not None:
-                            results.append(ret_value)
-                    elif test_name == "pig" and flag == True:
-                        ret_val = extract_pig_data(path, system_name, os_release)
-                        if ret_val:
-                            results += ret_val
-                    elif check_test_is_hammerdb(test_name) and flag == True:
-                        ret_val = extract_hammerdb_data(path, system_name, test_name, os_release)
-                        if ret_val:
-                            results += ret_val
-                    elif test_name == "fio_run" and flag == True:
-                        ret_val = None
-                        if source == "results":
-                            ret_val = extract_fio_run_data(path, system_name, os_release)
-                        elif source == "pbench":
-                            ret_val = process_fio_run_result(path, system_name)
-                        if ret_val:
-                            results += ret_val
-                    elif test_name == "boot" and flag == True:
-                        ret_val = extract_boot_data(path, system_name)
-                        if ret_val:
-                            results += ret_val
-                    elif test_name == "aim" and flag == True:
-                        ret_val = extract_aim_data(path, system_name)
-                        if ret_val:
-                            results += ret_val
-                    elif test_name == "auto_hpl" and flag == True:
-                        ret_val= extract_auto_hpl_data(path, system_name)
-                        if ret_val:
-                            results += ret_val
-                    elif test_name == "speccpu" and flag == True:
-                        ret_val = extract_speccpu_data(path, system_name, os_release)
-                        if ret_val:
-                            results += ret_val
-                    elif test_name == "etcd" and flag == True:
-                        ret_val = extract_etcd_data(path, system_name)
-                        if ret_val:
-                            results += ret_val
-                    elif test_name == "coremark" and flag == True:
-                        ret_val = extract_coremark_data(path, system_name, os_release)
-                        if ret_val:
-                            results += ret_val
-                    elif test_name == "coremark_pro" and flag == True:
-                        ret_val = extract_coremark_pro_data(path, system_name, os_release)
-                        if ret_val:
-                            results += ret_val
-                    elif test_name == "passmark" and flag == True:
-                        ret_val = extract_passmark_data(path, system_name, os_release)
-                        if ret_val:
-                            results += ret_val
-                    elif test_name == "pyperf" and flag == True:
-                        ret_val = extract_pyperf_data(path, system_name, os_release)
-                        if ret_val:
-                            results += ret_val
-                    elif test_name == "phoronix" and flag == True:
-                        ret_val= extract_phoronix_data(path, system_name, os_release)
-                        if ret_val:
-                            results += ret_val
-                    else:
-                        if flag == False:
-                            pass
-                        else:
-                            custom_logger.info("Mentioned benchmark not yet supported ! ")
-
-                except Exception as exc:
-                    custom_logger.error(str(exc))
-        if results == []:
-            custom_logger.info(f"https://docs.google.com/spreadsheets/d/{spreadsheetid}")
-            register_details_json(spreadsheet_name, spreadsheetid)
-        else:
+                results += rows
+        if results:
             try:
                 spreadsheetid = process_results(results, test_name, cloud_type, os_type, os_release, spreadsheet_name,
                                                 spreadsheetid)
             except Exception as exc:
                 custom_logger.error(str(exc))
-                pass
-            custom_logger.info(f"https://docs.google.com/spreadsheets/d/{spreadsheetid}")
-            register_details_json(spreadsheet_name, spreadsheetid)
+
+    if errors:
+        custom_logger.error(str(len(errors)) + " result file(s) could not be extracted:")
+        for test_name, path, error in errors:
+            custom_logger.error(test_name + ": " + path + ": " + error)
+    custom_logger.info(f"https://docs.google.com/spreadsheets/d/{spreadsheetid}")
+    register_details_json(spreadsheet_name, spreadsheetid)
+
+
+def compare_benchmark(spreadsheets, spreadsheetid, test_name):
+    try:
+        custom_logger.info("**************************************** Comparing " + test_name + " value **************************************** ")
+        if check_test_is_hammerdb(test_name):
+            compare_hammerdb_results(spreadsheets, spreadsheetid, test_name)
+        else:
+            globals()[f"compare_{test_name}_results"](spreadsheets, spreadsheetid, test_name)
+    except Exception as exc:
+        custom_logger.error(str(exc))
+        custom_logger.error("Benchmark " + test_name + " comparison failed")
+
+    try:
+        custom_logger.info("Graphing " + test_name + " comparison data...")
+        if check_test_is_hammerdb(test_name):
+            graph_hammerdb_data(spreadsheetid, test_name, "compare")
+        else:
+            globals()[f"graph_{test_name}_data"](spreadsheetid, test_name, "compare")
+    except Exception as exc:
+        custom_logger.error(str(exc))
+        custom_logger.error("Failed to graph data")
 
 
-def compare_results(spreadsheets, comp_list, noti_flag, exclude_list):
+def compare_results(spreadsheets, comp_list, noti_flag, exclude_list, jobs=1):
     sheet_list = []
     spreadsheet_name = []
     comparison_list = []
@@ -335,12 +429,11 @@ def compare_results(spreadsheets, comp_list, noti_flag, exclude_list):
     custom_logger.info("Collecting list of benchmarks...")
     for spreadsheet in spreadsheets:
         sheet_names = []
-        sheets = get_sheet(spreadsheet, test_name=test_name)
-        spreadsheet_name.append(get_sheet(spreadsheet, test_name=[])["properties"]["title"].strip())
-        for sheet in sheets.get("sheets"):
-            if(sheet["properties"]["title"].strip()=="summary"):
+        spreadsheet_name.append(get_spreadsheet_title(spreadsheet).strip())
+        for title in get_sheet_titles(spreadsheet):
+            if(title.strip()=="summary"):
                 continue
-            sheet_names.append(sheet["properties"]["title"].strip())
+            sheet_names.append(title.strip())
         sheet_list.append(sheet_names)
 
     if comp_list:
@@ -356,6 +449,18 @@ def compare_results(spreadsheets, comp_list, noti_flag, exclude_list):
             if benchmark in comparison_list:
                 comparison_list.remove(benchmark)
     custom_logger.info("Comparison list : "+str(comparison_list))
+
+    # Pull every benchmark tab of each spreadsheet in one request, the
+    # compare functions read them back from memory
+    custom_logger.info("Fetching benchmark data for comparison...")
+    for spreadsheet in spreadsheets:
+        # comparison_list holds stripped titles, which is what the compare
+        # functions hand to read_sheet, so fetch each tab under that name
+        titles = {title.strip(): title for title in get_sheet_titles(spreadsheet)}
+        try:
+            prefetch_sheets(spreadsheet, {name: titles[name] for name in comparison_list if name in titles})
+        except Exception as exc:
+            custom_logger.warning("Failed to prefetch data from " + spreadsheet + ": " + str(exc))
     spreadsheet_name = " and ".join(spreadsheet_name)
     spreadsheetid = read_config('spreadsheet', 'comp_id')
 
@@ -374,43 +479,26 @@ def compare_results(spreadsheets, comp_list, noti_flag, exclude_list):
         time.sleep(10)
         custom_logger.info("No action provided. Overwriting the existing sheet.")
 
-    for index, test_name in enumerate(comparison_list):
-        try:
-            custom_logger.info("**************************************** Comparing " + test_name + " value **************************************** ")
-            write_config("test", "test_name", test_name)
-            if check_test_is_hammerdb(test_name):
-                compare_hammerdb_results(spreadsheets, spreadsheetid, test_name)
-            else:
-                globals()[f"compare_{test_name}_results"](spreadsheets, spreadsheetid, test_name)
-            if index + 1 != len(comparison_list):
-                custom_logger.info(
-                    "# Sleeping 10 sec to workaround the Google Sheet per minute API limit"
-                )
-                time.sleep(1)
-        except Exception as exc:
-            custom_logger.error(str(exc))
-            custom_logger.error("Benchmark " + test_name + " comparison failed")
-
-        try:
-            custom_logger.info("Graphing " + test_name + " comparison data...")
-            if check_test_is_hammerdb(test_name):
-                graph_hammerdb_data(spreadsheetid, test_name, "compare")
-            else:
-                globals()[f"graph_{test_name}_data"](spreadsheetid, test_name, "compare")
-        except Exception as exc:
-            custom_logger.error(str(exc))
-            custom_logger.error("Failed to graph data")
+    if jobs > 1:
+        # Benchmarks write to separate tabs, API calls from all workers
+        # share the rate limiters in sheet_util
+        custom_logger.info("Comparing benchmarks with " + str(jobs) + " parallel jobs...")
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            list(executor.map(lambda name: compare_benchmark(spreadsheets, spreadsheetid, name), comparison_list))
+    else:
+        for test_name in comparison_list:
+            compare_benchmark(spreadsheets, spreadsheetid, test_name)
 
     custom_logger.info(f"https://docs.google.com/spreadsheets/d/{spreadsheetid}")
     register_details_json(spreadsheet_name, spreadsheetid)
 
 
-def reduce_data(proc_list, noti_flag, exclude):
-    data_handler(proc_list, noti_flag, exclude)
+def reduce_data(proc_list, noti_flag, exclude, jobs=1):
+    data_handler(proc_list, noti_flag, exclude, jobs)
 
 
-def compare_data(s_list, comp_list, noti_flag, exclude):
-    compare_results(s_list, comp_list, noti_flag, exclude)
+def compare_data(s_list, comp_list, noti_flag, exclude, jobs=1):
+    compare_results(s_list, comp_list, noti_flag, exclude, jobs)
 
 
 if __name__ == "__main__":
@@ -426,6 +514,11 @@ if __name__ == "__main__":
     parser.add_argument("--no-check", action='store_true', help="No health check")
     parser.add_argument("--no-notify", action='store_true', help="No notification")
     parser.add_argument("--health-check", action='store_true', help="No notification")
+    parser.add_argument("--jobs", type=int, default=1, help="Number of result files to extract, or benchmarks to compare, in parallel (default: 1)")
+    parser.add_argument("--refresh-prices", action='store_true', help="Fetch instance prices again instead of using the price cache")
+    parser.add_argument("--import-prices", type=str, required=False, metavar="FILE", help="Import a price list (AWS offer file CSV/JSON, GCP pricelist.json or Azure calculator JSON) into the pricing catalog")
+    parser.add_argument("--offline-prices", action='store_true', help="Take instance prices from the imported pricing catalog only")
+    parser.add_argument("--no-extract-cache", action='store_true', help="Extract every result file again instead of reusing cached results")
 
     args = parser.parse_args()
     supported_benchmarks = ['aim', 'auto_hpl', 'boot', 'coremark', 'coremark_pro', 'etcd', 'fio_run', 'hammerdb_maria',
@@ -437,6 +530,10 @@ if __name__ == "__main__":
         custom_logger.error(f"Configuration file not found: {util.config_location}")
         exit(1)
 
+    price_cache.refresh = args.refresh_prices
+    price_cache.offline = args.offline_prices
+    extract_cache.enabled = not args.no_extract_cache
+
     if args.process_list and args.exclude_list:
         custom_logger.error("Invalid options")
         exit(0)
@@ -455,6 +552,15 @@ if __name__ == "__main__":
             print(i)
         exit(0)
 
+    if args.import_prices:
+        try:
+            import_catalog(os.path.expanduser(args.import_prices))
+        except Exception as exc:
+            custom_logger.error(str(exc))
+            custom_logger.error("Unable to import prices from " + args.import_prices)
+            exit(1)
+        exit(0)
+
     if not (args.process or args.compare):
         parser.print_help()
         exit(0)
@@ -480,7 +586,7 @@ if __name__ == "__main__":
         if args.exclude_list:
             exclude_list = args.exclude_list.split(",")
 
-        reduce_data(proc_list, noti_flag, exclude_list)
+        reduce_data(proc_list, noti_flag, exclude_list, args.jobs)
         exit(0)
     elif args.compare:
         custom_logger.info("Config path : " + util.config_location)
@@ -495,7 +601,7 @@ if __name__ == "__main__":
         try:
             s_list = args.compare.split(",")
             if len(s_list) > 1:
-                compare_data(s_list, comp_list, noti_flag, exclude_list)
+                compare_data(s_list, comp_list, noti_flag, exclude_list, args.jobs)
                 exit(0)
             else:
                 custom_logger.error("Provide two or more sheets to compare.")
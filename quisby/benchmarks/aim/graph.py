@@ -1,7 +1,4 @@
-import time
-
-from quisby.sheet.sheetapi import sheet
-from quisby.sheet.sheet_util import read_sheet, clear_sheet_charts, get_sheet,append_empty_row_sheet
+from quisby.sheet.sheet_util import ChartWriter, read_sheet, clear_sheet_charts, get_sheet_id,append_empty_row_sheet
 
 
 def create_series_range_aim(column_count, sheetId, start_index, end_index):
@@ -42,6 +39,7 @@ def graph_aim_data(spreadsheetId, test_name, action):
     if len(data) > 500:
         append_empty_row_sheet(spreadsheetId, 3000, test_name)
 
+    charts = ChartWriter(spreadsheetId)
     for index, row in enumerate(data):
         if row == [] and start_index is None:
             start_index = index
@@ -57,9 +55,7 @@ def graph_aim_data(spreadsheetId, test_name, action):
             graph_data = data[start_index:end_index]
             column_count = len(graph_data[2])
 
-            sheetId = get_sheet(spreadsheetId, test_name)["sheets"][0]["properties"][
-                "sheetId"
-            ]
+            sheetId = get_sheet_id(spreadsheetId, test_name)
 
             requests = {
                 "addChart": {
@@ -121,10 +117,8 @@ def graph_aim_data(spreadsheetId, test_name, action):
             else:
                 GRAPH_COL_INDEX += 6
 
-            body = {"requests": requests}
-
-            sheet.batchUpdate(spreadsheetId=spreadsheetId, body=body).execute()
+            charts.add(requests)
 
             start_index, end_index = None, None
 
-            time.sleep(3)
\ No newline at end of file
+    charts.flush()
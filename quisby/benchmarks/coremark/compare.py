@@ -1,33 +1,12 @@
 from quisby import custom_logger
 from itertools import groupby
 from quisby.sheet.sheet_util import (
-    append_to_sheet,
     read_sheet,
-    get_sheet,
-    create_sheet,
-    clear_sheet_data,
-    clear_sheet_charts,
+    get_spreadsheet_title,
+    replace_sheet_contents,
 )
 from quisby.util import merge_lists_alternately, read_config
-import re
-
-
-def extract_prefix_and_number(input_string):
-    """
-    Extracts the prefix and suffix from an instance name that contains a number.
-
-    :param input_string: Instance name, e.g., 't2.micro-01'
-    :return: Tuple (prefix, suffix) or (None, None) if no match
-    """
-    try:
-        match = re.search(r'^(.*?)(\d+)(.*?)$', input_string)
-        if match:
-            prefix = match.group(1)
-            suffix = match.group(3)  # Extracts the suffix after the number
-            return prefix, suffix
-    except Exception as exc:
-        custom_logger.error(f"Error extracting prefix and number from '{input_string}': {str(exc)}")
-    return None, None
+from quisby.ordering import extract_prefix_and_number
 
 
 def compare_inst(item1, item2):
@@ -70,7 +49,7 @@ def compare_coremark_results(spreadsheets, spreadsheetId, test_name, table_name=
         # Read data from each spreadsheet
         for spreadsheet in spreadsheets:
             values.append(read_sheet(spreadsheet, range=test_name))
-            spreadsheet_name.append(get_sheet(spreadsheet, test_name=test_name)["properties"]["title"])
+            spreadsheet_name.append(get_spreadsheet_title(spreadsheet))
 
         # Group the values into non-empty chunks
         for index, value in enumerate(values):
@@ -127,12 +106,8 @@ def compare_coremark_results(spreadsheets, spreadsheetId, test_name, table_name=
 
         # Try to append the merged data to the target sheet
         try:
-            create_sheet(spreadsheetId, test_name)
-            custom_logger.info(f"Deleting existing charts and data from the sheet '{test_name}'...")
-            clear_sheet_charts(spreadsheetId, test_name)
-            clear_sheet_data(spreadsheetId, test_name)
-            custom_logger.info(f"Appending new {test_name} data to sheet...")
-            append_to_sheet(spreadsheetId, results, test_name)
+            custom_logger.info(f"Replacing existing charts and data in the sheet '{test_name}'...")
+            replace_sheet_contents(spreadsheetId, test_name, results)
         except Exception as exc:
             custom_logger.error(f"Failed to append data to sheet '{test_name}' in spreadsheet {spreadsheetId}: {str(exc)}")
             return spreadsheetId
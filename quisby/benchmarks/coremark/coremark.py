@@ -1,65 +1,11 @@
-from itertools import groupby
-import re
 from quisby import custom_logger
-from quisby.util import read_config, process_instance, mk_int
+from quisby.ordering import FAMILY_FIELDS as DEFAULT_FAMILY_FIELDS, group_by_family
+from quisby.util import read_config
 from quisby.pricing.cloud_pricing import get_cloud_pricing
-from quisby.benchmarks.version_util import get_version_info
+from quisby.benchmarks.version_util import open_result
 
-
-# Utility function to extract prefix, number, and suffix from instance names
-def extract_prefix_and_number(input_string):
-    """
-    Extracts the prefix, number, and suffix from a structured instance name string.
-
-    Example: 't2.micro-01' -> ('t2.micro', 1, '')
-
-    :param input_string: The instance name as a string (e.g., 't2.micro-01')
-    :return: Tuple (prefix, number, suffix) or (None, None, None) if no match
-    """
-    try:
-        match = re.search(r'^(.*?)(\d+)(.*?)$', input_string)
-        if match:
-            prefix = match.group(1)
-            number = int(match.group(2))
-            suffix = match.group(3)
-            return prefix, number, suffix
-    except Exception as exc:
-        custom_logger.error(f"Error extracting prefix and number from input string '{input_string}': {str(exc)}")
-    return None, None, None
-
-
-# Custom key for sorting instances based on the cloud type and instance name
-def custom_key(item):
-    """
-    Generates a custom sorting key based on the instance's cloud platform (AWS, GCP, Azure, or Local).
-
-    :param item: The item containing instance name
-    :return: Tuple that can be used as a sorting key
-    """
-    try:
-        cloud_type = read_config("cloud", "cloud_type")
-
-        if item[1][0] == "local":
-            return item[1][0]  # If local, use the first item directly as the key
-
-        # For cloud instances, split names to extract type and number
-        if cloud_type == "aws":
-            instance_name = item[1][0]
-            instance_type, instance_number = instance_name.split(".")
-            return instance_type, instance_number
-
-        elif cloud_type == "gcp":
-            instance_type = item[1][0].split("-")[0]
-            instance_number = int(item[1][0].split('-')[-1])
-            return instance_type, instance_number
-
-        elif cloud_type == "azure":
-            instance_type, version, instance_number = extract_prefix_and_number(item[1][0])
-            return instance_type, version, instance_number
-
-    except Exception as exc:
-        custom_logger.error(f"Error generating custom key for instance '{item[1][0]}': {str(exc)}")
-    return None
+# Azure families are grouped across versions
+FAMILY_FIELDS = dict(DEFAULT_FAMILY_FIELDS, azure=("family", "feature"))
 
 
 # Calculates price-performance ratio for an instance
@@ -86,57 +32,6 @@ def calc_price_performance(inst, avg):
         return None, 0.0
 
 
-# Groups benchmarking results based on cloud platform
-def group_data(results):
-    """
-    Groups benchmarking results based on instance type and cloud platform.
-
-    :param results: List of benchmarking results
-    :return: Grouped results
-    """
-    try:
-        cloud_type = read_config("cloud", "cloud_type")
-
-        if cloud_type == "aws":
-            return groupby(results, key=lambda x: process_instance(x[1][0], "family", "version", "feature", "machine_type"))
-
-        elif cloud_type == "azure":
-            results = sorted(results, key=lambda x: process_instance(x[1][0], "family", "feature"))
-            return groupby(results, key=lambda x: process_instance(x[1][0], "family", "feature"))
-
-        elif cloud_type == "gcp":
-            return groupby(results, key=lambda x: process_instance(x[1][0], "family", "version", "sub_family", "feature"))
-
-        elif cloud_type == "local":
-            return groupby(results, key=lambda x: process_instance(x[1][0], "family"))
-    except Exception as exc:
-        custom_logger.error(f"Error grouping benchmarking results: {str(exc)}")
-    return []
-
-
-# Sorts the results based on cloud platform naming conventions
-def sort_data(results):
-    """
-    Sorts the benchmarking results based on instance naming conventions.
-
-    :param results: List of benchmarking results
-    """
-    try:
-        cloud_type = read_config("cloud", "cloud_type")
-
-        if cloud_type == "aws":
-            results.sort(key=lambda x: str(process_instance(x[1][0], "family")))
-
-        elif cloud_type == "azure":
-            results.sort(key=lambda x: str(process_instance(x[1][0], "family", "version", "feature")))
-
-        elif cloud_type == "gcp":
-            results.sort(key=lambda x: str(process_instance(x[1][0], "family", "version", "sub_family")))
-
-    except Exception as exc:
-        custom_logger.error(f"Error sorting benchmarking results: {str(exc)}")
-
-
 # Generates a summary report for CoreMark benchmarking data
 def create_summary_coremark_data(results, OS_RELEASE, sorted_results=None):
     """
@@ -152,12 +47,9 @@ def create_summary_coremark_data(results, OS_RELEASE, sorted_results=None):
     try:
         # Sort and filter results
         results = list(filter(None, results))
-        sort_data(results)
 
-        for _, items in group_data(results):
+        for _, sorted_data in group_by_family(results, (1, 0), FAMILY_FIELDS):
             cal_data = [["System name", "Test_passes-" + OS_RELEASE]]
-            items = list(items)
-            sorted_data = sorted(items, key=lambda x: mk_int(process_instance(x[1][0], "size")))
 
             cost_per_hour, price_per_perf = [], []
 
@@ -204,16 +96,16 @@ def create_summary_coremark_data(results, OS_RELEASE, sorted_results=None):
 
 
 # Extracts and processes CoreMark data from a file
-def _extract_coremark_v1(path, system_name, OS_RELEASE, version_info):
+def _extract_coremark_v1(result_file, system_name, OS_RELEASE, version_info):
     """Extract CoreMark data in v1.x format."""
     results = []
     processed_data = []
+    path = result_file.path
 
     try:
-        # Open the CSV file
+        # Read the CSV file
         if path.endswith(".csv"):
-            with open(path) as file:
-                coremark_results = file.readlines()
+            coremark_results = result_file.body()
         else:
             custom_logger.error(f"Invalid file format for path: {path}")
             return None  # Not a CSV file
@@ -226,17 +118,18 @@ def _extract_coremark_v1(path, system_name, OS_RELEASE, version_info):
 
     # Process the CoreMark data
     try:
-        data_index = 0
         header = []
-        for index, data in enumerate(coremark_results):
+        rows = []
+        for data in coremark_results:
             if "iteration" in data:
-                data_index = index
                 header = data.strip("\n").split(",")
                 # Add CSV Version to header
                 header.append("CSV Version")
+                # Only the rows after the last header are kept
+                rows = []
             else:
-                coremark_results[index] = data.strip("\n").split(",")
-        coremark_results = [header] + coremark_results[data_index + 1:]
+                rows.append(data.strip("\n").split(","))
+        coremark_results = [header] + rows
 
         # Format the data for report generation
         iteration = 1
@@ -275,8 +168,9 @@ def extract_coremark_data(path, system_name, OS_RELEASE):
     :param OS_RELEASE: OS release version (e.g., 'Ubuntu-20.04')
     :return: Processed benchmarking results or None if there was an error
     """
-    # Get version information from CSV
-    version_info = get_version_info(path)
+    # Read the CSV file once and get its version information
+    result_file = open_result(path)
+    version_info = result_file.version_info
     normalized_version = version_info['normalized']
 
     custom_logger.debug(
@@ -286,10 +180,10 @@ def extract_coremark_data(path, system_name, OS_RELEASE):
 
     # Dispatch to version-specific handler
     if normalized_version in ['1.0', '1.1']:
-        return _extract_coremark_v1(path, system_name, OS_RELEASE, version_info)
+        return _extract_coremark_v1(result_file, system_name, OS_RELEASE, version_info)
     else:
         # Future: Add elif for version '2.0', '3.0', etc.
         custom_logger.warning(
             f"Unknown CSV version {normalized_version}, attempting v1.x format"
         )
-        return _extract_coremark_v1(path, system_name, OS_RELEASE, version_info)
+        return _extract_coremark_v1(result_file, system_name, OS_RELEASE, version_info)
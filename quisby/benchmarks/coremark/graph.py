@@ -1,8 +1,6 @@
-from quisby.formatting.add_formatting import update_conditional_formatting
-from quisby.sheet.sheet_util import read_sheet,clear_sheet_charts,get_sheet,append_empty_row_sheet
-from quisby.sheet.sheetapi import sheet
-from quisby.util import read_value
-import time
+from quisby.formatting.add_formatting import ConditionalFormatBuilder
+from quisby.sheet.sheet_util import ChartWriter, read_sheet,clear_sheet_charts,get_sheet_id,append_empty_row_sheet
+from quisby.util import get_threshold
 
 # Function to create series for "coremark process" type chart
 def create_series_range_list_coremark_process(column_count, sheetId, start_index, end_index):
@@ -112,6 +110,7 @@ def graph_coremark_data(spreadsheetId, range, action):
     sheetId = -1
 
     # Process the rows to find the start and end indices, and define chart title/subtitle
+    charts = ChartWriter(spreadsheetId)
     for index, row in enumerate(data):
         if "System name" in row:
             start_index = index
@@ -137,9 +136,7 @@ def graph_coremark_data(spreadsheetId, range, action):
             column_count = len(graph_data[0]) # Get the number of columns for the chart
 
             # Get the sheetId for the current range
-            sheetId = get_sheet(spreadsheetId, range)["sheets"][0]["properties"][
-                "sheetId"
-            ]
+            sheetId = get_sheet_id(spreadsheetId, range)
 
             # Dynamically call the appropriate function to create series based on the action
             series = globals()[f'create_series_range_list_coremark_{action}'](column_count, sheetId, start_index, end_index)
@@ -226,23 +223,20 @@ def graph_coremark_data(spreadsheetId, range, action):
             else:
                 GRAPH_COL_INDEX += 6
 
-            # Execute the batch update to create the chart
-            body = {"requests": requests}
-
-            sheet.batchUpdate(spreadsheetId=spreadsheetId, body=body).execute()
+            # Queue the chart, all charts are created in one batch update below
+            charts.add(requests)
 
             # Reset start and end indices for the next graph
             start_index, end_index = 0, 0
 
-            time.sleep(3)
-
+    charts.flush()
 
     # Apply conditional formatting if sheetId is valid
     if sheetId != -1:
-        threshold = read_value("percent_threshold", range)
-        if not threshold:
-            threshold = "5" # Default threshold value
+        threshold = get_threshold(range)
+        formatting = ConditionalFormatBuilder(spreadsheetId, range, len(data))
         for col in diff_col:
-            update_conditional_formatting(spreadsheetId, sheetId, col, threshold)
+            formatting.add_diff_rule(col, threshold)
+        formatting.flush()
 
 
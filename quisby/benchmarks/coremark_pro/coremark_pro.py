@@ -1,62 +1,20 @@
 import math
-import re
 from quisby import custom_logger
 from quisby.pricing.cloud_pricing import get_cloud_pricing
 from quisby.util import read_config
-from quisby.benchmarks.version_util import get_version_info
+from quisby.benchmarks.version_util import open_result
 
-def extract_prefix_and_number(input_string):
-    """
-    Extract the prefix, number, and suffix from an instance name.
-
-    :param input_string: Instance name like 't2.micro-01'
-    :return: Tuple (prefix, number, suffix) or (None, None, None) if no match.
-    """
-    match = re.search(r'^(.*?)(\d+)(.*?)$', input_string)
-    if match:
-        prefix = match.group(1)
-        number = int(match.group(2))
-        suffix = match.group(3)
-        return prefix, number, suffix
-    return None, None, None
-
-
-def custom_key(item):
-    """
-    Generate a custom key for sorting or grouping instances based on cloud provider and instance name format.
-
-    :param item: A tuple containing instance data.
-    :return: A tuple key for grouping.
-    """
-    cloud_type = read_config("cloud", "cloud_type")
-    try:
-        if item[1][0] == "local":
-            return item[1][0]
-        elif cloud_type == "aws":
-            instance_type, instance_number = item[1][0].split(".")
-            return instance_type, instance_number
-        elif cloud_type == "gcp":
-            instance_type, instance_number = item[1][0].split("-")
-            return instance_type, int(instance_number)
-        elif cloud_type == "azure":
-            instance_type, version, instance_number = extract_prefix_and_number(item[1][0])
-            return instance_type, version, instance_number
-    except Exception as exc:
-        custom_logger.error(f"Error in custom_key for {item[1][0]}: {str(exc)}")
-        return "", ""
-
-
-def _extract_v1_format(path, system_name, OS_RELEASE, version_info):
+def _extract_v1_format(result_file, system_name, OS_RELEASE, version_info):
     """
     Extract CoreMark-Pro data in v1.x CSV format.
 
     Format: comma-delimited CSV with # commented metadata
     """
+    path = result_file.path
     try:
         if not path.endswith(".csv"):
             return None
-        with open(path) as file:
-            lines = file.readlines()
+        lines = result_file.body()
     except Exception as exc:
         custom_logger.error(f"Unable to open or read file for CoreMark Pro: {path}")
         return None
@@ -88,8 +46,9 @@ def extract_coremark_pro_data(path, system_name, OS_RELEASE):
     Dispatches to appropriate handler based on CSV version.
     Supports backward compatibility for older CSV formats.
     """
-    # Get version information from CSV
-    version_info = get_version_info(path)
+    # Read the CSV file once and get its version information
+    result_file = open_result(path)
+    version_info = result_file.version_info
     normalized_version = version_info['normalized']
 
     custom_logger.debug(
@@ -99,13 +58,13 @@ def extract_coremark_pro_data(path, system_name, OS_RELEASE):
 
     # Dispatch to version-specific handler
     if normalized_version in ['1.0', '1.1']:
-        return _extract_v1_format(path, system_name, OS_RELEASE, version_info)
+        return _extract_v1_format(result_file, system_name, OS_RELEASE, version_info)
     else:
         # Future: Add elif for version '2.0', '3.0', etc.
         custom_logger.warning(
             f"Unknown CSV version {normalized_version}, attempting v1.x format"
         )
-        return _extract_v1_format(path, system_name, OS_RELEASE, version_info)
+        return _extract_v1_format(result_file, system_name, OS_RELEASE, version_info)
 
 def calc_price_performance(inst, avg):
     """
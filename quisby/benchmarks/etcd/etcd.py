@@ -4,7 +4,7 @@ from quisby.benchmarks.fio.fio import extract_fio_run_data, extract_csv_data, gr
 from quisby.benchmarks.fio.summary import create_summary_fio_run_data
 from quisby.benchmarks.fio.graph import graph_fio_run_data
 from quisby.benchmarks.fio.comparison import compare_fio_run_results
-from quisby.benchmarks.version_util import get_version_info
+from quisby.benchmarks.version_util import ResultFile
 from quisby import custom_logger
 
 
@@ -19,9 +19,11 @@ def extract_etcd_data(path, system_name, OS_RELEASE):
 
     # Get version information from the first CSV file
     first_file = path + f"/{ls_dir[0]}/result_etcd.csv" if ls_dir else None
+    first_result = None
     csv_version = None
     if first_file and os.path.exists(first_file):
-        version_info = get_version_info(first_file)
+        first_result = ResultFile(first_file)
+        version_info = first_result.version_info
         csv_version = version_info['raw'] or '1.0'
 
         custom_logger.debug(
@@ -30,15 +32,18 @@ def extract_etcd_data(path, system_name, OS_RELEASE):
         )
 
     for idx, folder in enumerate(ls_dir):
-        with open(path + f"/{folder}/result_etcd.csv") as csv_file:
-            csv_data = csv_file.readlines()
-            csv_data[-1] = csv_data[-1].strip()
-
-            # Pass csv_version only for the first folder
-            if idx == 0:
-                results += extract_csv_data(csv_data, csv_version)
-            else:
-                results += extract_csv_data(csv_data)
+        if idx == 0 and first_result is not None:
+            result_file = first_result
+        else:
+            result_file = ResultFile(path + f"/{folder}/result_etcd.csv")
+        csv_data = list(result_file.body())
+        csv_data[-1] = csv_data[-1].strip()
+
+        # Pass csv_version only for the first folder
+        if idx == 0:
+            results += extract_csv_data(csv_data, csv_version)
+        else:
+            results += extract_csv_data(csv_data)
 
     return group_data(results, system_name, OS_RELEASE, csv_version)
 
@@ -0,0 +1,129 @@
+"""
+Extractor output kept between runs.
+
+An entry is keyed by the content hash of the result file, the benchmark,
+the system name, OS_RELEASE and the parser version, made of PARSER_VERSION
+and the results version of the file (see version_util). Most extractors
+price the instances they read, so the cloud type, region and OS type are
+part of the key as well, and entries expire with the price cache: after
+its TTL, or at once with --refresh-prices.
+
+The key is built from the ResultFile the extractor then reads, so a file
+is read once whether its entry is found or not.
+
+Entries are pickled rows under ~/.quisby/cache/extract/, one file per key.
+Empty results are not stored, so files that fail to extract are reported
+on every run, and neither are rows built while a price or vCPU lookup
+failed, as failed lookups are never cached by the price cache either.
+"""
+import hashlib
+import os
+import pickle
+import time
+
+from quisby import custom_logger
+from quisby.benchmarks.version_util import ResultFile, shared_result
+from quisby.pricing import cloud_pricing, price_cache
+from quisby.util import read_config
+
+home_dir = os.getenv("HOME")
+CACHE_DIR = home_dir + "/.quisby/cache/extract/"
+
+# Bump when an extractor returns different rows for the same file
+PARSER_VERSION = 1
+
+# Cleared by --no-extract-cache
+enabled = True
+
+
+def _pricing_settings():
+    try:
+        return tuple(read_config(section, key) for section, key in
+                     (("cloud", "cloud_type"), ("cloud", "region"), ("test", "OS_TYPE")))
+    except Exception:
+        return ()
+
+
+def cache_key(test_name, result_file, system_name, os_release, source="results", settings=None):
+    """
+    Key of the extractor output for a result file.
+
+    The digest and results version come from the lines already read into
+    result_file, so the file is not opened again.
+
+    :result_file: version_util.ResultFile of the result file
+    :settings: cloud type, region and OS type, read from config.ini if None
+    :return: key tuple, None when the file could not be read
+    """
+    if result_file.error is not None:
+        return None
+    if settings is None:
+        settings = _pricing_settings()
+    parser_version = (PARSER_VERSION, result_file.version_info['normalized'])
+    # Catalog prices differ from the ones fetched online
+    pricing = tuple(settings) + (price_cache.offline,)
+    return (result_file.digest(), test_name, source, system_name, os_release, parser_version, pricing)
+
+
+def _entry_path(key):
+    return os.path.join(CACHE_DIR, hashlib.sha256(repr(key).encode()).hexdigest() + ".pickle")
+
+
+def get(key):
+    """Cached rows for key, None if missing, expired or due for a refresh"""
+    if key is None or not enabled or price_cache.refresh:
+        return None
+    try:
+        with open(_entry_path(key), "rb") as file:
+            stored_key, stored_at, rows = pickle.load(file)
+    except FileNotFoundError:
+        return None
+    except Exception as exc:
+        custom_logger.debug("Extract cache entry unreadable: " + str(exc))
+        return None
+    if stored_key != key or time.time() - stored_at > price_cache.get_ttl():
+        return None
+    return rows
+
+
+def put(key, rows):
+    """Store the rows extracted for key, replacing the entry atomically"""
+    if key is None or not enabled or not rows:
+        return
+    entry_path = _entry_path(key)
+    tmp_path = entry_path + "." + str(os.getpid()) + ".tmp"
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(tmp_path, "wb") as file:
+            pickle.dump((key, time.time(), rows), file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, entry_path)
+    except Exception as exc:
+        custom_logger.debug("Extract cache unavailable: " + str(exc))
+
+
+def cached_extract(extract, test_name, path, system_name, os_release):
+    """
+    Rows of extract(test_name, path, system_name, os_release), from the
+    cache when the file is unchanged.
+
+    The extractor reads the ResultFile already read for the key. Rows are
+    stored only if every price and vCPU lookup made while extracting
+    gave a value.
+    """
+    if not enabled or not os.path.isfile(path):
+        return extract(test_name, path, system_name, os_release)
+    result_file = ResultFile(path)
+    key = cache_key(test_name, result_file, system_name, os_release)
+    rows = get(key)
+    if rows is not None:
+        custom_logger.debug("Using cached results for " + path)
+        return rows
+
+    failures = cloud_pricing.lookup_failures()
+    with shared_result(result_file):
+        rows = extract(test_name, path, system_name, os_release)
+    if cloud_pricing.lookup_failures() == failures:
+        put(key, rows)
+    else:
+        custom_logger.debug("Not caching results of " + path + ", some instance prices could not be resolved")
+    return rows
@@ -7,7 +7,7 @@ from bs4 import BeautifulSoup
 
 from quisby import custom_logger
 from quisby.util import read_config
-from quisby.benchmarks.version_util import get_version_info
+from quisby.benchmarks.version_util import open_result
 
 # TODO: Maybe we can do away with clat, lat, slat
 HEADER_TO_EXTRACT = [
@@ -155,8 +155,9 @@ def extract_fio_run_data(path, system_name, OS_RELEASE):
     summary_data = []
     summary_file = path
 
-    # Get version information from CSV
-    version_info = get_version_info(path)
+    # Read the CSV file once and get its version information
+    result_file = open_result(path)
+    version_info = result_file.version_info
     normalized_version = version_info['normalized']
     csv_version = version_info['raw'] or '1.0'
 
@@ -166,15 +167,13 @@ def extract_fio_run_data(path, system_name, OS_RELEASE):
     )
 
     try:
-        with open(path) as csv_file:
-            csv_data = csv_file.readlines()
-            csv_data = split_into_parts(csv_data)
-            for idx, data in enumerate(csv_data):
-                # Pass csv_version only for the first data part
-                if idx == 0:
-                    results += extract_csv_data(data, csv_version)
-                else:
-                    results += extract_csv_data(data)
+        csv_data = split_into_parts(result_file.body())
+        for idx, data in enumerate(csv_data):
+            # Pass csv_version only for the first data part
+            if idx == 0:
+                results += extract_csv_data(data, csv_version)
+            else:
+                results += extract_csv_data(data)
 
         return group_data(results, system_name, OS_RELEASE, csv_version)
     except Exception as exc:
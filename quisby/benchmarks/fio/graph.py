@@ -1,14 +1,13 @@
-import time
 
 from quisby import custom_logger
-from quisby.formatting.add_formatting import update_conditional_formatting
+from quisby.formatting.add_formatting import ConditionalFormatBuilder
 from quisby.sheet.sheet_util import (
+    ChartWriter,
     read_sheet,
-    get_sheet,
+    get_sheet_id,
     append_empty_row_sheet,
 )
-from quisby.sheet.sheetapi import sheet
-from quisby.util import read_value
+from quisby.util import get_threshold
 
 
 def create_series_range_fio_process(column_count, sheetId, start_index, end_index, graph):
@@ -112,6 +111,7 @@ def graph_fio_run_data(spreadsheetId, test_name, action):
     if len(data) > 500:
         append_empty_row_sheet(spreadsheetId, 3000, test_name)
 
+    charts = ChartWriter(spreadsheetId)
     for index, row in enumerate(data):
         if "iteration_name" in row:
             start_index = index - 1
@@ -146,9 +146,7 @@ def graph_fio_run_data(spreadsheetId, test_name, action):
                     f"{test_name}: Data inconsistency at {start_index}-{end_index}. Skipping to next data")
                 continue
 
-            sheetId = get_sheet(spreadsheetId, test_name)["sheets"][0]["properties"][
-                "sheetId"
-            ]
+            sheetId = get_sheet_id(spreadsheetId, test_name)
 
             series = globals()[f'create_series_range_fio_{action}'](column_count, sheetId, start_index, end_index + 1, graph)
 
@@ -232,18 +230,15 @@ def graph_fio_run_data(spreadsheetId, test_name, action):
             else:
                 GRAPH_COL_INDEX += 6
 
-            body = {"requests": requests}
-
-            sheet.batchUpdate(spreadsheetId=spreadsheetId, body=body).execute()
+            charts.add(requests)
 
             start_index, end_index = None, None
-            custom_logger.info("Sleep for 1sec to workaround Gsheet API")
 
-            time.sleep(3)
+    charts.flush()
 
     if sheetId != -1:
-        threshold = read_value("percent_threshold", test_name)
-        if not threshold:
-            threshold = "5"
+        threshold = get_threshold(test_name)
+        formatting = ConditionalFormatBuilder(spreadsheetId, test_name, len(data))
         for col in diff_col:
-            update_conditional_formatting(spreadsheetId, sheetId, col, threshold)
+            formatting.add_diff_rule(col, threshold)
+        formatting.flush()
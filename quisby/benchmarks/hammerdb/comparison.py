@@ -4,12 +4,12 @@ from itertools import groupby
 from quisby import custom_logger
 from quisby.benchmarks.hammerdb.graph import graph_hammerdb_data
 from quisby.sheet.sheet_util import (
-    append_to_sheet,
     read_sheet,
-    get_sheet,
-    create_sheet, clear_sheet_charts, clear_sheet_data
+    get_spreadsheet_title,
+    replace_sheet_contents,
 )
 from quisby.util import combine_two_array_alternating, read_config
+from quisby.ordering import extract_prefix_and_number
 
 
 def are_in_same_group(str1, str2):
@@ -31,15 +31,6 @@ def are_in_same_group(str1, str2):
     return False
 
 
-def extract_prefix_and_number(input_string):
-    match = re.search(r'^(.*?)(\d+)(.*?)$', input_string)
-    if match:
-        prefix = match.group(1)
-        suffix = match.group(3)  # Extracts the suffix after the number
-        return prefix, suffix
-    return None, None
-
-
 def compare_inst(item1, item2):
     cloud_type = read_config("cloud", "cloud_type")
     if cloud_type == "local":
@@ -77,7 +68,7 @@ def compare_hammerdb_results(spreadsheets, spreadsheetId, test_name):
     for spreadsheet in spreadsheets:
         values.append(read_sheet(spreadsheet, range=test_name))
         spreadsheet_name.append(
-            get_sheet(spreadsheet, test_name=test_name)["properties"]["title"]
+            get_spreadsheet_title(spreadsheet)
         )
 
     for index, value in enumerate(values):
@@ -100,24 +91,20 @@ def compare_hammerdb_results(spreadsheets, spreadsheetId, test_name):
                 elif value[0][0] == "Price-Perf" and ele[0][0] == "Price-Perf":
                     if comparegroup([value[0][1], ele[0][1]]):
                         results.append([""])
-                        results = combine_two_array_alternating(results, value, ele)
+                        results = combine_two_array_alternating(results, value, ele, test_name)
                         break
                 elif "hammerdb" in value[0][0]  and "hammerdb" in ele[0][0]:
                     if comparegroup([value[0][1], ele[0][1]]):
                         results.append([""])
-                        results = combine_two_array_alternating(results, value, ele)
+                        results = combine_two_array_alternating(results, value, ele, test_name)
                         break
 
             except Exception as exc:
                 print(str(exc))
 
     try:
-        create_sheet(spreadsheetId, test_name)
-        custom_logger.info("Deleting existing charts and data from the sheet...")
-        clear_sheet_charts(spreadsheetId, test_name)
-        clear_sheet_data(spreadsheetId, test_name)
-        custom_logger.info("Appending new " + test_name + " data to sheet...")
-        append_to_sheet(spreadsheetId, results, test_name)
+        custom_logger.info("Replacing existing charts and data in the sheet...")
+        replace_sheet_contents(spreadsheetId, test_name, results)
         #graph_hammerdb_data(spreadsheetId, test_name, "compare")
     except Exception as exc:
         custom_logger.error("Failed to append data to sheet")
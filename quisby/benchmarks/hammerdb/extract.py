@@ -1,3 +1,5 @@
+from quisby.benchmarks.version_util import open_result
+
 
 def extract_hammerdb_data(path, system_name, test_name, OS_RELEASE):
     """
@@ -15,13 +17,12 @@ def extract_hammerdb_data(path, system_name, test_name, OS_RELEASE):
     results = []
     result_data = []
     data_index = 0
-    with open(path) as file:
-        hammerdb_results = file.readlines()
-        for index, line in enumerate(hammerdb_results):
-            if "# connection:TPM" in line:
-                data_index = index
-            else:
-                result_data.append(line.strip("\n").split(":"))
+    hammerdb_results = open_result(path).body()
+    for index, line in enumerate(hammerdb_results):
+        if "# connection:TPM" in line:
+            data_index = index
+        else:
+            result_data.append(line.strip("\n").split(":"))
     result_data = result_data[data_index:]
 
     results.append([""])
@@ -1,12 +1,11 @@
-import time
 
-from quisby.formatting.add_formatting import update_conditional_formatting
+from quisby.formatting.add_formatting import ConditionalFormatBuilder
 from quisby.sheet.sheet_util import (
+    ChartWriter,
     read_sheet,
-    get_sheet, append_empty_row_sheet, append_empty_col_sheet
+    get_sheet_id, append_empty_row_sheet, append_empty_col_sheet
 )
-from quisby.sheet.sheetapi import sheet
-from quisby.util import read_value
+from quisby.util import get_threshold
 
 
 def series_range_hammerdb_process(column_count, sheetId, start_index, end_index):
@@ -95,6 +94,7 @@ def graph_hammerdb_data(spreadsheetId, range, action):
     if len(hammerdb_results) > 500:
         append_empty_row_sheet(spreadsheetId, 3000, range)
 
+    charts = ChartWriter(spreadsheetId)
     for index, row in enumerate(hammerdb_results):
 
         if row:
@@ -120,9 +120,7 @@ def graph_hammerdb_data(spreadsheetId, range, action):
             if column_count > 10:
                 append_empty_col_sheet(spreadsheetId, 20, range)
 
-            sheetId = get_sheet(spreadsheetId, range)["sheets"][0]["properties"][
-                "sheetId"
-            ]
+            sheetId = get_sheet_id(spreadsheetId, range)
 
             series, col = globals()[f'series_range_hammerdb_{action}'](column_count, sheetId, start_index, end_index)
             diff_col.extend(col)
@@ -208,17 +206,16 @@ def graph_hammerdb_data(spreadsheetId, range, action):
             else:
                 GRAPH_COL_INDEX += 6
 
-            body = {"requests": requests}
-
-            sheet.batchUpdate(spreadsheetId=spreadsheetId, body=body).execute()
+            charts.add(requests)
 
             # Reset variables
             start_index, end_index = 0, 0
-            time.sleep(3)
+
+    charts.flush()
 
     if sheetId != -1:
-        threshold = read_value("percent_threshold", range)
-        if not threshold:
-            threshold = "5"
+        threshold = get_threshold(range)
+        formatting = ConditionalFormatBuilder(spreadsheetId, range, len(hammerdb_results))
         for col in diff_col:
-            update_conditional_formatting(spreadsheetId, sheetId, col, threshold)
+            formatting.add_diff_rule(col, threshold)
+        formatting.flush()
@@ -1,29 +1,10 @@
-import re
 from itertools import groupby
-from quisby.util import mk_int, process_instance, read_config
+from quisby.ordering import SERIES_FIELDS, group_by_family
+from quisby.util import read_config
 from quisby import custom_logger
 from quisby.pricing.cloud_pricing import get_cloud_pricing
 
 
-def extract_prefix_and_number(input_string):
-    """
-    Extracts the prefix, number, and suffix from an input string.
-
-    Args:
-        input_string (str): The input string to extract parts from.
-
-    Returns:
-        tuple: (prefix, number, suffix) or (None, None, None) if no match is found.
-    """
-    match = re.search(r'^(.*?)(\d+)(.*?)$', input_string)
-    if match:
-        prefix = match.group(1)
-        number = int(match.group(2))
-        suffix = match.group(3)
-        return prefix, number, suffix
-    return None, None, None
-
-
 def get_inst_name(item):
     """
     Extracts the instance name based on the cloud type.
@@ -57,18 +38,11 @@ def hammerdb_sort_data_by_system_family(results):
     Returns:
         list: A sorted list of results.
     """
-    sorted_results = []
-
-    # Group results by non-empty rows and sort them
+    # Group results by non-empty rows
     results = [list(g) for k, g in groupby(results, key=lambda x: x != [""]) if k]
-    results.sort(key=lambda x: str(process_instance(x[0][1], "family", "version", "feature")))
-
-    # Group by family, then sort by size within each family
-    for _, items in groupby(results, key=lambda x: process_instance(x[0][1], "family", "version", "feature")):
-        items = list(items)
-        sorted_results.append(sorted(items, key=lambda x: mk_int(process_instance(x[0][1], "size"))))
 
-    return sorted_results
+    # Group by family, sorted by size within each family
+    return [items for _, items in group_by_family(results, (0, 1), SERIES_FIELDS)]
 
 
 def calc_price_performance(inst, avg):
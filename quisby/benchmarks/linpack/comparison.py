@@ -1,11 +1,8 @@
 from quisby import custom_logger
 from quisby.sheet.sheet_util import (
     read_sheet,
-    append_to_sheet,
-    clear_sheet_charts,
-    clear_sheet_data,
-    get_sheet,
-    create_sheet,
+    get_spreadsheet_title,
+    replace_sheet_contents,
 )
 from quisby.util import percentage_deviation
 
@@ -34,7 +31,7 @@ def compare_linpack_results(spreadsheets, spreadsheet_id, test_name):
     for spreadsheet in spreadsheets:
         values.append(read_sheet(spreadsheet, test_name))
         spreadsheet_names.append(
-            get_sheet(spreadsheet, test_name)["properties"]["title"]
+            get_spreadsheet_title(spreadsheet)
         )
 
     # Initialize results with headers
@@ -87,12 +84,8 @@ def compare_linpack_results(spreadsheets, spreadsheet_id, test_name):
 
     # Attempt to update the spreadsheet with the new comparison data
     try:
-        create_sheet(spreadsheet_id, test_name)
-        custom_logger.info("Deleting existing charts and data from the sheet...")
-        clear_sheet_charts(spreadsheet_id, test_name)
-        clear_sheet_data(spreadsheet_id, test_name)
-        custom_logger.info(f"Appending new {test_name} data to sheet...")
-        append_to_sheet(spreadsheet_id, results, test_name)
+        custom_logger.info("Replacing existing charts and data in the sheet...")
+        replace_sheet_contents(spreadsheet_id, test_name, results)
     except Exception as exc:
         # Log the error and return the spreadsheet ID if the operation fails
         custom_logger.debug(str(exc))
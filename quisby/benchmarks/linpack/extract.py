@@ -4,8 +4,8 @@ import logging
 import os
 import re
 from quisby.pricing.cloud_pricing import get_cloud_pricing, get_cloud_cpu_count
-from quisby.util import read_config
-from quisby.benchmarks.version_util import get_version_info
+from quisby.util import get_config
+from quisby.benchmarks.version_util import open_result
 
 # Setting up logger for better error tracking and debugging
 logger = logging.getLogger(__name__)
@@ -28,10 +28,11 @@ def linpack_format_data(**kwargs):
         list: Updated 'results' list with the new data.
         None: If GFLOPS data is not available or invalid.
     """
-    region = read_config("cloud", "region")
-    cloud_type = read_config("cloud", "cloud_type").lower()
-    os_release = read_config("test", "OS_RELEASE")
-    os_type = read_config("test", "os_type")
+    config = get_config()
+    region = config.get("cloud", "region")
+    cloud_type = config.get("cloud", "cloud_type").lower()
+    os_release = config.get("test", "OS_RELEASE")
+    os_type = config.get("test", "os_type")
 
     results = kwargs.get("results", [])
     system_name = kwargs.get("system_name")
@@ -74,7 +75,7 @@ def linpack_format_data(**kwargs):
     return results
 
 
-def _extract_v1_format(path, system_name, version_info):
+def _extract_v1_format(result_file, system_name, version_info):
     """
     Extract Linpack data in v1.x CSV format.
 
@@ -82,7 +83,7 @@ def _extract_v1_format(path, system_name, version_info):
     and provides information about GFLOPS and the number of cores used.
 
     Args:
-        path (str): Path to the directory containing Linpack summary files.
+        result_file (ResultFile): Linpack summary file.
         system_name (str): Name of the system being tested.
         version_info (dict): Version information from CSV
 
@@ -95,6 +96,7 @@ def _extract_v1_format(path, system_name, version_info):
     summary_data = []
     no_of_cores = None
     gflops = None
+    path = result_file.path
 
     # Check if the summary file exists
     summary_file = path
@@ -105,13 +107,12 @@ def _extract_v1_format(path, system_name, version_info):
     # Process CSV summary file
     if summary_file.endswith("csv"):
         try:
-            with open(summary_file, 'r') as csv_file:
-                csv_reader = csv.DictReader(csv_file, delimiter=",")
-                list_data = list(csv_reader)
-                last_row = list_data[-1]
+            csv_reader = csv.DictReader(result_file.body(), delimiter=",")
+            list_data = list(csv_reader)
+            last_row = list_data[-1]
 
-                gflops = last_row.get("MB/sec")
-                threads = last_row.get("threads")
+            gflops = last_row.get("MB/sec")
+            threads = last_row.get("threads")
         except Exception as e:
             logger.error(f"Error reading CSV summary file {summary_file}: {str(e)}")
             raise RuntimeError(f"Error reading CSV summary file {summary_file}: {str(e)}")
@@ -168,8 +169,9 @@ def extract_linpack_data(path, system_name):
     Returns:
         list: Processed Linpack results with version info
     """
-    # Get version information from CSV
-    version_info = get_version_info(path)
+    # Read the CSV file once and get its version information
+    result_file = open_result(path)
+    version_info = result_file.version_info
     normalized_version = version_info['normalized']
 
     logger.debug(
@@ -179,10 +181,10 @@ def extract_linpack_data(path, system_name):
 
     # Dispatch to version-specific handler
     if normalized_version in ['1.0', '1.1']:
-        return _extract_v1_format(path, system_name, version_info)
+        return _extract_v1_format(result_file, system_name, version_info)
     else:
         # Future: Add elif for version '2.0', '3.0', etc.
         logger.warning(
             f"Unknown CSV version {normalized_version}, attempting v1.x format"
         )
-        return _extract_v1_format(path, system_name, version_info)
+        return _extract_v1_format(result_file, system_name, version_info)
@@ -1,12 +1,10 @@
-import time
-
-from quisby.formatting.add_formatting import update_conditional_formatting
+from quisby.formatting.add_formatting import ConditionalFormatBuilder
 from quisby.sheet.sheet_util import (
+    ChartWriter,
     read_sheet,
-    get_sheet, append_empty_row_sheet, append_empty_col_sheet
+    get_sheet_id, append_empty_row_sheet, append_empty_col_sheet
 )
-from quisby.sheet.sheetapi import sheet
-from quisby.util import read_value
+from quisby.util import get_threshold
 
 
 def create_series_range_linpack(column_count, sheetId, start_index, end_index):
@@ -65,6 +63,7 @@ def graph_linpack_compare(spreadsheetId, test_name, action):
     sheetId = -1
     GRAPH_ROW_INDEX = last_row + 1
 
+    charts = ChartWriter(spreadsheetId)
     for index, row in enumerate(data):
         if row[0] == "System" and start_index is None:
             start_index = index
@@ -82,9 +81,7 @@ def graph_linpack_compare(spreadsheetId, test_name, action):
             if column_count > 10:
                 append_empty_col_sheet(spreadsheetId, 20, test_name)
 
-            sheetId = get_sheet(spreadsheetId, test_name)["sheets"][0]["properties"][
-                "sheetId"
-            ]
+            sheetId = get_sheet_id(spreadsheetId, test_name)
 
             # GFlops & Diff  graph
             requests = {
@@ -199,9 +196,7 @@ def graph_linpack_compare(spreadsheetId, test_name, action):
                 }
             }
 
-            body = {"requests": requests}
-
-            sheet.batchUpdate(spreadsheetId=spreadsheetId, body=body).execute()
+            charts.add(requests)
 
             # Price-perf graph
             requests = {
@@ -316,9 +311,7 @@ def graph_linpack_compare(spreadsheetId, test_name, action):
                 }
             }
 
-            body = {"requests": requests}
-
-            sheet.batchUpdate(spreadsheetId=spreadsheetId, body=body).execute()
+            charts.add(requests)
 
             requests = {
                 "addChart": {
@@ -435,22 +428,22 @@ def graph_linpack_compare(spreadsheetId, test_name, action):
                 }
             }
 
-            body = {"requests": requests}
-
-            sheet.batchUpdate(spreadsheetId=spreadsheetId, body=body).execute()
+            charts.add(requests)
 
             GRAPH_ROW_INDEX += 20
             start_index, end_index = None, None
 
+    charts.flush()
+
     if sheetId != -1:
-        threshold = read_value("percent_threshold", test_name)
-        if not threshold:
-            threshold = "5"
+        threshold = get_threshold(test_name)
+        formatting = ConditionalFormatBuilder(spreadsheetId, test_name, len(data))
         for col in diff_col:
-            try:
-                update_conditional_formatting(spreadsheetId, sheetId, col, threshold)
-            except Exception as exc:
-                pass
+            formatting.add_diff_rule(col, threshold)
+        try:
+            formatting.flush()
+        except Exception as exc:
+            pass
 
 
 def graph_linpack_data(spreadsheetId, test_name, action):
@@ -480,6 +473,7 @@ def graph_linpack_data(spreadsheetId, test_name, action):
     start_index, end_index = None, None
     header_row = data[0]
 
+    charts = ChartWriter(spreadsheetId)
     for index, row in enumerate(data):
         if row[0] == "System" and start_index is None:
             start_index = index
@@ -495,9 +489,7 @@ def graph_linpack_data(spreadsheetId, test_name, action):
             graph_data = data[start_index:end_index]
             column_count = len(graph_data[0])
 
-            sheetId = get_sheet(spreadsheetId, test_name)["sheets"][0]["properties"][
-                "sheetId"
-            ]
+            sheetId = get_sheet_id(spreadsheetId, test_name)
 
             # GFlops & GFlops scaling graph
             requests = {
@@ -603,9 +595,7 @@ def graph_linpack_data(spreadsheetId, test_name, action):
             }
 
             # Price-perf graph
-            body = {"requests": requests}
-
-            sheet.batchUpdate(spreadsheetId=spreadsheetId, body=body).execute()
+            charts.add(requests)
 
             requests = {
                 "addChart": {
@@ -690,13 +680,9 @@ def graph_linpack_data(spreadsheetId, test_name, action):
                 }
             }
 
-            body = {"requests": requests}
-
-            sheet.batchUpdate(spreadsheetId=spreadsheetId, body=body).execute()
+            charts.add(requests)
 
             GRAPH_ROW_INDEX += 20
             start_index, end_index = None, None
 
-            time.sleep(3)
-
-
+    charts.flush()
@@ -1,31 +1,15 @@
 from itertools import groupby
-import re
 from quisby import custom_logger
 from quisby.sheet.sheet_util import (
-    append_to_sheet,
     read_sheet,
-    get_sheet,
-    create_sheet,
-    clear_sheet_data,
-    clear_sheet_charts,
+    get_spreadsheet_title,
+    replace_sheet_contents,
 )
 from quisby.util import merge_lists_alternately, read_config
+from quisby.ordering import extract_prefix_and_number
 
 
 # Helper function to extract prefix and suffix from instance names
-def extract_prefix_and_number(input_string):
-    """
-    Extract the prefix and suffix from an instance name that includes a number.
-    Example: "t2.micro-01" => ("t2.micro", "01")
-    """
-    match = re.search(r'^(.*?)(\d+)(.*?)$', input_string)
-    if match:
-        prefix = match.group(1)
-        suffix = match.group(3)  # Extracts the suffix after the number
-        return prefix, suffix
-    return None, None
-
-
 # Helper function to compare instance names based on cloud type
 def compare_inst(item1, item2):
     """
@@ -56,7 +40,7 @@ def compare_passmark_results(spreadsheets, spreadsheetId, test_name, table_name=
     # Read data from each spreadsheet
     for spreadsheet in spreadsheets:
         values.append(read_sheet(spreadsheet, range=test_name))
-        spreadsheet_name.append(get_sheet(spreadsheet, test_name=test_name)["properties"]["title"])
+        spreadsheet_name.append(get_spreadsheet_title(spreadsheet))
 
     # Group values into segments (non-empty groups)
     for index, value in enumerate(values):
@@ -113,12 +97,8 @@ def compare_passmark_results(spreadsheets, spreadsheetId, test_name, table_name=
 
     # Create the sheet and append the merged results
     try:
-        create_sheet(spreadsheetId, test_name)
-        custom_logger.info("Deleting existing charts and data from the sheet...")
-        clear_sheet_charts(spreadsheetId, test_name)
-        clear_sheet_data(spreadsheetId, test_name)
-        custom_logger.info(f"Appending new {test_name} data to sheet...")
-        append_to_sheet(spreadsheetId, results, test_name)
+        custom_logger.info("Replacing existing charts and data in the sheet...")
+        replace_sheet_contents(spreadsheetId, test_name, results)
     except Exception as exc:
         custom_logger.debug(str(exc))
         custom_logger.error("Failed to append data to sheet")
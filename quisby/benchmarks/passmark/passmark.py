@@ -1,53 +1,8 @@
-import re
-from itertools import groupby
-from scipy.stats import gmean
 from quisby import custom_logger
+from quisby.ordering import group_by_family
 from quisby.util import read_config
 from quisby.pricing.cloud_pricing import get_cloud_pricing
-from quisby.util import process_instance, mk_int
-from quisby.benchmarks.version_util import get_version_info
-
-
-def extract_prefix_and_number(input_string):
-    """
-    Extract the prefix, number, and suffix from an instance name.
-    Example: 't2.micro-01' -> ('t2', 1, '.micro')
-
-    :param input_string: Instance name string (e.g., 't2.micro-01').
-    :return: Tuple (prefix, number, suffix) or (None, None, None) if no match.
-    """
-    match = re.search(r'^(.*?)(\d+)(.*?)$', input_string)
-    if match:
-        prefix = match.group(1)
-        number = int(match.group(2))
-        suffix = match.group(3)
-        return prefix, number, suffix
-    return None, None, None
-
-
-def custom_key(item):
-    """
-    Generate a custom key for sorting/grouping based on the cloud provider type.
-
-    :param item: A tuple containing instance data.
-    :return: A tuple key for grouping/sorting.
-    """
-    cloud_type = read_config("cloud", "cloud_type")
-    try:
-        if item[0] == "local":
-            return item[0]
-        elif cloud_type == "aws":
-            instance_type, instance_number = item[0].split(".")
-            return instance_type, instance_number
-        elif cloud_type == "gcp":
-            instance_type, instance_number = item[0].split("-")
-            return instance_type, int(instance_number)
-        elif cloud_type == "azure":
-            instance_type, version, instance_number = extract_prefix_and_number(item[0])
-            return instance_type, version, instance_number
-    except Exception as exc:
-        custom_logger.error(f"Error in custom_key for {item[0]}: {str(exc)}")
-        return "", ""
+from quisby.benchmarks.version_util import open_result
 
 
 def calc_price_performance(inst, avg):
@@ -71,40 +26,6 @@ def calc_price_performance(inst, avg):
     return cost_per_hour, price_perf
 
 
-def group_data(results):
-    """
-    Group benchmark data based on cloud type and instance characteristics.
-
-    :param results: List of benchmark results.
-    :return: Grouped results.
-    """
-    cloud_type = read_config("cloud", "cloud_type")
-    if cloud_type == "aws":
-        return groupby(results, key=lambda x: process_instance(x[1][0], "family", "version", "feature", "machine_type"))
-    elif cloud_type == "azure":
-        results = sorted(results, key=lambda x: process_instance(x[1][0], "family", "feature"))
-        return groupby(results, key=lambda x: process_instance(x[1][0], "family", "version", "feature"))
-    elif cloud_type == "gcp":
-        return groupby(results, key=lambda x: process_instance(x[1][0], "family", "version", "sub_family", "feature"))
-    elif cloud_type == "local":
-        return groupby(results, key=lambda x: process_instance(x[1][0], "family"))
-
-
-def sort_data(results):
-    """
-    Sort benchmark data based on instance attributes and cloud type.
-
-    :param results: List of benchmark results.
-    """
-    cloud_type = read_config("cloud", "cloud_type")
-    if cloud_type == "aws":
-        results.sort(key=lambda x: str(process_instance(x[1][0], "family")))
-    elif cloud_type == "azure":
-        results.sort(key=lambda x: str(process_instance(x[1][0], "family", "version", "feature")))
-    elif cloud_type == "gcp":
-        results.sort(key=lambda x: str(process_instance(x[1][0], "family", "version", "sub_family")))
-
-
 def create_summary_passmark_data(data, OS_RELEASE):
     """
     Create a summary of PassMark data, including geometric mean and price-performance metrics.
@@ -113,17 +34,15 @@ def create_summary_passmark_data(data, OS_RELEASE):
     :param OS_RELEASE: OS release version (e.g., "Ubuntu 20.04").
     :return: List of summarized results.
     """
+    from scipy.stats import gmean  # deferred, scipy is slow to import
+
     ret_results = []
     results = list(filter(None, data))
-    sort_data(results)
-    results = group_data(results)
 
-    for _, items in results:
+    for _, sorted_data in group_by_family(results, (1, 0)):
         mac_data = [["System name", f"Geomean-{OS_RELEASE}"]]
         cost_data = [["Cost/Hr"]]
         price_perf_data = [["Price-perf", f"Geomean/$-{OS_RELEASE}"]]
-        items = list(items)
-        sorted_data = sorted(items, key=lambda x: mk_int(process_instance(x[1][0], "size")))
 
         cost_per_hour, price_perf = [], []
         # Add summary data
@@ -157,15 +76,15 @@ def create_summary_passmark_data(data, OS_RELEASE):
     return ret_results
 
 
-def _extract_passmark_v1(path, system_name, OS_RELEASE, version_info):
+def _extract_passmark_v1(result_file, system_name, OS_RELEASE, version_info):
     """Extract PassMark data in v1.x format."""
     results = []
+    path = result_file.path
 
     # Extract data from file
     try:
         if path.endswith("results.csv"):
-            with open(path) as file:
-                passmark_results = file.readlines()
+            passmark_results = result_file.body()
         else:
             return None
     except Exception as exc:
@@ -175,23 +94,23 @@ def _extract_passmark_v1(path, system_name, OS_RELEASE, version_info):
     # Add version metadata
     csv_version = version_info['raw'] or '1.0'
 
-    data_index = 0
     header = []
-    for index, data in enumerate(passmark_results):
+    rows = []
+    for data in passmark_results:
         if "NumTestProcesses," in data:
             header = data.strip("\n").split(",")
             # Add CSV Version to header
             header.append("CSV Version")
-            data_index = index
+            # Only the rows after the last header are kept
+            rows = []
         else:
-            passmark_results[index] = data.strip("\n").split(",")
+            rows.append(data.strip("\n").split(","))
 
     # Add csv_version only to the first data row
-    for idx, row in enumerate(passmark_results[data_index + 1:]):
-        if idx == 0 and isinstance(row, list):
-            row.append(csv_version)
+    if rows:
+        rows[0].append(csv_version)
 
-    passmark_results = [header] + passmark_results[data_index + 1:]
+    passmark_results = [header] + rows
     results.append([""])
     results.append([system_name])
     results.extend(passmark_results)
@@ -207,8 +126,9 @@ def extract_passmark_data(path, system_name, OS_RELEASE):
     :param OS_RELEASE: OS release version (e.g., "Ubuntu 20.04").
     :return: Processed results as a list.
     """
-    # Get version information from CSV
-    version_info = get_version_info(path)
+    # Read the CSV file once and get its version information
+    result_file = open_result(path)
+    version_info = result_file.version_info
     normalized_version = version_info['normalized']
 
     custom_logger.debug(
@@ -218,10 +138,10 @@ def extract_passmark_data(path, system_name, OS_RELEASE):
 
     # Dispatch to version-specific handler
     if normalized_version in ['1.0', '1.1']:
-        return _extract_passmark_v1(path, system_name, OS_RELEASE, version_info)
+        return _extract_passmark_v1(result_file, system_name, OS_RELEASE, version_info)
     else:
         # Future: Add elif for version '2.0', '3.0', etc.
         custom_logger.warning(
             f"Unknown CSV version {normalized_version}, attempting v1.x format"
         )
-        return _extract_passmark_v1(path, system_name, OS_RELEASE, version_info)
+        return _extract_passmark_v1(result_file, system_name, OS_RELEASE, version_info)
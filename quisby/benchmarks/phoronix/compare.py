@@ -3,33 +3,12 @@ from itertools import groupby
 from quisby import custom_logger
 from quisby.benchmarks.phoronix.graph import graph_phoronix_data
 from quisby.sheet.sheet_util import (
-    append_to_sheet,
     read_sheet,
-    get_sheet,
-    create_sheet,
-    clear_sheet_data,
-    clear_sheet_charts,
+    get_spreadsheet_title,
+    replace_sheet_contents,
 )
 from quisby.util import merge_lists_alternately, read_config
-import re
-
-
-def extract_prefix_and_number(input_string):
-    """
-    Extracts the prefix and suffix of an instance identifier, separating the numeric part.
-
-    Args:
-        input_string (str): The instance identifier string.
-
-    Returns:
-        tuple: The prefix and suffix extracted from the identifier.
-    """
-    match = re.search(r'^(.*?)(\d+)(.*?)$', input_string)
-    if match:
-        prefix = match.group(1)
-        suffix = match.group(3)  # Extracts the suffix after the number
-        return prefix, suffix
-    return None, None
+from quisby.ordering import extract_prefix_and_number
 
 
 def compare_inst(item1, item2):
@@ -74,7 +53,7 @@ def compare_phoronix_results(spreadsheets, spreadsheetId, test_name, table_name=
     # Read the data from each spreadsheet
     for spreadsheet in spreadsheets:
         values.append(read_sheet(spreadsheet, range=test_name))
-        spreadsheet_name.append(get_sheet(spreadsheet, test_name=test_name)["properties"]["title"])
+        spreadsheet_name.append(get_spreadsheet_title(spreadsheet))
 
     # Group values to segregate by test groups
     for index, value in enumerate(values):
@@ -133,12 +112,8 @@ def compare_phoronix_results(spreadsheets, spreadsheetId, test_name, table_name=
 
     try:
         # Create a new sheet and append the results
-        create_sheet(spreadsheetId, test_name)
-        custom_logger.info("Deleting existing charts and data from the sheet...")
-        clear_sheet_charts(spreadsheetId, test_name)
-        clear_sheet_data(spreadsheetId, test_name)
-        custom_logger.info("Appending new " + test_name + " data to sheet...")
-        append_to_sheet(spreadsheetId, results, test_name)
+        custom_logger.info("Replacing existing charts and data in the sheet...")
+        replace_sheet_contents(spreadsheetId, test_name, results)
     except Exception as exc:
         custom_logger.debug(str(exc))
         custom_logger.error("Failed to append data to sheet")
@@ -1,56 +1,8 @@
-from itertools import groupby
-from scipy.stats import gmean
 from quisby import custom_logger
+from quisby.ordering import group_by_family
 from quisby.util import read_config
 from quisby.pricing.cloud_pricing import get_cloud_pricing
-import re
-from quisby.util import process_instance, mk_int
-from quisby.benchmarks.version_util import get_version_info
-
-
-def extract_prefix_and_number(input_string):
-    """
-    Extracts the prefix, number, and suffix from an input string.
-
-    Args:
-        input_string (str): The string to extract from.
-
-    Returns:
-        tuple: A tuple containing the prefix, the number, and the suffix.
-    """
-    match = re.search(r'^(.*?)(\d+)(.*?)$', input_string)
-    if match:
-        prefix = match.group(1)
-        number = int(match.group(2))
-        suffix = match.group(3)
-        return prefix, number, suffix
-    return None, None, None
-
-
-def custom_key(item):
-    """
-    Creates a custom sorting key based on the cloud provider type.
-
-    Args:
-        item (tuple): A tuple containing instance data.
-
-    Returns:
-        tuple: The sorting key based on instance data.
-    """
-    cloud_type = read_config("cloud", "cloud_type")
-    if item[0] == "local":
-        return item[0]
-    elif cloud_type == "aws":
-        instance_type = item[0].split(".")[0]
-        instance_number = item[0].split(".")[1]
-        return instance_type, instance_number
-    elif cloud_type == "gcp":
-        instance_type = item[0].split("-")[0]
-        instance_number = int(item[0].split('-')[-1])
-        return instance_type, instance_number
-    elif cloud_type == "azure":
-        instance_type, instance_number, version = extract_prefix_and_number(item[0])
-        return instance_type, version, instance_number
+from quisby.benchmarks.version_util import open_result
 
 
 def calc_price_performance(inst, avg):
@@ -77,44 +29,6 @@ def calc_price_performance(inst, avg):
     return cost_per_hour, price_perf
 
 
-def group_data(results):
-    """
-    Groups the data based on the cloud provider type.
-
-    Args:
-        results (list): A list of instance data.
-
-    Returns:
-        groupby: A grouped object containing instance data based on cloud provider type.
-    """
-    cloud_type = read_config("cloud", "cloud_type")
-    if cloud_type == "aws":
-        return groupby(results, key=lambda x: process_instance(x[1][0], "family", "version", "feature", "machine_type"))
-    elif cloud_type == "azure":
-        results = sorted(results, key=lambda x: process_instance(x[1][0], "family", "feature"))
-        return groupby(results, key=lambda x: process_instance(x[1][0], "family", "version", "feature"))
-    elif cloud_type == "gcp":
-        return groupby(results, key=lambda x: process_instance(x[1][0], "family", "version", "sub_family", "feature"))
-    elif cloud_type == "local":
-        return groupby(results, key=lambda x: process_instance(x[1][0], "family"))
-
-
-def sort_data(results):
-    """
-    Sorts the data based on the cloud provider type.
-
-    Args:
-        results (list): A list of instance data.
-    """
-    cloud_type = read_config("cloud", "cloud_type")
-    if cloud_type == "aws":
-        results.sort(key=lambda x: str(process_instance(x[1][0], "family")))
-    elif cloud_type == "azure":
-        results.sort(key=lambda x: str(process_instance(x[1][0], "family", "version", "feature")))
-    elif cloud_type == "gcp":
-        results.sort(key=lambda x: str(process_instance(x[1][0], "family", "version", "sub_family")))
-
-
 def create_summary_phoronix_data(data, OS_RELEASE):
     """
     Creates a summary of Phoronix benchmark data with price/performance and geomean.
@@ -126,21 +40,18 @@ def create_summary_phoronix_data(data, OS_RELEASE):
     Returns:
         list: A list containing the summary data.
     """
+    from scipy.stats import gmean
+
     ret_results = []
 
     # Filter out empty results
     results = list(filter(None, data))
-    sort_data(results)
-    results = group_data(results)
 
     # Loop through each group and calculate the necessary values
-    for _, items in results:
+    for _, sorted_data in group_by_family(results, (1, 0)):
         mac_data = [["System name", "Geomean-" + OS_RELEASE]]
         cost_data = [["Cost/Hr"]]
         price_perf_data = [["Price-perf", f"Geomean/$-{OS_RELEASE}"]]
-
-        items = list(items)
-        sorted_data = sorted(items, key=lambda x: mk_int(process_instance(x[1][0], "size")))
         cost_per_hour, price_per_perf = [], []
 
         # Add summary data for each instance
@@ -176,15 +87,14 @@ def create_summary_phoronix_data(data, OS_RELEASE):
     return ret_results
 
 
-def _extract_phoronix_v1(path, system_name, OS_RELEASE, version_info):
+def _extract_phoronix_v1(result_file, system_name, OS_RELEASE, version_info):
     """Extract Phoronix data in v1.x format."""
     results = []
 
     # Extract data from file
     try:
-        if path.endswith("results.csv"):
-            with open(path) as file:
-                phoronix_results = file.readlines()
+        if result_file.path.endswith("results.csv"):
+            phoronix_results = result_file.body()
         else:
             return None
     except Exception as exc:
@@ -195,24 +105,24 @@ def _extract_phoronix_v1(path, system_name, OS_RELEASE, version_info):
     csv_version = version_info['raw'] or '1.0'
 
     # Extract header and data
-    data_index = 0
     header = []
-    for index, data in enumerate(phoronix_results):
+    rows = []
+    for data in phoronix_results:
         if "Test,BOPs" in data:
-            data_index = index
             header = data.strip("\n").split(",")
             # Add CSV Version to header
             header.append("CSV Version")
+            # Only the rows after the last header are kept
+            rows = []
         else:
-            phoronix_results[index] = data.strip("\n").split(",")
+            rows.append(data.strip("\n").split(","))
 
     # Add csv_version only to the first data row
-    for idx, row in enumerate(phoronix_results[data_index + 1:]):
-        if idx == 0 and isinstance(row, list):
-            row.append(csv_version)
+    if rows:
+        rows[0].append(csv_version)
 
     # Combine header and data, and append the system name
-    phoronix_results = [header] + phoronix_results[data_index + 1:]
+    phoronix_results = [header] + rows
     results.append([""])
     results.append([system_name])
     results.extend(phoronix_results[1:])
@@ -232,8 +142,9 @@ def extract_phoronix_data(path, system_name, OS_RELEASE):
     Returns:
         list: A list containing the extracted data.
     """
-    # Get version information from CSV
-    version_info = get_version_info(path)
+    # Read the CSV file once and get its version information
+    result_file = open_result(path)
+    version_info = result_file.version_info
     normalized_version = version_info['normalized']
 
     custom_logger.debug(
@@ -243,10 +154,10 @@ def extract_phoronix_data(path, system_name, OS_RELEASE):
 
     # Dispatch to version-specific handler
     if normalized_version in ['1.0', '1.1']:
-        return _extract_phoronix_v1(path, system_name, OS_RELEASE, version_info)
+        return _extract_phoronix_v1(result_file, system_name, OS_RELEASE, version_info)
     else:
         # Future: Add elif for version '2.0', '3.0', etc.
         custom_logger.warning(
             f"Unknown CSV version {normalized_version}, attempting v1.x format"
         )
-        return _extract_phoronix_v1(path, system_name, OS_RELEASE, version_info)
+        return _extract_phoronix_v1(result_file, system_name, OS_RELEASE, version_info)
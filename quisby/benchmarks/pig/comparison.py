@@ -2,10 +2,9 @@ from itertools import groupby
 
 from quisby import custom_logger
 from quisby.sheet.sheet_util import (
-    append_to_sheet,
     read_sheet,
-    get_sheet,
-    create_sheet, clear_sheet_data, clear_sheet_charts,
+    get_spreadsheet_title,
+    replace_sheet_contents,
 )
 from quisby.util import combine_two_array_alternating
 
@@ -18,7 +17,7 @@ def compare_pig_results(spreadsheets, spreadsheetId, test_name):
 
     for spreadsheet in spreadsheets:
         values.append(read_sheet(spreadsheet, range=test_name))
-        spreadsheet_name.append(get_sheet(spreadsheet, test_name)["properties"]["title"])
+        spreadsheet_name.append(get_spreadsheet_title(spreadsheet))
 
     for index, value in enumerate(values):
         values[index] = (list(g) for k, g in groupby(value, key=lambda x: x != []) if k)
@@ -31,15 +30,11 @@ def compare_pig_results(spreadsheets, spreadsheetId, test_name):
         for ele in list_2:
             if value[0] == ele[0]:
                 results.append(value[0])
-                results = combine_two_array_alternating(results, value[1:], ele[1:])
+                results = combine_two_array_alternating(results, value[1:], ele[1:], test_name)
 
     try:
-        create_sheet(spreadsheetId, test_name)
-        custom_logger.info("Deleting existing charts and data from the sheet...")
-        clear_sheet_charts(spreadsheetId, test_name)
-        clear_sheet_data(spreadsheetId, test_name)
-        custom_logger.info("Appending new " + test_name + " data to sheet...")
-        append_to_sheet(spreadsheetId, results, test_name)
+        custom_logger.info("Replacing existing charts and data in the sheet...")
+        replace_sheet_contents(spreadsheetId, test_name, results)
     except Exception as exc:
         custom_logger.debug(str(exc))
         custom_logger.error("Failed to append data to sheet")
@@ -1,4 +1,5 @@
 from quisby import custom_logger
+from quisby.benchmarks.version_util import open_result
 
 from quisby.pricing.cloud_pricing import get_cloud_cpu_count
 from quisby.util import read_config
@@ -14,15 +15,14 @@ def extract_pig_data(path, system_name, OS_RELEASE):
     data_index = 0
 
     try:
-        with open(path) as file:
-            pig_results = file.readlines()
-            for index, data in enumerate(pig_results):
-                if "#threads sched_eff" in data:
-                    data_index = index
-                    header = data.strip("\n")
-                else:
-                    result_data.append(data.strip("\n").split(":"))
-            result_data = result_data[data_index :]
+        pig_results = open_result(path).body()
+        for index, data in enumerate(pig_results):
+            if "#threads sched_eff" in data:
+                data_index = index
+                header = data.strip("\n")
+            else:
+                result_data.append(data.strip("\n").split(":"))
+        result_data = result_data[data_index :]
     except Exception as exc:
         custom_logger.error(str(exc))
         return None
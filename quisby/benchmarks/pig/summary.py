@@ -1,23 +1,12 @@
 from itertools import groupby
 
-from quisby.util import mk_int, process_instance
+from quisby.ordering import SERIES_FIELDS, group_by_family
 
 
 def pig_sort_data_by_system_family(results):
-    sorted_result = []
-
     results = [list(g) for k, g in groupby(results, key=lambda x: x != [""]) if k]
 
-    results.sort(key=lambda x: str(process_instance(x[0][0], "family", "version", "feature")))
-
-    for _, items in groupby(results, key=lambda x: process_instance(x[0][0], "family", "version", "feature")):
-        sorted_result.append(
-            sorted(
-                list(items), key=lambda x: mk_int(process_instance(x[0][0], "size"))
-            )
-        )
-
-    return sorted_result
+    return [items for _, items in group_by_family(results, (0, 0), SERIES_FIELDS)]
 
 
 def create_summary_pig_data(pig_data, os_release):
@@ -1,37 +1,15 @@
-import re
 from itertools import groupby
 from quisby import custom_logger
 from quisby.sheet.sheet_util import (
-    append_to_sheet,
     read_sheet,
-    get_sheet,
-    create_sheet,
-    clear_sheet_data,
-    clear_sheet_charts,
+    get_spreadsheet_title,
+    replace_sheet_contents,
 )
 from quisby.util import merge_lists_alternately, read_config
+from quisby.ordering import extract_prefix_and_number
 
 
 # Helper function to extract prefix and suffix from instance names
-def extract_prefix_and_number(input_string):
-    """
-    Extract the prefix and suffix from an instance name that contains a number.
-    Example: "t2.micro-01" => ("t2.micro", "01")
-
-    Args:
-        input_string (str): Instance name, e.g., "t2.micro-01"
-
-    Returns:
-        tuple: (prefix, suffix) or (None, None) if no match
-    """
-    match = re.search(r'^(.*?)(\d+)(.*?)$', input_string)
-    if match:
-        prefix = match.group(1)
-        suffix = match.group(3)
-        return prefix, suffix
-    return None, None
-
-
 # Compare two instance types based on cloud configuration
 def compare_inst(item1, item2):
     """
@@ -81,7 +59,7 @@ def compare_pyperf_results(spreadsheets, spreadsheetId, test_name, table_name=["
     try:
         for spreadsheet in spreadsheets:
             values.append(read_sheet(spreadsheet, range=test_name))
-            spreadsheet_names.append(get_sheet(spreadsheet, test_name=test_name)["properties"]["title"])
+            spreadsheet_names.append(get_spreadsheet_title(spreadsheet))
     except Exception as exc:
         custom_logger.error(f"Error reading sheets: {exc}")
         return spreadsheetId
@@ -140,12 +118,8 @@ def compare_pyperf_results(spreadsheets, spreadsheetId, test_name, table_name=["
 
     # Write the results back to the sheet
     try:
-        create_sheet(spreadsheetId, test_name)
-        custom_logger.info("Deleting existing charts and data from the sheet...")
-        clear_sheet_charts(spreadsheetId, test_name)
-        clear_sheet_data(spreadsheetId, test_name)
-        custom_logger.info(f"Appending new {test_name} data to sheet...")
-        append_to_sheet(spreadsheetId, results, test_name)
+        custom_logger.info("Replacing existing charts and data in the sheet...")
+        replace_sheet_contents(spreadsheetId, test_name, results)
     except Exception as exc:
         custom_logger.debug(f"Error during sheet operations: {exc}")
         custom_logger.error("Failed to append data to sheet")
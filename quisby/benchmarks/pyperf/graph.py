@@ -1,9 +1,7 @@
-import time
 
-from quisby.formatting.add_formatting import update_conditional_formatting
-from quisby.sheet.sheet_util import read_sheet, get_sheet, append_empty_row_sheet
-from quisby.sheet.sheetapi import sheet
-from quisby.util import read_value
+from quisby.formatting.add_formatting import ConditionalFormatBuilder
+from quisby.sheet.sheet_util import ChartWriter, read_sheet, get_sheet_id, append_empty_row_sheet
+from quisby.util import get_threshold
 
 
 def create_series_range_list_pyperf_process(column_count, sheetId, start_index, end_index):
@@ -102,6 +100,7 @@ def graph_pyperf_data(spreadsheetId, range, action):
     if len(data) > 500:
         append_empty_row_sheet(spreadsheetId, 3000, range)
 
+    charts = ChartWriter(spreadsheetId)
     for index, row in enumerate(data):
         for col in row:
             if "System name" in col:
@@ -127,9 +126,7 @@ def graph_pyperf_data(spreadsheetId, range, action):
             graph_data = data[start_index:end_index]
             column_count = len(graph_data[0])
 
-            sheetId = get_sheet(spreadsheetId, range)["sheets"][0]["properties"][
-                "sheetId"
-            ]
+            sheetId = get_sheet_id(spreadsheetId, range)
 
             series = globals()[f'create_series_range_list_pyperf_{action}'](column_count, sheetId, start_index, end_index)
 
@@ -212,17 +209,16 @@ def graph_pyperf_data(spreadsheetId, range, action):
             else:
                 GRAPH_COL_INDEX += 6
 
-            body = {"requests": requests}
-
-            sheet.batchUpdate(spreadsheetId=spreadsheetId, body=body).execute()
+            charts.add(requests)
 
             # Reset variables
             start_index, end_index = 0, 0
 
-            time.sleep(3)
+    charts.flush()
+
     if sheetId != -1:
-        threshold = read_value("percent_threshold", range)
-        if not threshold:
-            threshold = "5"
+        threshold = get_threshold(range)
+        formatting = ConditionalFormatBuilder(spreadsheetId, range, len(data))
         for col in diff_col:
-            update_conditional_formatting(spreadsheetId, sheetId, col, threshold)
\ No newline at end of file
+            formatting.add_diff_rule(col, threshold)
+        formatting.flush()
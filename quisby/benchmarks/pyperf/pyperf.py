@@ -1,53 +1,8 @@
-from itertools import groupby
-from scipy.stats import gmean
 from quisby import custom_logger
+from quisby.benchmarks.version_util import open_result
+from quisby.ordering import group_by_family
 from quisby.util import read_config
 from quisby.pricing.cloud_pricing import get_cloud_pricing
-import re
-from quisby.util import process_instance, mk_int
-
-
-def extract_prefix_and_number(input_string):
-    """
-    Extracts the prefix, numeric part, and suffix from a string.
-
-    Args:
-        input_string (str): The input string containing the prefix, number, and suffix.
-
-    Returns:
-        tuple: A tuple containing the prefix, number, and suffix. If the pattern isn't matched, returns None values.
-    """
-    match = re.search(r'^(.*?)(\d+)(.*?)$', input_string)
-    if match:
-        prefix = match.group(1)
-        number = int(match.group(2))
-        suffix = match.group(3)
-        return prefix, number, suffix
-    return None, None, None
-
-
-def custom_key(item):
-    """
-    Custom sorting key function based on cloud type and instance details.
-
-    Args:
-        item (tuple): Tuple where the first element is the instance identifier.
-
-    Returns:
-        tuple: A tuple representing the instance sorting key.
-    """
-    cloud_type = read_config("cloud", "cloud_type")
-    if item[0] == "local":
-        return item[0]
-    elif cloud_type == "aws":
-        instance_type, instance_number = item[0].split(".")
-        return instance_type, instance_number
-    elif cloud_type == "gcp":
-        instance_type, instance_number = item[0].split('-')[0], int(item[0].split('-')[-1])
-        return instance_type, instance_number
-    elif cloud_type == "azure":
-        instance_type, version, instance_number = extract_prefix_and_number(item[0])
-        return instance_type, version, instance_number
 
 
 def calc_price_performance(inst, avg):
@@ -75,44 +30,6 @@ def calc_price_performance(inst, avg):
     return cost_per_hour, price_perf
 
 
-def group_data(results):
-    """
-    Groups the data based on cloud type and instance characteristics.
-
-    Args:
-        results (list): List of result items.
-
-    Returns:
-        groupby object: Grouped data based on cloud type and instance characteristics.
-    """
-    cloud_type = read_config("cloud", "cloud_type")
-    if cloud_type == "aws":
-        return groupby(results, key=lambda x: process_instance(x[1][0], "family", "version", "feature", "machine_type"))
-    elif cloud_type == "azure":
-        results = sorted(results, key=lambda x: process_instance(x[1][0], "family", "feature"))
-        return groupby(results, key=lambda x: process_instance(x[1][0], "family", "version", "feature"))
-    elif cloud_type == "gcp":
-        return groupby(results, key=lambda x: process_instance(x[1][0], "family", "version", "sub_family", "feature"))
-    elif cloud_type == "local":
-        return groupby(results, key=lambda x: process_instance(x[1][0], "family"))
-
-
-def sort_data(results):
-    """
-    Sorts the results data based on cloud type.
-
-    Args:
-        results (list): List of result items to be sorted.
-    """
-    cloud_type = read_config("cloud", "cloud_type")
-    if cloud_type == "aws":
-        results.sort(key=lambda x: str(process_instance(x[1][0], "family")))
-    elif cloud_type == "azure":
-        results.sort(key=lambda x: str(process_instance(x[1][0], "family", "version", "feature")))
-    elif cloud_type == "gcp":
-        results.sort(key=lambda x: str(process_instance(x[1][0], "family", "version", "sub_family")))
-
-
 def create_summary_pyperf_data(data, OS_RELEASE):
     """
     Creates a summary of performance data for a given OS release.
@@ -124,17 +41,15 @@ def create_summary_pyperf_data(data, OS_RELEASE):
     Returns:
         list: Summary results including the system name, geomean values, cost per hour, and price performance.
     """
+    from scipy.stats import gmean  # slow import, only needed here
+
     ret_results = []
 
     results = list(filter(None, data))
-    sort_data(results)
-    results = group_data(results)
-    for _, items in results:
+    for _, sorted_data in group_by_family(results, (1, 0)):
         mac_data = [["System name", "Geomean-" + OS_RELEASE]]
         cost_data = [["Cost/Hr"]]
         price_perf_data = [["Price-perf", f"Geomean/$-{OS_RELEASE}"]]
-        items = list(items)
-        sorted_data = sorted(items, key=lambda x: mk_int(process_instance(x[1][0], "size")))
         cost_per_hour, price_per_perf = [], []
 
         # Add summary data
@@ -184,8 +99,7 @@ def extract_pyperf_data(path, system_name, OS_RELEASE):
     # Extract data from file
     try:
         if path:
-            with open(path) as file:
-                pyperf_results = file.readlines()
+            pyperf_results = open_result(path).body()
         else:
             return None
     except Exception as exc:
@@ -193,15 +107,16 @@ def extract_pyperf_data(path, system_name, OS_RELEASE):
         return None
 
     # Process the pyperf data
-    data_index = 0
-    for index, data in enumerate(pyperf_results):
+    rows = []
+    for data in pyperf_results:
         if "Test:Avg:Unit" in data:
-            data_index = index
             header = data.strip("\n").split(":")
+            # Only the rows after the last header are kept
+            rows = []
         else:
-            pyperf_results[index] = data.strip("\n").split(":")
+            rows.append(data.strip("\n").split(":"))
 
-    pyperf_results = [header] + pyperf_results[data_index + 1:]
+    pyperf_results = [header] + rows
     results.append([""])
     results.append([system_name])
     results.extend(pyperf_results[1:])
@@ -1,7 +1,4 @@
-import time
-
-from quisby.sheet.sheetapi import sheet
-from quisby.sheet.sheet_util import read_sheet, get_sheet,append_empty_row_sheet
+from quisby.sheet.sheet_util import ChartWriter, read_sheet, get_sheet_id,append_empty_row_sheet
 
 
 def create_series_range_boot(column_count, sheetId, start_index, end_index):
@@ -41,6 +38,7 @@ def graph_boot_data(spreadsheetId, test_name, action):
     if len(data) > 500:
         append_empty_row_sheet(spreadsheetId, 3000, test_name)
 
+    charts = ChartWriter(spreadsheetId)
     for index, row in enumerate(data):
         if row[0] == "System name" and start_index is None:
             start_index = index
@@ -56,9 +54,7 @@ def graph_boot_data(spreadsheetId, test_name, action):
             graph_data = data[start_index:end_index]
             column_count = len(graph_data[0])
 
-            sheetId = get_sheet(spreadsheetId, test_name)["sheets"][0]["properties"][
-                "sheetId"
-            ]
+            sheetId = get_sheet_id(spreadsheetId, test_name)
             subtitle = graph_data[1][0].split(".")[0]
             requests = {
                 "addChart": {
@@ -132,10 +128,8 @@ def graph_boot_data(spreadsheetId, test_name, action):
             else:
                 GRAPH_COL_INDEX += 6
 
-            body = {"requests": requests}
-
-            sheet.batchUpdate(spreadsheetId=spreadsheetId, body=body).execute()
+            charts.add(requests)
 
             start_index, end_index = None, None
 
-            time.sleep(3)
\ No newline at end of file
+    charts.flush()
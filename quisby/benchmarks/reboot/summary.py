@@ -1,6 +1,6 @@
 from itertools import groupby
 
-from quisby.util import mk_int, process_instance
+from quisby.ordering import sort_by_size
 
 
 def create_summary_boot_data(results,os_release):
@@ -11,7 +11,7 @@ def create_summary_boot_data(results,os_release):
     results = [row for row in results if row[0] != "System name"]
 
     for _, items in groupby(sorted(results), key=lambda x: x[0].split(".")[0]):
-        sorted_data= sorted(list(items), key=lambda x: mk_int(process_instance(x[0], "size")))
+        sorted_data = sort_by_size(list(items), (0,))
         # sorted_results += sorted(
         #     list(items), key=lambda x: int(x[0].split(".")[1].split("x")[0])
         # )
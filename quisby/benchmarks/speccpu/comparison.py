@@ -3,24 +3,14 @@ from itertools import groupby
 from quisby import custom_logger
 from quisby.benchmarks.speccpu.graph import graph_speccpu_data
 from quisby.sheet.sheet_util import (
-    append_to_sheet,
     read_sheet,
-    get_sheet,
-    create_sheet, clear_sheet_data, clear_sheet_charts,
+    get_spreadsheet_title,
+    replace_sheet_contents,
 )
 from quisby.util import combine_two_array_alternating
 from quisby.util import combine_two_array_alternating, merge_lists_alternately, read_config
+from quisby.ordering import extract_prefix_and_number
 from quisby.benchmarks.coremark.graph import graph_coremark_data
-import re
-
-def extract_prefix_and_number(input_string):
-    match = re.search(r'^(.*?)(\d+)(.*?)$', input_string)
-    if match:
-        prefix = match.group(1)
-        suffix = match.group(3)  # Extracts the suffix after the number
-        return prefix, suffix
-    return None, None
-
 
 def compare_inst(item1, item2):
     cloud_type = read_config("cloud", "cloud_type")
@@ -43,7 +33,7 @@ def compare_speccpu_results(spreadsheets, spreadsheetId, test_name):
 
     for spreadsheet in spreadsheets:
         values.append(read_sheet(spreadsheet, range=test_name))
-        spreadsheet_name.append(get_sheet(spreadsheet, test_name=test_name)["properties"]["title"])
+        spreadsheet_name.append(get_spreadsheet_title(spreadsheet))
 
     for index, value in enumerate(values):
         values[index] = (list(g) for k, g in groupby(value, key=lambda x: x != []) if k)
@@ -81,12 +71,8 @@ def compare_speccpu_results(spreadsheets, spreadsheetId, test_name):
                                 results = merge_lists_alternately(results, item1, item2)
                     break
     try:
-        create_sheet(spreadsheetId, test_name)
-        custom_logger.info("Deleting existing charts and data from the sheet...")
-        clear_sheet_charts(spreadsheetId, test_name)
-        clear_sheet_data(spreadsheetId, test_name)
-        custom_logger.info("Appending new " + test_name + " data to sheet...")
-        append_to_sheet(spreadsheetId, results, test_name)
+        custom_logger.info("Replacing existing charts and data in the sheet...")
+        replace_sheet_contents(spreadsheetId, test_name, results)
         #graph_speccpu_data(spreadsheetId, test_name, "compare")
     except Exception as exc:
         custom_logger.debug(str(exc))
@@ -3,15 +3,14 @@ import csv
 from quisby import custom_logger
 
 from quisby.util import read_config
-from quisby.benchmarks.version_util import get_version_info
+from quisby.benchmarks.version_util import open_result
 
 
-def _process_speccpu_v1(path, system_name, suite, OS_RELEASE, version_info):
+def _process_speccpu_v1(result_file, system_name, suite, OS_RELEASE, version_info):
     """Process SPECCPU data in v1.x format."""
     results = []
 
-    with open(path) as csv_file:
-        speccpu_results = list(csv.DictReader(csv_file, delimiter=","))
+    speccpu_results = list(csv.DictReader(result_file.body(), delimiter=","))
 
     # Add version metadata
     csv_version = version_info['raw'] or '1.0'
@@ -39,8 +38,9 @@ def extract_speccpu_data(path, system_name, OS_RELEASE):
     Dispatches to appropriate handler based on CSV version.
     Supports backward compatibility for older CSV formats.
     """
-    # Get version information from CSV
-    version_info = get_version_info(path)
+    # Read the CSV file once and get its version information
+    result_file = open_result(path)
+    version_info = result_file.version_info
     normalized_version = version_info['normalized']
 
     custom_logger.debug(
@@ -52,10 +52,10 @@ def extract_speccpu_data(path, system_name, OS_RELEASE):
     # Dispatch to version-specific handler
     if normalized_version in ['1.0', '1.1']:
         if "fprate" in path:
-            fp_results = _process_speccpu_v1(path, system_name, "fprate", OS_RELEASE, version_info)
+            fp_results = _process_speccpu_v1(result_file, system_name, "fprate", OS_RELEASE, version_info)
             results += fp_results
         elif "intrate" in path:
-            int_results = _process_speccpu_v1(path, system_name, "intrate", OS_RELEASE, version_info)
+            int_results = _process_speccpu_v1(result_file, system_name, "intrate", OS_RELEASE, version_info)
             results += int_results
     else:
         # Future: Add elif for version '2.0', '3.0', etc.
@@ -63,10 +63,10 @@ def extract_speccpu_data(path, system_name, OS_RELEASE):
             f"Unknown CSV version {normalized_version}, attempting v1.x format"
         )
         if "fprate" in path:
-            fp_results = _process_speccpu_v1(path, system_name, "fprate", OS_RELEASE, version_info)
+            fp_results = _process_speccpu_v1(result_file, system_name, "fprate", OS_RELEASE, version_info)
             results += fp_results
         elif "intrate" in path:
-            int_results = _process_speccpu_v1(path, system_name, "intrate", OS_RELEASE, version_info)
+            int_results = _process_speccpu_v1(result_file, system_name, "intrate", OS_RELEASE, version_info)
             results += int_results
 
     return results
@@ -1,9 +1,7 @@
-import time
 
-from quisby.formatting.add_formatting import update_conditional_formatting
-from quisby.sheet.sheet_util import read_sheet, get_sheet, append_empty_row_sheet
-from quisby.sheet.sheetapi import sheet
-from quisby.util import read_value
+from quisby.formatting.add_formatting import ConditionalFormatBuilder
+from quisby.sheet.sheet_util import ChartWriter, read_sheet, get_sheet_id, append_empty_row_sheet
+from quisby.util import get_threshold
 
 
 def create_series_range_speccpu_process(column_count, sheetId, start_index, end_index):
@@ -101,6 +99,7 @@ def graph_speccpu_data(spreadsheetId, test_name, action):
     if len(data) > 500:
         append_empty_row_sheet(spreadsheetId, 3000, test_name)
 
+    charts = ChartWriter(spreadsheetId)
     for index, row in enumerate(data):
         if "System name" in row:
             start_index = index
@@ -125,9 +124,7 @@ def graph_speccpu_data(spreadsheetId, test_name, action):
             graph_data = data[start_index:end_index]
             column_count = len(graph_data[1])
 
-            sheetId = get_sheet(spreadsheetId, test_name)["sheets"][0]["properties"][
-                "sheetId"
-            ]
+            sheetId = get_sheet_id(spreadsheetId, test_name)
 
             series = globals()[f'create_series_range_speccpu_{action}'](column_count, sheetId, start_index, end_index)
 
@@ -212,19 +209,18 @@ def graph_speccpu_data(spreadsheetId, test_name, action):
             else:
                 GRAPH_COL_INDEX += 6
 
-            body = {"requests": requests}
-
-            sheet.batchUpdate(spreadsheetId=spreadsheetId, body=body).execute()
+            charts.add(requests)
 
             start_index, end_index = None, None
 
-            time.sleep(3)
+    charts.flush()
+
     if sheetId != -1:
-        threshold = read_value("percent_threshold", test_name)
-        if not threshold:
-            threshold = "5"
+        threshold = get_threshold(test_name)
+        formatting = ConditionalFormatBuilder(spreadsheetId, test_name, len(data))
         for col in diff_col:
-            update_conditional_formatting(spreadsheetId, sheetId, col, threshold)
+            formatting.add_diff_rule(col, threshold)
+        formatting.flush()
 
 
 
@@ -1,50 +1,17 @@
-import re
 from itertools import groupby
 
-from quisby.util import mk_int, process_instance, read_config
+from quisby.ordering import group_by_family
+from quisby.util import read_config
 from quisby import custom_logger
 from quisby.pricing.cloud_pricing import get_cloud_pricing
-from scipy.stats import gmean
 
-
-def extract_prefix_and_number(input_string):
-    match = re.search(r'^(.*?)(\d+)(.*?)$', input_string)
-    if match:
-        prefix = match.group(1)
-        number = int(match.group(2))
-        suffix = match.group(3)
-        return prefix, number, suffix
-    return None, None, None
-
-
-def custom_key(item):
-    cloud_type = read_config("cloud","cloud_type")
-    if item[0][0] == "local":
-        return item[0][0]
-    elif cloud_type == "aws":
-        instance_type =item[0][0].split(".")[0]
-        instance_number = item[0][0].split(".")[1]
-        return instance_type, instance_number
-    elif cloud_type == "gcp":
-         instance_type = item[0][0].split("-")[0]
-         instance_number = int(item[0][0].split('-')[-1])
-         return instance_type, instance_number
-    elif cloud_type == "azure":
-        instance_type, instance_number, version=extract_prefix_and_number(item[0][0])
-        return instance_type, version, instance_number
-
-
-def group_data(results):
-    cloud_type = read_config("cloud", "cloud_type")
-    if cloud_type == "aws":
-        return groupby(results, key=lambda x: process_instance(x[0][0], "family", "feature", "machine_type"))
-    elif cloud_type == "azure":
-        results = sorted(results, key=lambda x: process_instance(x[0][0], "family", "feature"))
-        return groupby(results, key=lambda x: process_instance(x[0][0], "family", "feature"))
-    elif cloud_type == "gcp":
-        return groupby(results, key=lambda x: process_instance(x[0][0], "family","sub_family","feature"))
-    elif cloud_type == "local":
-        return groupby(results, key=lambda x: process_instance(x[0][0], "family"))
+# SPEC CPU results are grouped across instance generations
+FAMILY_FIELDS = {
+    "aws": ("family", "feature", "machine_type"),
+    "azure": ("family", "feature"),
+    "gcp": ("family", "sub_family", "feature"),
+    "local": ("family",),
+}
 
 
 def calc_price_performance(inst, avg):
@@ -63,18 +30,18 @@ def calc_price_performance(inst, avg):
 
 
 def create_summary_speccpu_data(results, OS_RELEASE):
+    from scipy.stats import gmean
+
     sorted_result = []
     results = [list(g) for k, g in groupby(results, key=lambda x: x != [""]) if k]
     sorted_result =  list(filter(None, results))
     results = []
-    for _,items in group_data(sorted_result):
+    for _, sorted_data in group_by_family(sorted_result, (0, 0), FAMILY_FIELDS):
         cost_per_hour, price_perf_int, price_perf_float = [], [], []
         gmean_results_intrate = []
         gmean_results_fprate = []
         start_index = 0
         test = ""
-        items = list(items)
-        sorted_data = sorted(items, key=lambda x: mk_int(process_instance(x[0][0], "size")))
         for item in sorted_data:
             i_gmean = []
             f_gmean = []
@@ -1,13 +1,12 @@
-import time
 
 from quisby import custom_logger
-from quisby.formatting.add_formatting import update_conditional_formatting
+from quisby.formatting.add_formatting import ConditionalFormatBuilder
 from quisby.sheet.sheet_util import (
+    ChartWriter,
     read_sheet,
-    get_sheet, append_empty_row_sheet
+    get_sheet_id, append_empty_row_sheet
 )
-from quisby.sheet.sheetapi import sheet
-from quisby.util import read_value
+from quisby.util import get_threshold
 
 
 def create_series_range_list_specjbb_process(column_count, sheetId, start_index, end_index):
@@ -105,6 +104,7 @@ def graph_specjbb_data(spreadsheetId, range, action):
     if len(data) > 500:
         append_empty_row_sheet(spreadsheetId, 3000, range)
 
+    charts = ChartWriter(spreadsheetId)
     for index, row in enumerate(data):
         try:
             if "Peak" in row:
@@ -129,9 +129,7 @@ def graph_specjbb_data(spreadsheetId, range, action):
                 graph_data = data[start_index:end_index]
                 column_count = len(graph_data[0])
 
-                sheetId = get_sheet(spreadsheetId, range)["sheets"][0]["properties"][
-                    "sheetId"
-                ]
+                sheetId = get_sheet_id(spreadsheetId, range)
 
                 series = globals()[f'create_series_range_list_specjbb_{action}'](column_count, sheetId, start_index, end_index)
 
@@ -217,21 +215,19 @@ def graph_specjbb_data(spreadsheetId, range, action):
                 else:
                     GRAPH_COL_INDEX += 6
 
-                body = {"requests": requests}
-
-                sheet.batchUpdate(spreadsheetId=spreadsheetId, body=body).execute()
+                charts.add(requests)
 
                 # Reset variables
                 start_index, end_index = 0, 0
-
-                time.sleep(3)
         except Exception as exc:
             custom_logger.debug(str(exc))
             custom_logger.error("Unable to graph specjbb data")
 
+    charts.flush()
+
     if sheetId != -1:
-        threshold = read_value("percent_threshold", range)
-        if not threshold:
-            threshold = "5"
+        threshold = get_threshold(range)
+        formatting = ConditionalFormatBuilder(spreadsheetId, range, len(data))
         for col in diff_col:
-            update_conditional_formatting(spreadsheetId, sheetId, col, threshold)
\ No newline at end of file
+            formatting.add_diff_rule(col, threshold)
+        formatting.flush()
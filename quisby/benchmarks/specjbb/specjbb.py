@@ -1,64 +1,10 @@
 import csv
-import re
-from itertools import groupby
 
 from quisby import custom_logger
+from quisby.ordering import group_by_family
 from quisby.pricing.cloud_pricing import get_cloud_pricing
-from quisby.util import mk_int, process_instance, read_config
-from quisby.benchmarks.version_util import get_version_info
-
-
-def extract_prefix_and_number(input_string):
-    match = re.search(r'^(.*?)(\d+)(.*?)$', input_string)
-    if match:
-        prefix = match.group(1)
-        number = int(match.group(2))
-        suffix = match.group(3)
-        return prefix, number, suffix
-    return None, None, None
-
-
-def custom_key(item):
-    cloud_type = read_config("cloud", "cloud_type")
-    if item[1][0] == "local":
-        return item[1][0]
-    elif cloud_type == "aws":
-        instance_type =item[1][0].split(".")[0]
-        instance_number = item[1][0].split(".")[1]
-        return instance_type, instance_number
-    elif cloud_type == "gcp":
-         instance_type = item[1][0].split("-")[0]
-         instance_number = int(item[1][0].split('-')[-1])
-         return instance_type, instance_number
-    elif cloud_type == "azure":
-        instance_type, instance_number, version= extract_prefix_and_number(item[1][0])
-        return instance_type,version, instance_number
-
-
-def group_data(results):
-    cloud_type = read_config("cloud", "cloud_type")
-    if cloud_type == "aws":
-        return groupby(results, key=lambda x: process_instance(x[1][0], "family", "version", "feature", "machine_type"))
-    elif cloud_type == "azure":
-        results = sorted(results, key=lambda x: process_instance(x[1][0], "family", "feature"))
-        return groupby(results, key=lambda x: process_instance(x[1][0], "family", "version", "feature"))
-    elif cloud_type == "gcp":
-        return groupby(results, key=lambda x: process_instance(x[1][0], "family", "version","sub_family","feature"))
-    elif cloud_type == "local":
-        return groupby(results, key=lambda x: process_instance(x[1][0], "family"))
-
-def specjbb_sort_data_by_system_family(results):
-    results.sort(key=lambda x: str(process_instance(
-        x[1][0], "family", "version", "feature")))
-
-
-    # for _, items in groupby(results, key=lambda x: process_instance(x[1][0], "family", "version", "feature")):
-    #     sorted_result.append(
-    #         sorted(list(items), key=lambda x: mk_int(
-    #             process_instance(x[1][0], "size")))
-    #     )
-
-    return results
+from quisby.util import read_config
+from quisby.benchmarks.version_util import open_result
 
 
 def calc_peak_throughput_peak_efficiency(data):
@@ -77,29 +23,14 @@ def calc_peak_throughput_peak_efficiency(data):
     return peak_throughput, cost_per_hour, peak_efficiency
 
 
-
-def sort_data(results):
-    cloud_type = read_config("cloud", "cloud_type")
-    if cloud_type == "aws":
-        results.sort(key=lambda x: str(process_instance(x[1][0], "family")))
-    elif cloud_type == "azure":
-        results.sort(key=lambda x: str(process_instance(x[1][0], "family", "version", "feature")))
-    elif cloud_type == "gcp":
-        results.sort(key=lambda x: str(process_instance(x[1][0], "family", "version", "sub_family")))
-
 def create_summary_specjbb_data(specjbb_data, OS_RELEASE):
     """"""
 
     results = []
-    specjbb_data = specjbb_sort_data_by_system_family(specjbb_data)
     specjbb_data = list(filter(None, specjbb_data))
-    sort_data(specjbb_data)
-    specjbb_data = group_data(specjbb_data)
 
-    for _,items in specjbb_data:
-        items = list(items)
+    for _, sorted_data in group_by_family(specjbb_data, (1, 0)):
         peak_throughput, cost_per_hour, peak_efficiency = [], [], []
-        sorted_data = sorted(items, key=lambda x: mk_int(process_instance(x[1][0], "size")))
         for item in sorted_data:
             results.extend(item)
             try:
@@ -124,16 +55,15 @@ def create_summary_specjbb_data(specjbb_data, OS_RELEASE):
     return results
 
 
-def _extract_specjbb_v1(path, system_name, OS_RELEASE, version_info):
+def _extract_specjbb_v1(result_file, system_name, OS_RELEASE, version_info):
     """Extract SPECJBB data in v1.x format."""
     csv_version = version_info['raw'] or '1.0'
     results = [[""], [system_name], ["Warehouses", f"Thrput-{OS_RELEASE}", "CSV Version"]]
 
     # File read
     try:
-        if path.endswith(".csv"):
-            with open(path) as csv_file:
-                specjbb_results = csv_file.readlines()
+        if result_file.path.endswith(".csv"):
+            specjbb_results = list(result_file.body())
         else:
             return None
     except Exception as exc:
@@ -177,8 +107,9 @@ def extract_specjbb_data(path, system_name, OS_RELEASE):
     Dispatches to appropriate handler based on CSV version.
     Supports backward compatibility for older CSV formats.
     """
-    # Get version information from CSV
-    version_info = get_version_info(path)
+    # Read the CSV file once and get its version information
+    result_file = open_result(path)
+    version_info = result_file.version_info
     normalized_version = version_info['normalized']
 
     custom_logger.debug(
@@ -188,10 +119,10 @@ def extract_specjbb_data(path, system_name, OS_RELEASE):
 
     # Dispatch to version-specific handler
     if normalized_version in ['1.0', '1.1']:
-        return _extract_specjbb_v1(path, system_name, OS_RELEASE, version_info)
+        return _extract_specjbb_v1(result_file, system_name, OS_RELEASE, version_info)
     else:
         # Future: Add elif for version '2.0', '3.0', etc.
         custom_logger.warning(
             f"Unknown CSV version {normalized_version}, attempting v1.x format"
         )
-        return _extract_specjbb_v1(path, system_name, OS_RELEASE, version_info)
+        return _extract_specjbb_v1(result_file, system_name, OS_RELEASE, version_info)
@@ -1,13 +1,12 @@
-import time
 from itertools import groupby
 
-from quisby.formatting.add_formatting import update_conditional_formatting
+from quisby.formatting.add_formatting import ConditionalFormatBuilder
 from quisby.sheet.sheet_util import (
+    ChartWriter,
     read_sheet,
-    get_sheet, append_empty_row_sheet
+    get_sheet_id, append_empty_row_sheet
 )
-from quisby.sheet.sheetapi import sheet
-from quisby.util import read_value
+from quisby.util import get_threshold
 
 
 def create_series_range_list_stream_compare(column_index, len_of_func, sheetId, start_index, end_index):
@@ -106,6 +105,7 @@ def graph_streams_data(spreadsheetId, test_name, action):
         append_empty_row_sheet(spreadsheetId, 3000, test_name)
     if len(data) > 1000:
         append_empty_row_sheet(spreadsheetId, 1000, test_name)
+    charts = ChartWriter(spreadsheetId)
     for index, row in enumerate(data):
         if "Max Throughput" in row:
             start_index = index
@@ -136,9 +136,7 @@ def graph_streams_data(spreadsheetId, test_name, action):
                 if column >= column_count:
                     break
 
-                sheetId = get_sheet(spreadsheetId, test_name)["sheets"][0][
-                    "properties"
-                ]["sheetId"]
+                sheetId = get_sheet_id(spreadsheetId, test_name)
 
                 series, column,col = globals()[f'create_series_range_list_stream_{action}'](column, len_of_func, sheetId,
                                                                                         start_index, end_index)
@@ -221,22 +219,20 @@ def graph_streams_data(spreadsheetId, test_name, action):
                 else:
                     GRAPH_COL_INDEX += 6
 
-                body = {"requests": requests}
-
-                sheet.batchUpdate(spreadsheetId=spreadsheetId, body=body).execute()
-
-                time.sleep(3)
+                charts.add(requests)
 
             # Reset variables
             start_index, end_index = 0, 0
 
+    charts.flush()
+
     if sheetId != -1:
-        threshold = read_value("percent_threshold", test_name)
-        if not threshold:
-            threshold = "5"
-        for col in set(diff_col):
-            try:
-                update_conditional_formatting(spreadsheetId, sheetId, col, threshold)
-            except Exception as exc:
-                print(str(exc))
-                pass
+        threshold = get_threshold(test_name)
+        formatting = ConditionalFormatBuilder(spreadsheetId, test_name, len(data))
+        for col in diff_col:
+            formatting.add_diff_rule(col, threshold)
+        try:
+            formatting.flush()
+        except Exception as exc:
+            print(str(exc))
+            pass
@@ -1,35 +1,21 @@
 import os
-from itertools import groupby
 
-from quisby.util import mk_int, process_instance
+from quisby.ordering import SERIES_FIELDS, group_by_family
 
 from quisby import custom_logger
 from quisby.pricing.cloud_pricing import get_cloud_pricing
 from quisby.util import read_config
-from quisby.benchmarks.version_util import get_version_info
+from quisby.benchmarks.version_util import open_result
 
 
 def stream_sort_data_by_system_family(results):
     """"""
     stream_data = []
-    sorted_result = []
 
     for index in range(0, len(results), 7):
         stream_data.append(results[index: index + 7])
 
-    stream_data.sort(
-        key=lambda x: str(process_instance(x[2][0], "family", "version", "feature"))
-    )
-
-    for _, items in groupby(
-            stream_data,
-            key=lambda x: process_instance(x[2][0], "family", "version", "feature"),
-    ):
-        sorted_result.append(
-            sorted(list(items), key=lambda x: mk_int(process_instance(x[2][0], "size")))
-        )
-
-    return sorted_result
+    return [items for _, items in group_by_family(stream_data, (2, 0), SERIES_FIELDS)]
 
 
 def calc_max_throughput(data):
@@ -124,28 +110,21 @@ def create_summary_streams_data(stream_data, OS_RELEASE):
     return results
 
 
-def _extract_v1_format(path, system_name, OS_RELEASE, version_info):
+def _extract_v1_format(result_file, system_name, OS_RELEASE, version_info):
     """
     Extract streams data in v1.x format.
 
-    :path: stream summary results file from stream_wrapper_benchmark runs
+    :result_file: ResultFile of the stream summary results from stream_wrapper_benchmark runs
     :system_name: machine name (eg: m5.2xlarge, Standard_D64s_v3)
     :version_info: Version information from CSV
     """
     summary_data = []
-    summary_file = path
+    summary_file = result_file.path
 
     if not os.path.isfile(summary_file):
         return None
 
-    with open(path) as file:
-        streams_results = file.readlines()
-
-    data_index = 0
-    for index, data in enumerate(streams_results):
-        if "buffer size" in data:
-            data_index = index
-        streams_results[index] = data.strip("\n").split(",")
+    streams_results = [data.strip("\n").split(",") for data in result_file.body()]
 
     socket_number = ""
     proccessed_data = []
@@ -202,8 +181,9 @@ def extract_streams_data(path, system_name, OS_RELEASE):
     :path: stream summary results file from stream_wrapper_benchmark runs
     :system_name: machine name (eg: m5.2xlarge, Standard_D64s_v3)
     """
-    # Get version information from CSV
-    version_info = get_version_info(path)
+    # Read the CSV file once and get its version information
+    result_file = open_result(path)
+    version_info = result_file.version_info
     normalized_version = version_info['normalized']
 
     custom_logger.debug(
@@ -213,13 +193,13 @@ def extract_streams_data(path, system_name, OS_RELEASE):
 
     # Dispatch to version-specific handler
     if normalized_version in ['1.0', '1.1']:
-        return _extract_v1_format(path, system_name, OS_RELEASE, version_info)
+        return _extract_v1_format(result_file, system_name, OS_RELEASE, version_info)
     else:
         # Future: Add elif for version '2.0', '3.0', etc.
         custom_logger.warning(
             f"Unknown CSV version {normalized_version}, attempting v1.x format"
         )
-        return _extract_v1_format(path, system_name, OS_RELEASE, version_info)
+        return _extract_v1_format(result_file, system_name, OS_RELEASE, version_info)
 
 
 if __name__ == "__main__":
@@ -2,23 +2,13 @@ from itertools import groupby
 
 from quisby import custom_logger
 from quisby.sheet.sheet_util import (
-    append_to_sheet,
     read_sheet,
-    get_sheet,
-    create_sheet, clear_sheet_charts, clear_sheet_data,
+    get_spreadsheet_title,
+    replace_sheet_contents,
 )
 from quisby.util import combine_two_array_alternating,merge_lists_alternately
 from quisby.util import read_config
-import re
-
-
-def extract_prefix_and_number(input_string):
-    match = re.search(r'^(.*?)(\d+)(.*?)$', input_string)
-    if match:
-        prefix = match.group(1)
-        suffix = match.group(3)  # Extracts the suffix after the number
-        return prefix, suffix
-    return None, None
+from quisby.ordering import extract_prefix_and_number
 
 
 def compare_inst(item1, item2):
@@ -40,7 +30,7 @@ def compare_uperf_results(spreadsheets, spreadsheetId, test_name):
 
     for spreadsheet in spreadsheets:
         values.append(read_sheet(spreadsheet, range=test_name))
-        spreadsheet_name.append(get_sheet(spreadsheet, test_name=test_name)["properties"]["title"])
+        spreadsheet_name.append(get_spreadsheet_title(spreadsheet))
 
     for index, value in enumerate(values):
         values[index] = (list(g) for k, g in groupby(value, key=lambda x: x != []) if k)
@@ -72,7 +62,7 @@ def compare_uperf_results(spreadsheets, spreadsheetId, test_name):
             elif value[0] == ele[0] and (value[0][0] not in ignore_table):
                 results.append([""])
                 results.append(value[0])
-                results = combine_two_array_alternating(results, value[1:], ele[1:])
+                results = combine_two_array_alternating(results, value[1:], ele[1:], test_name)
                 break
 
             elif value[0][0] == "Cost/Hr" and ele[0][0] == "Cost/Hr":
@@ -85,12 +75,8 @@ def compare_uperf_results(spreadsheets, spreadsheetId, test_name):
                     break
 
     try:
-        create_sheet(spreadsheetId, test_name)
-        custom_logger.info("Deleting existing charts and data from the sheet...")
-        clear_sheet_charts(spreadsheetId, test_name)
-        clear_sheet_data(spreadsheetId, test_name)
-        custom_logger.info("Appending new " + test_name + " data to sheet...")
-        append_to_sheet(spreadsheetId, results, test_name)
+        custom_logger.info("Replacing existing charts and data in the sheet...")
+        replace_sheet_contents(spreadsheetId, test_name, results)
     except Exception as exc:
         custom_logger.debug(str(exc))
         custom_logger.error("Failed to append data to sheet")
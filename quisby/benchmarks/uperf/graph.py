@@ -1,12 +1,11 @@
-import time
 
-from quisby.formatting.add_formatting import update_conditional_formatting
+from quisby.formatting.add_formatting import ConditionalFormatBuilder
 from quisby.sheet.sheet_util import (
+    ChartWriter,
     read_sheet,
-    get_sheet, append_empty_row_sheet, append_empty_col_sheet
+    get_sheet_id, append_empty_row_sheet, append_empty_col_sheet
 )
-from quisby.sheet.sheetapi import sheet
-from quisby.util import read_value
+from quisby.util import get_threshold
 
 
 def series_range_uperf_process(column_count, sheetId, start_index, end_index):
@@ -111,6 +110,7 @@ def graph_uperf_data(spreadsheetId, range, action):
     if len(uperf_results) > 500:
         append_empty_row_sheet(spreadsheetId, 3000, range)
 
+    charts = ChartWriter(spreadsheetId)
     for index, row in enumerate(uperf_results):
         if row:
             if "Cost/Hr" in row:
@@ -139,9 +139,7 @@ def graph_uperf_data(spreadsheetId, range, action):
             if column_count > 10:
                 append_empty_col_sheet(spreadsheetId, 20, range)
 
-            sheetId = get_sheet(spreadsheetId, range)["sheets"][0]["properties"][
-                "sheetId"
-            ]
+            sheetId = get_sheet_id(spreadsheetId, range)
             series, col = globals()[f'series_range_uperf_{action}'](column_count, sheetId, start_index, end_index)
             diff_col.extend(col)
             requests = {
@@ -226,22 +224,20 @@ def graph_uperf_data(spreadsheetId, range, action):
             else:
                 GRAPH_COL_INDEX += 6
 
-            body = {"requests": requests}
-
-            sheet.batchUpdate(spreadsheetId=spreadsheetId, body=body).execute()
+            charts.add(requests)
 
             # Reset variables
             start_index, end_index = 0, 0
 
-            time.sleep(3)
+    charts.flush()
 
     if sheetId != -1:
-        threshold = read_value("percent_threshold", range)
-        if not threshold:
-            threshold = "5"
-        for col in set(diff_col):
-            try:
-                update_conditional_formatting(spreadsheetId, sheetId, col, threshold)
-            except Exception as exc:
-                print(str(exc))
-                pass
+        threshold = get_threshold(range)
+        formatting = ConditionalFormatBuilder(spreadsheetId, range, len(uperf_results))
+        for col in diff_col:
+            formatting.add_diff_rule(col, threshold)
+        try:
+            formatting.flush()
+        except Exception as exc:
+            print(str(exc))
+            pass
@@ -1,44 +1,13 @@
 import csv
-import re
 from itertools import groupby
 
 import requests
 
-from quisby.util import read_config
-
-from quisby.util import mk_int, process_instance
+from quisby.ordering import sort_by_size
 
 from quisby import custom_logger
 from quisby.benchmarks.coremark.coremark import calc_price_performance
-from quisby.util import read_config
-from quisby.benchmarks.version_util import get_version_info
-
-
-def extract_prefix_and_number(input_string):
-    match = re.search(r'^(.*?)(\d+)(.*?)$', input_string)
-    if match:
-        prefix = match.group(1)
-        number = int(match.group(2))
-        suffix = match.group(3)
-        return prefix, number, suffix
-    return None, None, None
-
-
-def custom_key(item):
-    cloud_type = read_config("cloud", "cloud_type")
-    if item[1][0] == "local":
-        return item[1][0]
-    elif cloud_type == "aws":
-        instance_type =item[1][0].split(".")[0]
-        instance_number = item[1][0].split(".")[1]
-        return instance_type, instance_number
-    elif cloud_type == "gcp":
-         instance_type = item[1][0].split("-")[0]
-         instance_number = int(item[1][0].split('-')[-1])
-         return instance_type, instance_number
-    elif cloud_type == "azure":
-        instance_type, instance_number, version= extract_prefix_and_number(item[1][0])
-        return instance_type, version, instance_number
+from quisby.benchmarks.version_util import ResultFile, open_result
 
 
 def combine_uperf_data(results):
@@ -65,7 +34,7 @@ def create_summary_uperf_data(results, OS_RELEASE):
     sorted_results = [combine_uperf_data(results)]
 
     for result in sorted_results:
-        result = sorted(list(result), key=lambda x: mk_int(process_instance(x[1][0], "size")))
+        result = sort_by_size(result, (1, 0))
         for row in result:
             key = row[1][0] + "-" + row[2][0] + "-" + row[3][1]
             if key in group_by_test_name:
@@ -152,14 +121,14 @@ def split_into_parts(data):
     return result
 
 
-def _extract_v1_format(path, system_name, version_info):
+def _extract_v1_format(source, system_name, version_info):
     """
     Extract uperf data in v1.x format.
 
-    Supports both file paths and URLs.
+    Supports both result files and URLs.
 
     Args:
-        path: File path or URL to CSV data
+        source: ResultFile, or URL to CSV data
         system_name: Name of the system being tested
         version_info: Version information from CSV (may be None for URLs)
     """
@@ -168,13 +137,11 @@ def _extract_v1_format(path, system_name, version_info):
 
     tests_supported = ["tcp_stream", "tcp_rr"]
 
-    # Check if path is a URL
-    try:
-        csv_data = requests.get(path)
+    if isinstance(source, ResultFile):
+        csv_data = list(source.body())
+    else:
+        csv_data = requests.get(source)
         csv_reader = list(csv.reader(csv_data.text.split("\n")))
-    except Exception:
-        with open(path) as csv_file:
-            csv_data = csv_file.readlines()
 
     csv_reader = split_into_parts(csv_data)
 
@@ -232,7 +199,9 @@ def extract_uperf_data(path, system_name):
     is_url = path.startswith('http://') or path.startswith('https://')
 
     if not is_url:
-        version_info = get_version_info(path)
+        # Read the CSV file once and get its version information
+        source = open_result(path)
+        version_info = source.version_info
         normalized_version = version_info['normalized']
 
         custom_logger.debug(
@@ -241,17 +210,18 @@ def extract_uperf_data(path, system_name):
         )
     else:
         # URLs don't have version info in metadata
+        source = path
         normalized_version = '1.0'
         custom_logger.debug(f"Processing uperf data from URL (assuming v1.0): {path}")
 
     # Dispatch to version-specific handler
     if normalized_version in ['1.0', '1.1']:
-        return _extract_v1_format(path, system_name, version_info)
+        return _extract_v1_format(source, system_name, version_info)
     else:
         # Future: Add elif for version '2.0', '3.0', etc.
         custom_logger.warning(
             f"Unknown CSV version {normalized_version}, attempting v1.x format"
         )
-        return _extract_v1_format(path, system_name, version_info)
+        return _extract_v1_format(source, system_name, version_info)
 
 
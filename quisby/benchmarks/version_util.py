@@ -4,24 +4,31 @@ CSV Version Utilities for Quisby
 Provides version parsing and management for benchmark CSV files.
 Ensures backward compatibility when CSV formats change.
 
+Result files are read once through ResultFile, which parses the version
+and metadata and keeps the lines for the extractor. Extractors read the
+lines after the general meta block through ResultFile.body() and open them
+with open_result, so a caller that already read a file, to key the
+extraction cache for instance, can hand it over with shared_result.
+
 Usage Example:
     from quisby.benchmarks.version_util import (
-        get_version_info,
+        ResultFile,
         version_dispatch
     )
 
     def extract_benchmark_data(path, system_name, OS_RELEASE):
         # Dispatch based on version
-        version_info = get_version_info(path)
+        result_file = ResultFile(path)
+        version_info = result_file.version_info
 
         if version_info['normalized'] in ['1.0', '1.1']:
-            return _extract_v1_format(path, system_name, OS_RELEASE, version_info)
+            return _extract_v1_format(result_file, system_name, OS_RELEASE, version_info)
         elif version_info['normalized'] == '2.0':
-            return _extract_v2_format(path, system_name, OS_RELEASE, version_info)
+            return _extract_v2_format(result_file, system_name, OS_RELEASE, version_info)
         else:
             raise ValueError(f"Unsupported version: {version_info['raw']}")
 
-    # Or use the helper:
+    # Or use the helper, which hands each handler a ResultFile:
     def extract_benchmark_data(path, system_name, OS_RELEASE):
         return version_dispatch(
             path,
@@ -34,9 +41,156 @@ Usage Example:
         )
 """
 
+import hashlib
 import re
+import threading
+from contextlib import contextmanager
+
 from quisby import custom_logger
 
+META_START = '# Test general meta start'
+META_END = '# Test general meta end'
+
+
+def _parse_header(lines):
+    """
+    Parse the version and metadata from the lines of a result file.
+
+    Stops at the end of the general meta block.
+
+    :param lines: Iterable of lines
+    :return: (version or None, metadata dict, number of lines read)
+    """
+    version = None
+    metadata = {}
+    in_metadata = False
+    count = 0
+
+    for count, line in enumerate(lines, 1):
+        line = line.strip()
+
+        # Stop searching after metadata section
+        if line == META_END:
+            return version, metadata, count
+
+        # Look for version line
+        if version is None and line.startswith('# Results version:'):
+            version = line.split(':', 1)[1].strip()
+
+        # Track metadata sections
+        if line == META_START:
+            in_metadata = True
+            continue
+
+        # Parse metadata lines
+        if in_metadata and line.startswith('#'):
+            # Remove leading '#' and split on first ':'
+            content = line[1:].strip()
+            if ':' in content:
+                key, value = content.split(':', 1)
+                metadata[key.strip()] = value.strip()
+
+    # No meta block end, the whole file is body
+    return version, metadata, 0
+
+
+class ResultFile:
+    """
+    A benchmark result file, read once.
+
+    Holds the lines of the file together with the version and metadata
+    parsed from its '# Test general meta' block, so extractors never open
+    the file again and iterate over body() instead of skipping the meta
+    block themselves. A file that cannot be read is reported once; its
+    version info falls back to the legacy format and body() and readlines()
+    raise the original error for the extractor to handle.
+
+    :param path: Path to the result file
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.error = None
+        try:
+            with open(path, 'r') as file:
+                self._lines = file.readlines()
+        except Exception as exc:
+            custom_logger.error(f"Error reading {path}: {exc}")
+            self.error = exc
+            self._lines = []
+
+        self.version, self.metadata, self._body_start = _parse_header(self._lines)
+        if self.version is None and self.error is None:
+            # No version found - assume legacy format
+            custom_logger.debug(f"No version found in {path}, assuming v1.0")
+
+    @property
+    def version_info(self):
+        """Dictionary with 'raw', 'normalized', and 'metadata' keys"""
+        return {
+            'raw': self.version,
+            'normalized': normalize_version(self.version),
+            'metadata': dict(self.metadata)
+        }
+
+    def readlines(self):
+        """All lines of the file, as file.readlines() returns them, in a new list"""
+        if self.error is not None:
+            raise self.error
+        return list(self._lines)
+
+    def body(self):
+        """Iterator over the lines after the general meta block"""
+        if self.error is not None:
+            raise self.error
+        return iter(self._lines[self._body_start:])
+
+    def digest(self):
+        """SHA-256 of the content of the file, as read"""
+        if self.error is not None:
+            raise self.error
+        sha = hashlib.sha256()
+        for line in self._lines:
+            sha.update(line.encode())
+        return sha.hexdigest()
+
+
+# ResultFiles handed over through shared_result, by path, per thread
+_shared = threading.local()
+
+
+def open_result(path):
+    """
+    ResultFile for path, reusing the one shared by the caller if any.
+
+    :param path: Path to the result file
+    :return: ResultFile
+    """
+    result_file = getattr(_shared, 'files', {}).get(path)
+    return result_file if result_file is not None else ResultFile(path)
+
+
+@contextmanager
+def shared_result(result_file):
+    """
+    Have open_result return result_file for its path within the block,
+    so the file is not read again.
+
+    :param result_file: ResultFile already read
+    """
+    files = getattr(_shared, 'files', None)
+    if files is None:
+        files = _shared.files = {}
+    previous = files.get(result_file.path)
+    files[result_file.path] = result_file
+    try:
+        yield result_file
+    finally:
+        if previous is None:
+            del files[result_file.path]
+        else:
+            files[result_file.path] = previous
+
 
 def parse_csv_version(file_path):
     """
@@ -49,17 +203,9 @@ def parse_csv_version(file_path):
     """
     try:
         with open(file_path, 'r') as file:
-            for line in file:
-                line = line.strip()
-
-                # Stop searching after metadata section
-                if line == '# Test general meta end':
-                    break
-
-                # Look for version line
-                if line.startswith('# Results version:'):
-                    version = line.split(':', 1)[1].strip()
-                    return version
+            version = _parse_header(file)[0]
+        if version is not None:
+            return version
 
         # No version found - assume legacy format
         custom_logger.debug(f"No version found in {file_path}, assuming v1.0")
@@ -79,31 +225,9 @@ def parse_csv_metadata(file_path):
     :param file_path: Path to the CSV file
     :return: Dictionary of metadata key-value pairs
     """
-    metadata = {}
-
     try:
         with open(file_path, 'r') as file:
-            in_metadata = False
-
-            for line in file:
-                line = line.strip()
-
-                # Track metadata sections
-                if line == '# Test general meta start':
-                    in_metadata = True
-                    continue
-                elif line == '# Test general meta end':
-                    break
-
-                # Parse metadata lines
-                if in_metadata and line.startswith('#'):
-                    # Remove leading '#' and split on first ':'
-                    content = line[1:].strip()
-                    if ':' in content:
-                        key, value = content.split(':', 1)
-                        metadata[key.strip()] = value.strip()
-
-        return metadata
+            return _parse_header(file)[1]
 
     except Exception as exc:
         custom_logger.error(f"Error parsing metadata from {file_path}: {exc}")
@@ -141,28 +265,24 @@ def get_version_info(file_path):
     """
     Get comprehensive version information from CSV file.
 
-    :param file_path: Path to the CSV file
+    :param file_path: Path to the CSV file, or a ResultFile
     :return: Dictionary with 'raw', 'normalized', and 'metadata' keys
     """
-    raw_version = parse_csv_version(file_path)
-    normalized = normalize_version(raw_version)
-    metadata = parse_csv_metadata(file_path)
-
-    return {
-        'raw': raw_version,
-        'normalized': normalized,
-        'metadata': metadata
-    }
+    if isinstance(file_path, ResultFile):
+        return file_path.version_info
+    return ResultFile(file_path).version_info
 
 
 def version_dispatch(path, handlers, args=(), kwargs=None, default_version='1.0'):
     """
     Dispatch CSV extraction to version-specific handler.
 
-    This helper function parses the CSV version and calls the appropriate handler.
+    This helper function reads the CSV file once, parses its version and
+    calls the appropriate handler with the ResultFile.
 
-    :param path: Path to the CSV file
+    :param path: Path to the CSV file, or a ResultFile
     :param handlers: Dictionary mapping version strings to handler functions
+                     taking the ResultFile first
                      Example: {'1.0': extract_v1, '2.0': extract_v2}
     :param args: Positional arguments to pass to the handler
     :param kwargs: Keyword arguments to pass to the handler
@@ -173,19 +293,20 @@ def version_dispatch(path, handlers, args=(), kwargs=None, default_version='1.0'
         kwargs = {}
 
     # Get version info
-    version_info = get_version_info(path)
+    result_file = path if isinstance(path, ResultFile) else ResultFile(path)
+    version_info = result_file.version_info
     normalized_version = version_info['normalized']
     raw_version = version_info['raw'] or default_version
 
     # Find appropriate handler
     if normalized_version in handlers:
         handler = handlers[normalized_version]
-        custom_logger.debug(f"Using version {normalized_version} handler for {path}")
+        custom_logger.debug(f"Using version {normalized_version} handler for {result_file.path}")
     elif default_version in handlers:
         handler = handlers[default_version]
         custom_logger.warning(
             f"No handler for version {normalized_version} ({raw_version}), "
-            f"using default v{default_version} handler for {path}"
+            f"using default v{default_version} handler for {result_file.path}"
         )
     else:
         raise ValueError(
@@ -194,7 +315,7 @@ def version_dispatch(path, handlers, args=(), kwargs=None, default_version='1.0'
         )
 
     # Call the handler
-    result = handler(path, *args, **kwargs)
+    result = handler(result_file, *args, **kwargs)
 
     # Attach version info to result for downstream tracking
     if result is not None and isinstance(result, dict):
@@ -1,41 +1,140 @@
-from quisby.sheet.sheetapi import sheet
-from quisby import custom_logger
-
-
-def update_conditional_formatting(spreadsheet_id, sheet_id, column_index, threshold):
-    requests = [
-        {
-            "addConditionalFormatRule": {
-                "rule": {
-                    "ranges": [
-                        {
-                            "sheetId": sheet_id,
-                            "startRowIndex": 0,
-                            "endRowIndex": 1000,
-                            "startColumnIndex": column_index,
-                            "endColumnIndex": column_index + 1
-                        }
-                    ],
-                    "booleanRule": {
-                        "condition": {
-                            "type": "NUMBER_LESS_THAN_EQ",
-                            "values": [{"userEnteredValue": "-{}".format(threshold)}]
-                        },
-                        "format": {
-                            "backgroundColor": {"red": 34}
-                        }
-                    }
+from quisby.sheet import sheetapi
+from quisby.sheet.sheet_util import (
+    execute_request,
+    get_conditional_formats,
+    get_sheet_id,
+    record_conditional_formats,
+)
+
+
+def _grid_range(grid_range):
+    # The API leaves out zero valued fields such as sheetId 0 or startRowIndex 0
+    return (
+        grid_range.get("sheetId", 0),
+        grid_range.get("startRowIndex", 0),
+        grid_range.get("endRowIndex"),
+        grid_range.get("startColumnIndex", 0),
+        grid_range.get("endColumnIndex"),
+    )
+
+
+def _same_column(rule, other):
+    """Rules apply to the same column, whatever the row extent"""
+    if len(rule.get("ranges", [])) != 1 or len(other.get("ranges", [])) != 1:
+        return False
+    column = _grid_range(rule["ranges"][0])
+    other_column = _grid_range(other["ranges"][0])
+    return (column[0], column[3], column[4]) == (other_column[0], other_column[3], other_column[4])
+
+
+def _contains(value, expected):
+    # The API adds fields of its own, such as backgroundColorStyle, to a format
+    if isinstance(expected, dict):
+        return isinstance(value, dict) and all(_contains(value.get(key), item) for key, item in expected.items())
+    return value == expected
+
+
+def _same_rule(rule, other):
+    """
+    Rules match when other is a %Diff highlight like rule on the same column,
+    whatever its row extent and threshold. Gradient rules and other boolean
+    rules a user put on the column are never matched.
+    """
+    boolean_rule = other.get("booleanRule")
+    if not boolean_rule or not _same_column(rule, other):
+        return False
+    return (boolean_rule.get("condition", {}).get("type") == rule["booleanRule"]["condition"]["type"]
+            and _contains(boolean_rule.get("format"), rule["booleanRule"]["format"]))
+
+
+def _condition(rule):
+    return rule.get("booleanRule", {}).get("condition")
+
+
+class ConditionalFormatBuilder:
+    """
+    Collects the %Diff highlighting rules of a sheet and sends them in one
+    batchUpdate.
+
+    Rules cover only the rows holding data. A rule already on the sheet for
+    the same column, with the same condition type and format, is updated in
+    place with the new rows and threshold instead of added again, and extra
+    copies left by earlier runs are removed. Any other rule on the column is
+    left alone.
+
+    :spreadsheet_id
+    :test_name: sheet title
+    :row_count: number of rows in the table, header included
+    """
+
+    def __init__(self, spreadsheet_id, test_name, row_count):
+        self.spreadsheet_id = spreadsheet_id
+        self.test_name = test_name
+        self.sheet_id = get_sheet_id(spreadsheet_id, test_name)
+        self.row_count = row_count
+        self.rules = []
+
+    def add_diff_rule(self, column_index, threshold):
+        """Highlight cells of the column that are at or below -threshold"""
+        rule = {
+            "ranges": [
+                {
+                    "sheetId": self.sheet_id,
+                    "startRowIndex": 0,
+                    "endRowIndex": self.row_count,
+                    "startColumnIndex": column_index,
+                    "endColumnIndex": column_index + 1
+                }
+            ],
+            "booleanRule": {
+                "condition": {
+                    "type": "NUMBER_LESS_THAN_EQ",
+                    "values": [{"userEnteredValue": "-{}".format(threshold)}]
                 },
-                "index": 0  # Set priority (optional)
+                "format": {
+                    "backgroundColor": {"red": 34}
+                }
             }
         }
-    ]
-    batch_update_body = {
-        "requests": requests
-    }
-    sheet.batchUpdate(
-        spreadsheetId=spreadsheet_id,
-        body=batch_update_body
-    ).execute()
+        # The last threshold given for a column wins
+        self.rules = [pending for pending in self.rules if not _same_rule(rule, pending)]
+        self.rules.append(rule)
+
+    def flush(self):
+        """Send the collected rules, returns the batchUpdate response or None if nothing changed"""
+        existing = get_conditional_formats(self.spreadsheet_id, self.test_name)
+        updates, deletes, adds = [], [], []
+
+        for rule in self.rules:
+            matches = [index for index, current in enumerate(existing) if _same_rule(rule, current)]
+            if not matches:
+                adds.append(rule)
+                continue
+            current = existing[matches[0]]
+            if (_grid_range(current["ranges"][0]) != _grid_range(rule["ranges"][0])
+                    or _condition(current) != _condition(rule)):
+                updates.append({"updateConditionalFormatRule": {"index": matches[0], "sheetId": self.sheet_id, "rule": rule}})
+                existing[matches[0]] = rule
+            deletes.extend(matches[1:])
+
+        self.rules = []
+
+        # Updates use the current indexes, deleting from the end keeps the
+        # remaining ones valid, and new rules go first as before
+        requests = list(updates)
+        for index in sorted(set(deletes), reverse=True):
+            requests.append({"deleteConditionalFormatRule": {"index": index, "sheetId": self.sheet_id}})
+            del existing[index]
+        for rule in adds:
+            requests.append({"addConditionalFormatRule": {"rule": rule, "index": 0}})
+            existing.insert(0, rule)
 
+        if not requests:
+            return None
 
+        response = execute_request(sheetapi.spreadsheets().batchUpdate(
+            spreadsheetId=self.spreadsheet_id,
+            body={"requests": requests}
+        ))
+        record_conditional_formats(self.spreadsheet_id, self.test_name, existing)
+        return response
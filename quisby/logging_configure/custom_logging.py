@@ -1,9 +1,17 @@
 import logging
+import multiprocessing
 import os
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 
 
 def configure_custom_logging():
+    if multiprocessing.current_process().name != "MainProcess":
+        # Worker processes don't open the log file, they send their
+        # records to the parent, see log_to_queue
+        custom_logger = logging.getLogger("quisby_logger")
+        custom_logger.setLevel("INFO")
+        return custom_logger
+
     home_dir = os.getenv("HOME")
     log_location = home_dir + "/.quisby/logs/"
     log_level = "INFO"
@@ -37,6 +45,17 @@ def configure_custom_logging():
     return custom_logger
 
 
+def log_to_queue(queue):
+    """Send the records of this worker process to the parent through queue"""
+    custom_logger = logging.getLogger("quisby_logger")
+    custom_logger.handlers = [QueueHandler(queue)]
+
+
+def queue_listener(queue):
+    """Listener writing the records sent by log_to_queue to the handlers of this process"""
+    return QueueListener(queue, *logging.getLogger("quisby_logger").handlers, respect_handler_level=True)
+
+
 # Example usage
 if __name__ == "__main__":
     custom_logger = configure_custom_logging()
@@ -0,0 +1,149 @@
+"""
+Sorting and grouping of result rows by instance name.
+
+Rows are the per-system lists built by the benchmark modules. A key path
+gives the indexes that lead from a row to its instance name, e.g. (1, 0)
+for row[1][0]. Keys are computed once per row, the rows are sorted on
+them and then grouped without parsing the names again.
+"""
+import re
+from itertools import groupby
+from operator import itemgetter
+
+from quisby import custom_logger
+from quisby.util import mk_int, parse_instance, read_config
+
+# Instance name fields that make up a family, per cloud
+FAMILY_FIELDS = {
+    "aws": ("family", "version", "feature", "machine_type"),
+    "azure": ("family", "version", "feature"),
+    "gcp": ("family", "version", "sub_family", "feature"),
+    "local": ("family",),
+}
+
+# Family regardless of the cloud
+SERIES_FIELDS = ("family", "version", "feature")
+
+
+def instance_at(row, key_path):
+    """Instance name found by following key_path into row"""
+    for index in key_path:
+        row = row[index]
+    return row
+
+
+def family_fields(fields=None, cloud_type=None):
+    """
+    Fields to group on.
+
+    :fields: tuple of fields, or dict of tuples keyed by cloud type,
+             defaults to FAMILY_FIELDS
+    :cloud_type: defaults to the configured cloud
+    """
+    if isinstance(fields, tuple):
+        return fields
+    if cloud_type is None:
+        cloud_type = read_config("cloud", "cloud_type")
+    return (fields or FAMILY_FIELDS).get(cloud_type, ("family",))
+
+
+def _family_key(instance, fields):
+    # None sorts with empty values instead of failing against strings
+    return tuple(getattr(instance, field) or "" for field in fields)
+
+
+def _parse_row(row, key_path, cloud_type):
+    # A row whose instance name can't be parsed is logged and left out
+    try:
+        return parse_instance(instance_at(row, key_path), cloud_type)
+    except Exception as exc:
+        custom_logger.error(f"Error parsing instance name of result row {row}: {str(exc)}")
+    return None
+
+
+def group_by_family(rows, key_path, fields=None, cloud_type=None):
+    """
+    Group rows by instance family, each group ordered by instance size.
+
+    Families come out in sorted order and rows of the same family and size
+    keep their input order. Rows whose instance name can't be parsed are
+    logged and skipped.
+
+    :rows: result rows
+    :key_path: indexes leading from a row to its instance name
+    :fields: see family_fields
+    :return: list of (family key, rows) pairs
+    """
+    if cloud_type is None:
+        cloud_type = read_config("cloud", "cloud_type")
+    fields = family_fields(fields, cloud_type)
+
+    decorated = []
+    for row in rows:
+        instance = _parse_row(row, key_path, cloud_type)
+        if instance is None:
+            continue
+        decorated.append((_family_key(instance, fields), mk_int(instance.size), row))
+    decorated.sort(key=itemgetter(0, 1))
+
+    return [
+        (family, [row for _, _, row in members])
+        for family, members in groupby(decorated, key=itemgetter(0))
+    ]
+
+
+def sort_by_size(rows, key_path, cloud_type=None):
+    """
+    Rows ordered by instance size, stable for rows of the same size.
+    Rows whose instance name can't be parsed are logged and skipped.
+    """
+    if cloud_type is None:
+        cloud_type = read_config("cloud", "cloud_type")
+    sized = []
+    for row in rows:
+        instance = _parse_row(row, key_path, cloud_type)
+        if instance is not None:
+            sized.append((mk_int(instance.size), row))
+    return [row for _, row in sorted(sized, key=itemgetter(0))]
+
+
+def _prefix_number_suffix(name):
+    match = re.search(r'^(.*?)(\d+)(.*?)$', name)
+    if match:
+        return match.group(1), int(match.group(2)), match.group(3)
+    return None, None, None
+
+
+def extract_prefix_and_number(input_string):
+    """
+    Prefix and suffix around the number in an instance name, used by the
+    comparisons to match instances of the same type across two runs.
+
+    :param input_string: Instance name, e.g., 't2.micro-01'
+    :return: Tuple (prefix, suffix) or (None, None) if no match
+    """
+    try:
+        prefix, _, suffix = _prefix_number_suffix(input_string)
+        return prefix, suffix
+    except Exception as exc:
+        custom_logger.error(f"Error extracting prefix and number from '{input_string}': {str(exc)}")
+    return None, None
+
+
+def name_key(name, cloud_type=None):
+    """
+    Sort key taken from the layout of the instance name: type then size
+    for aws and gcp, prefix, suffix and number for azure.
+    """
+    if cloud_type is None:
+        cloud_type = read_config("cloud", "cloud_type")
+    if name == "local":
+        return name
+    if cloud_type == "aws":
+        parts = name.split(".")
+        return parts[0], parts[1]
+    elif cloud_type == "gcp":
+        return name.split("-")[0], int(name.split("-")[-1])
+    elif cloud_type == "azure":
+        prefix, number, suffix = _prefix_number_suffix(name)
+        return prefix, suffix, number
@@ -0,0 +1,211 @@
+"""
+Import of provider price lists into the pricing catalog.
+
+Accepted files:
+- AWS EC2 offer file, CSV or JSON
+- GCP pricelist.json
+- Azure virtual machines calculator JSON
+
+Files are read as a stream and their rows are written to the catalog as
+they are parsed, so memory stays bounded whatever the size of the file.
+"""
+import csv
+import json
+
+from quisby import custom_logger
+from quisby.pricing import price_cache
+from quisby.pricing.cloud_pricing import on_demand_price
+
+CHUNK_SIZE = 1 << 20
+
+# Product attributes of the AWS prices Quisby uses, see get_aws_pricing
+AWS_PRODUCT = {
+    "tenancy": "Shared",
+    "operatingSystem": "Linux",
+    "capacitystatus": "Used",
+    "preInstalledSw": "NA",
+}
+
+# The same, as named in the CSV offer file
+AWS_CSV_PRODUCT = {
+    "Tenancy": "Shared",
+    "Operating System": "Linux",
+    "CapacityStatus": "Used",
+    "Pre Installed S/W": "NA",
+}
+
+
+class JsonStream:
+    """
+    Reads a JSON document one object member at a time.
+
+    members() walks an object and leaves each value to the caller, who
+    either reads it whole with value(), descends into it with members(),
+    or drops it with skip().
+    """
+
+    def __init__(self, file):
+        self.file = file
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self):
+        chunk = self.file.read(CHUNK_SIZE)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def _peek(self):
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                raise ValueError("Unexpected end of JSON document")
+
+    def _expect(self, char):
+        if self._peek() != char:
+            raise ValueError("Expected " + repr(char) + " in JSON document, found " + repr(self.buffer[self.pos]))
+        self.pos += 1
+
+    def value(self):
+        """Decode the value at the current position"""
+        self._peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except ValueError:
+                # The value runs past the end of the buffer
+                if self._fill():
+                    continue
+                raise
+            # A number at the end of the buffer may continue in the next chunk
+            if end == len(self.buffer) and not self.eof and self._fill():
+                continue
+            self.pos = end
+            return value
+
+    def members(self):
+        """Yield the keys of the object at the current position"""
+        self._expect("{")
+        if self._peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            self._expect(":")
+            yield key
+            char = self._peek()
+            self.pos += 1
+            if char == "}":
+                return
+            if char != ",":
+                raise ValueError("Expected ',' or '}' in JSON document, found " + repr(char))
+
+    def skip(self):
+        """Drop the value at the current position"""
+        if self._peek() == "{":
+            for _ in self.members():
+                self.value()
+        else:
+            self.value()
+
+
+def _aws_product(attributes):
+    if any(attributes.get(field) != value for field, value in AWS_PRODUCT.items()):
+        return None
+    if not attributes.get("instanceType") or not attributes.get("regionCode"):
+        return None
+    return attributes["regionCode"], attributes["instanceType"], _vcpus(attributes.get("vcpu"))
+
+
+def _vcpus(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _json_rows(stream):
+    """Catalog rows of an AWS offer file, GCP price list or Azure calculator payload"""
+    products = {}
+    for key in stream.members():
+        if key == "products":
+            # Products come before their terms in the offer file
+            for sku in stream.members():
+                product = _aws_product(stream.value().get("attributes", {}))
+                if product:
+                    products[sku] = product
+        elif key == "terms":
+            for term_type in stream.members():
+                if term_type != "OnDemand":
+                    stream.skip()
+                    continue
+                for sku in stream.members():
+                    terms = stream.value()
+                    if sku in products:
+                        region, instance, vcpus = products[sku]
+                        yield "aws", region, instance, on_demand_price(sku, terms), vcpus
+        elif key == "gcp_price_list":
+            for sku in stream.members():
+                prices = stream.value()
+                if sku.startswith("CP-COMPUTEENGINE-") and isinstance(prices, dict):
+                    for region, price in prices.items():
+                        if isinstance(price, (int, float)):
+                            yield "gcp", region, sku, price, None
+        elif key == "offers":
+            for vm in stream.members():
+                per_hour = stream.value().get("prices", {}).get("perhour", {})
+                for region, price in per_hour.items():
+                    if isinstance(price, dict) and "value" in price:
+                        yield "azure", region, vm, price["value"], None
+        else:
+            stream.skip()
+
+
+def _csv_rows(file):
+    """Catalog rows of an AWS CSV offer file, whose header follows a few lines of metadata"""
+    reader = csv.reader(file)
+    for header in reader:
+        if "TermType" in header and "Instance Type" in header:
+            break
+    else:
+        raise ValueError("No AWS offer file header found")
+
+    for values in reader:
+        row = dict(zip(header, values))
+        if row.get("TermType") != "OnDemand" or row.get("Currency", "USD") != "USD":
+            continue
+        if any(row.get(field) != value for field, value in AWS_CSV_PRODUCT.items()):
+            continue
+        if not row.get("Instance Type") or not row.get("Region Code"):
+            continue
+        try:
+            price = float(row["PricePerUnit"])
+        except (TypeError, ValueError):
+            continue
+        yield "aws", row["Region Code"], row["Instance Type"], price, _vcpus(row.get("vCPU"))
+
+
+def import_catalog(path):
+    """
+    Load a price list into the pricing catalog, replacing the entries
+    previously imported for the same cloud.
+
+    :path: price list file, CSV for the AWS offer file, JSON otherwise
+    :return: number of prices imported
+    """
+    with open(path, newline="") as file:
+        if path.lower().endswith(".csv"):
+            rows = _csv_rows(file)
+        else:
+            rows = _json_rows(JsonStream(file))
+        count = price_cache.import_prices(rows)
+    custom_logger.info("Imported " + str(count) + " prices from " + path)
+    return count
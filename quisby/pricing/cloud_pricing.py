@@ -2,21 +2,87 @@
 from quisby import custom_logger
 import sys
 import json
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 import requests
 import boto3
-from quisby.util import process_instance, read_config
+from botocore.exceptions import ClientError, ConnectionError as BotoConnectionError
+from quisby.pricing import price_cache
+from quisby.util import get_config, parse_instance, read_config
 import os
 
 homedir = os.getenv("HOME")
 json_path = homedir + "/.quisby/config/azure_prices.json"
 
+# Lookups made during this run, keyed by instance, see _single_flight
+_memo_lock = threading.Lock()
+_prices = {}
+_cpu_counts = {}
+# Prices and vCPU counts handed out empty or raised, see lookup_failures
+_failures = 0
+
+# Threads resolving instances at once, [pricing] workers in config.ini
+DEFAULT_PRICE_WORKERS = 16
+# Lookups sent to one provider at once, [pricing] <cloud>_concurrency in config.ini
+PROVIDER_CONCURRENCY = {"aws": 4, "azure": 8, "gcp": 8, "local": 1}
+
+# Provider errors worth retrying with exponential backoff
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+RETRY_ERROR_CODES = ("Throttling", "ThrottlingException", "RequestLimitExceeded", "ServiceUnavailable",
+                     "InternalError", "InternalFailure")
+PRICE_RETRIES = 3
+BACKOFF_BASE_SECONDS = 1
+
+_provider_limits = {}
+
+
+def _is_transient(exc):
+    if isinstance(exc, (requests.ConnectionError, requests.Timeout, BotoConnectionError)):
+        return True
+    if isinstance(exc, requests.HTTPError):
+        return exc.response is not None and exc.response.status_code in RETRY_STATUS_CODES
+    if isinstance(exc, ClientError):
+        return exc.response.get("Error", {}).get("Code") in RETRY_ERROR_CODES
+    return False
+
+
+def with_retries(call, what):
+    """
+    Return call(), retried with jittered exponential backoff while it
+    fails with a network error, throttling or a 5xx response.
+
+    :what: description of the request for the log
+    """
+    for attempt in range(PRICE_RETRIES + 1):
+        try:
+            return call()
+        except Exception as exc:
+            if not _is_transient(exc) or attempt == PRICE_RETRIES:
+                raise
+            delay = random.uniform(0, BACKOFF_BASE_SECONDS * 2 ** attempt)
+            custom_logger.warning(
+                f"Unable to fetch {what}, retrying in {delay:.1f}s (attempt {attempt + 1}/{PRICE_RETRIES})"
+            )
+            time.sleep(delay)
+
+
+AZURE_PRICING_URL = "https://azure.microsoft.com/api/v3/pricing/virtual-machines/calculator"
+
+_azure_lock = threading.Lock()
+# Hourly prices keyed by (vm slug, region), built from json_path, see get_azure_index
+_azure_index = None
+_azure_mtime = None
+_azure_refreshing = False
+
 
 def fetch_from_url():
-    url = "https://azure.microsoft.com/api/v3/pricing/virtual-machines/calculator"
     try:
-        response = requests.get(url)
+        response = with_retries(lambda: requests.get(AZURE_PRICING_URL, timeout=60), "Azure prices")
     except Exception as exc:
         custom_logger.error(str(exc))
+        return None
     if response.status_code == 200:
         return response.json()
     else:
@@ -24,7 +90,88 @@ def fetch_from_url():
         return None
 
 
-def get_azure_pricing(instance_name, region):
+def _save_azure_prices(data):
+    """Write the calculator payload to json_path, replacing it atomically"""
+    try:
+        os.makedirs(os.path.dirname(json_path), exist_ok=True)
+        tmp_path = json_path + ".tmp"
+        with open(tmp_path, "w") as file:
+            json.dump(data, file)
+        os.replace(tmp_path, json_path)
+    except OSError as exc:
+        custom_logger.error("Unable to save Azure prices: " + str(exc))
+
+
+def _index_azure_prices(data):
+    index = {}
+    for vm, offer in data.get("offers", {}).items():
+        per_hour = offer.get("prices", {}).get("perhour", {})
+        for region, price in per_hour.items():
+            if isinstance(price, dict) and "value" in price:
+                index[(vm, region)] = price["value"]
+    return index
+
+
+def _refresh_azure_prices():
+    global _azure_refreshing
+    try:
+        data = fetch_from_url()
+        if data is not None:
+            # The new mtime makes the next lookup rebuild the index
+            _save_azure_prices(data)
+    finally:
+        with _azure_lock:
+            _azure_refreshing = False
+
+
+def get_azure_index():
+    """
+    Azure hourly prices keyed by (vm slug, region).
+
+    The index is built from json_path once and rebuilt when the file
+    changes. When the file is older than the price cache TTL, a fresh
+    copy is fetched in the background while the current prices are
+    still served. If the file is missing or unreadable, or with
+    --refresh-prices, the prices are fetched before returning.
+
+    :return: index, or None if no prices could be loaded
+    """
+    global _azure_index, _azure_mtime, _azure_refreshing
+    with _azure_lock:
+        try:
+            mtime = os.path.getmtime(json_path)
+        except OSError:
+            mtime = None
+        if price_cache.refresh and _azure_index is None:
+            mtime = None
+
+        if mtime is not None and mtime != _azure_mtime:
+            try:
+                with open(json_path) as f:
+                    _azure_index = _index_azure_prices(json.load(f))
+                _azure_mtime = mtime
+            except Exception:
+                custom_logger.error("Error extracting data from file. File corrupted. Redirecting to url fetching.")
+                mtime = None
+
+        if mtime is None:
+            data = fetch_from_url()
+            if data is None:
+                return _azure_index
+            _save_azure_prices(data)
+            _azure_index = _index_azure_prices(data)
+            try:
+                _azure_mtime = os.path.getmtime(json_path)
+            except OSError:
+                _azure_mtime = None
+        elif not _azure_refreshing and time.time() - mtime > price_cache.get_ttl():
+            _azure_refreshing = True
+            threading.Thread(target=_refresh_azure_prices, daemon=True).start()
+        return _azure_index
+
+
+def azure_vm_slug(instance_name):
+    """Calculator offer name of an Azure size, e.g. linux-d8sv5-standard"""
     prefix = instance_name.split("_")
     series = ""
     version = ""
@@ -36,84 +183,190 @@ def get_azure_pricing(instance_name, region):
     except Exception as exc:
         custom_logger.debug(str(exc))
         custom_logger.info("Version not present")
-    vm = "linux-" + series + version + "-" + tier
+    return "linux-" + series + version + "-" + tier
+
+
+def get_azure_pricing(instance_name, region):
+    vm = azure_vm_slug(instance_name)
+    index = get_azure_index()
+    if index is None:
+        return None
+    return index[(vm, region)]
+
+
+GCP_PRICELIST_URL = "https://cloudpricingcalculator.appspot.com/static/data/pricelist.json"
+GCP_PRICELIST_FILE = "gcp_pricelist.json"
+GCP_FAMILIES = ("N2", "N2D", "T2D", "T2A", "C2", "C2D", "M1", "M2", "N1", "E2", "C4A", "C3D")
+
+_gcp_lock = threading.Lock()
+# Core prices keyed by (SKU, region) and the SKUs seen, see get_gcp_index
+_gcp_index = None
+_gcp_skus = None
 
-    if os.path.exists(json_path):
-        # fetch price information from json
+
+def _read_gcp_pricelist(path):
+    """Return the price list cached at path, or None if it is missing or unreadable"""
+    try:
+        with open(path) as cache_file:
+            pricelist = json.load(cache_file)
+    except (OSError, ValueError):
+        return None
+    return pricelist if "gcp_price_list" in pricelist else None
+
+
+def load_gcp_pricelist():
+    """
+    Return the GCP price list, using the copy in the cache directory while
+    it is younger than the price cache TTL. If the download fails the
+    stale copy is used instead.
+    """
+    path = os.path.join(price_cache.CACHE_DIR, GCP_PRICELIST_FILE)
+    cached = _read_gcp_pricelist(path)
+    if cached is not None and not price_cache.refresh and time.time() - os.path.getmtime(path) < price_cache.get_ttl():
+        return cached
+
+    def download():
+        response = requests.get(GCP_PRICELIST_URL, timeout=60)
+        response.raise_for_status()
+        return response
+
+    try:
+        response = with_retries(download, "the GCP price list")
+        content = response.content.decode("UTF-8")
+        pricelist = json.loads(content)
+    except Exception as exc:
+        custom_logger.error("Unable to fetch the GCP price list: " + str(exc))
+        return cached
+
+    if "gcp_price_list" in pricelist:
         try:
-            with open(json_path) as f:
-                data = json.load(f)
-        except Exception as exc:
-            custom_logger.error("Error extracting data from file. File corrupted. Redirecting to url fetching.")
-            data = fetch_from_url()
-    else:
-        # fetch price information from url
-        data = fetch_from_url()
-        with open(json_path, 'w') as file:
-            # Step 3: Dump the JSON data into the file
-            json.dump(data, file, indent=4)
-    if data is None:
-        return data
-    price = data["offers"][vm]['prices']['perhour'][region]["value"]
-    return price
+            os.makedirs(price_cache.CACHE_DIR, exist_ok=True)
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "w") as cache_file:
+                cache_file.write(content)
+            os.replace(tmp_path, path)
+        except OSError as exc:
+            custom_logger.debug("Unable to cache the GCP price list: " + str(exc))
+    return pricelist
+
+
+def get_gcp_index():
+    """
+    Compute Engine core prices keyed by (SKU, region), built once per run.
+
+    :return: (index, set of SKUs), or (None, None) if the price list
+             could not be loaded
+    """
+    global _gcp_index, _gcp_skus
+    with _gcp_lock:
+        if _gcp_index is None:
+            pricelist = load_gcp_pricelist()
+            if pricelist is None or "gcp_price_list" not in pricelist:
+                sys.stderr.write('Google Cloud pricing data missing "gcp_price_list" node\n')
+                return None, None
+            index, skus = {}, set()
+            for name, prices in pricelist["gcp_price_list"].items():
+                if name.startswith("CP-COMPUTEENGINE-") and isinstance(prices, dict):
+                    skus.add(name)
+                    for region, price in prices.items():
+                        if isinstance(price, (int, float)):
+                            index[(name, region)] = price
+            _gcp_index, _gcp_skus = index, skus
+        return _gcp_index, _gcp_skus
+
+
+def gcp_core_sku(instance_name):
+    """
+    Per-core price SKU of a GCP machine type and its core count.
+
+    :return: (SKU, cores), or None for families without a core price
+    """
+    family, model, cpu = instance_name.split("-")
+    if family.upper() in GCP_FAMILIES:
+        return "CP-COMPUTEENGINE-" + family.upper() + "-PREDEFINED-VM-CORE", float(cpu)
+    custom_logger.error("Machine price is not available for :" + instance_name)
+    return None
 
 
 def get_gcp_prices(instance_name, region):
-    url = "https://cloudpricingcalculator.appspot.com/static/data/pricelist.json"
-
-    response = requests.get(url, stream=True)
-    decoded_response = response.content.decode("UTF-8")
-    google_ext_prices = json.loads(decoded_response)
-    price_data = {}
-    if "gcp_price_list" not in google_ext_prices:
-        sys.stderr.write('Google Cloud pricing data missing "gcp_price_list" node\n')
+    index, skus = get_gcp_index()
+    if index is None:
         return None
-    prefix = ""
-    gcp_price_list = google_ext_prices["gcp_price_list"]
-    family, model, cpu = instance_name.split("-")
-    if family.upper() in ("N2", "N2D", "T2D", "T2A", "C2", "C2D", "M1", "M2", "N1", "E2", "C4A", "C3D"):
-        prefix = "CP-COMPUTEENGINE-" + family.upper() + "-PREDEFINED-VM-CORE".strip()
-    else:
-        custom_logger.error("Machine price is not available for :" + instance_name)
+    sku = gcp_core_sku(instance_name)
+    if sku is None:
         return None
+    prefix, cpu = sku
 
-    for name, prices in gcp_price_list.items():
-        if prefix == name:
-            for key, price in prices.items():
-                if region == key:
-                    return gcp_price_list[name][region] * float(cpu)
-            custom_logger.error("Machine price is not available for region:" + region)
-            return None
+    if prefix not in skus:
+        return None
+    if (prefix, region) not in index:
+        custom_logger.error("Machine price is not available for region:" + region)
+        return None
+    return index[(prefix, region)] * cpu
+
+
+AWS_PRICING_REGION = "us-east-1"
+# Most instance types describe_instance_types accepts in one call
+AWS_DESCRIBE_BATCH = 100
+
+_aws_clients = {}
+
+
+def aws_client(service, region):
+    """boto3 client for service in region, shared by the whole run"""
+    key = (os.getpid(), service, region)
+    with _memo_lock:
+        client = _aws_clients.get(key)
+        if client is None:
+            client = _aws_clients[key] = boto3.client(service, region_name=region)
+    return client
+
+
+def _aws_price_filters(region):
+    return [
+        {'Type': 'TERM_MATCH', 'Field': 'servicecode', 'Value': 'AmazonEC2'},
+        {'Type': 'TERM_MATCH', 'Field': 'tenancy', 'Value': 'Shared'},
+        {'Type': 'TERM_MATCH', 'Field': 'operatingSystem', 'Value': 'Linux'},
+        {'Type': 'TERM_MATCH', 'Field': 'regionCode', 'Value': region},
+        {'Type': 'TERM_MATCH', 'Field': 'capacitystatus', 'Value': 'Used'},
+        {'Type': 'TERM_MATCH', 'Field': 'preInstalledSw', 'Value': 'NA'},
+    ]
+
+
+def _on_demand_price(pricing_data):
+    """Highest on-demand hourly price in a get_products PriceList entry"""
+    pricing_data = json.loads(pricing_data)
+    product_dict = pricing_data.get('product')
+    return on_demand_price(product_dict['sku'], pricing_data.get('terms', {}).get('OnDemand', {}))
+
+
+def on_demand_price(product_sku, on_demand_terms):
+    """Highest hourly price among the on-demand terms of a product SKU"""
+    max_price = 0.0
+    for product_key, product_values in on_demand_terms.items():
+        if product_sku in product_key:
+            ondemand_sku = product_values.get('sku')
+            for price_key, price_values in product_values.get('priceDimensions', {}).items():
+
+                if ondemand_sku in price_key:
+                    max_price = max(max_price, float(price_values.get('pricePerUnit', {}).get('USD', 0)))
+    return max_price
+
+
+def _fetch_aws_pricing(instance_type, region):
+    max_price = 0.0
+    filters = _aws_price_filters(region) + [{'Type': 'TERM_MATCH', 'Field': 'instanceType', 'Value': instance_type}]
+
+    paginator = aws_client('pricing', AWS_PRICING_REGION).get_paginator('get_products')
+    for page in paginator.paginate(ServiceCode='AmazonEC2', Filters=filters):
+        for pricing_data in page['PriceList']:
+            max_price = max(max_price, _on_demand_price(pricing_data))
+    return max_price
 
 
 def get_aws_pricing(instance_type, region, os_type):
     try:
-        max_price = 0.0
-        filters = [
-                {'Type': 'TERM_MATCH', 'Field': 'servicecode', 'Value': 'AmazonEC2'},
-                {'Type': 'TERM_MATCH', 'Field': 'instanceType', 'Value': instance_type},
-                {'Type': 'TERM_MATCH', 'Field': 'tenancy', 'Value': 'Shared'},
-                {'Type': 'TERM_MATCH', 'Field': 'operatingSystem', 'Value': 'Linux'},
-                {'Type': 'TERM_MATCH', 'Field': 'regionCode', 'Value': region},
-                {'Type': 'TERM_MATCH', 'Field': 'capacitystatus', 'Value': 'Used'},
-                {'Type': 'TERM_MATCH', 'Field': 'preInstalledSw', 'Value': 'NA'},
-            ]
-
-        ec2_client = boto3.client('pricing', region_name='us-east-1')
-        pricing_data_list = ec2_client.get_products(ServiceCode='AmazonEC2',
-                                                    Filters=filters)['PriceList']
-        for pricing_data in pricing_data_list:
-            pricing_data = json.loads(pricing_data)
-            product_dict = pricing_data.get('product')
-            product_sku = product_dict['sku']
-            on_demand_terms = pricing_data.get('terms', {}).get('OnDemand', {})
-            for product_key, product_values in on_demand_terms.items():
-                if product_sku in product_key:
-                    ondemand_sku = product_values.get('sku')
-                    for price_key, price_values in product_values.get('priceDimensions', {}).items():
-
-                        if ondemand_sku in price_key:
-                            max_price = max(max_price, float(price_values.get('pricePerUnit', {}).get('USD', 0)))
+        max_price = with_retries(lambda: _fetch_aws_pricing(instance_type, region), "prices of " + instance_type)
     except Exception as exc:
         print("Unable to fetch prices of " + instance_type + " for os_type " + os_type + " in region " + region)
         return None
@@ -184,9 +437,10 @@ def get_aws_instance_info(instance_name, region):
 
 
 def get_instance_vcpu_count(instance_type, region):
-    ec2 = boto3.client('ec2', region_name=region)
+    ec2 = aws_client('ec2', region)
 
-    instance_info = ec2.describe_instance_types(InstanceTypes=[instance_type])
+    instance_info = with_retries(lambda: ec2.describe_instance_types(InstanceTypes=[instance_type]),
+                                 "vCPU count of " + instance_type)
 
     if 'InstanceTypes' in instance_info:
         instance = instance_info['InstanceTypes'][0]
@@ -196,7 +450,35 @@ def get_instance_vcpu_count(instance_type, region):
         return None
 
 
-def get_cloud_pricing(instance_name, region, cloud_type,os_type):
+def get_instance_vcpu_counts(instance_types, region):
+    """
+    vCPU counts of several instance types, described AWS_DESCRIBE_BATCH
+    at a time. A batch naming an unknown type is rejected as a whole, so
+    its types are then described one by one and the unknown ones left out.
+
+    :return: dict of instance type -> vCPU count
+    """
+    ec2 = aws_client('ec2', region)
+    paginator = ec2.get_paginator('describe_instance_types')
+    vcpu_counts = {}
+    for start in range(0, len(instance_types), AWS_DESCRIBE_BATCH):
+        batch = instance_types[start:start + AWS_DESCRIBE_BATCH]
+        try:
+            pages = with_retries(lambda: list(paginator.paginate(InstanceTypes=batch)), "vCPU counts")
+            for page in pages:
+                for instance in page.get('InstanceTypes', []):
+                    vcpu_counts[instance['InstanceType']] = instance['VCpuInfo']['DefaultVCpus']
+        except Exception as exc:
+            custom_logger.debug(str(exc))
+            for instance_type in batch:
+                try:
+                    vcpu_counts[instance_type] = get_instance_vcpu_count(instance_type, region)
+                except Exception as exc:
+                    custom_logger.debug(str(exc))
+    return vcpu_counts
+
+
+def fetch_cloud_pricing(instance_name, region, cloud_type, os_type):
     if cloud_type == "aws":
         return get_aws_pricing(instance_name, region,os_type)
 
@@ -206,24 +488,227 @@ def get_cloud_pricing(instance_name, region, cloud_type,os_type):
     elif cloud_type == "gcp":
         return get_gcp_prices(instance_name, region)
 
-    elif cloud_type == "local":
+
+def _single_flight(memo, key, resolve):
+    """
+    Return resolve() for key, computed once per run.
+
+    Concurrent callers asking for the same key wait for the first one
+    instead of resolving it again. Exceptions are handed to the waiting
+    callers but not kept, so a later call tries again.
+    """
+    with _memo_lock:
+        future = memo.get(key)
+        owner = future is None
+        if owner:
+            future = memo[key] = Future()
+    if owner:
+        try:
+            future.set_result(resolve())
+        except Exception as exc:
+            with _memo_lock:
+                memo.pop(key, None)
+            future.set_exception(exc)
+    return future.result()
+
+
+def get_catalog_pricing(instance_name, region, cloud_type):
+    """Hourly price of an instance from the imported pricing catalog, None if not imported"""
+    if cloud_type == "azure":
+        instance_name = azure_vm_slug(instance_name)
+    elif cloud_type == "gcp":
+        sku = gcp_core_sku(instance_name)
+        if sku is None:
+            return None
+        entry = price_cache.get_catalog_entry(cloud_type, region, sku[0])
+        return entry[0] * sku[1] if entry else None
+    entry = price_cache.get_catalog_entry(cloud_type, region, instance_name)
+    return entry[0] if entry else None
+
+
+def _resolve_cloud_pricing(instance_name, region, cloud_type, os_type):
+    if price_cache.offline:
+        return get_catalog_pricing(instance_name, region, cloud_type)
+
+    price = price_cache.get_price(cloud_type, region, instance_name, os_type)
+    if price is not None:
+        return price
+
+    price = fetch_cloud_pricing(instance_name, region, cloud_type, os_type)
+    if not price:
+        catalog_price = get_catalog_pricing(instance_name, region, cloud_type)
+        if catalog_price:
+            custom_logger.info("Using the imported price of " + instance_name)
+            return catalog_price
+    # Failed lookups are not cached so the next run tries again
+    if price:
+        price_cache.put_price(cloud_type, region, instance_name, os_type, price)
+    return price
+
+
+def get_cloud_pricing(instance_name, region, cloud_type,os_type):
+    """
+    Hourly price of an instance, from the price cache when it holds a
+    fresh entry, otherwise from the cloud provider. Each instance is
+    resolved once per run.
+    """
+    if cloud_type == "local":
         return 1
+    return _counted(lambda: _single_flight(_prices, (cloud_type, region, instance_name, os_type),
+                                           lambda: _resolve_cloud_pricing(instance_name, region, cloud_type,
+                                                                          os_type)))
 
 
-def get_cloud_cpu_count(instance_name, region, cloud_type):
+def _catalog_vcpu_count(instance_name, region):
+    entry = price_cache.get_catalog_entry("aws", region, instance_name)
+    return entry[1] if entry else None
+
+
+def _resolve_cloud_cpu_count(instance_name, region, cloud_type):
     if cloud_type == "aws":
-        return get_instance_vcpu_count(instance_name, region)
+        if price_cache.offline:
+            return _catalog_vcpu_count(instance_name, region)
+        try:
+            return get_instance_vcpu_count(instance_name, region)
+        except Exception:
+            vcpu_count = _catalog_vcpu_count(instance_name, region)
+            if vcpu_count is None:
+                raise
+            return vcpu_count
 
     elif cloud_type == "azure":
-        return int(process_instance(instance_name, "size"))
+        return int(parse_instance(instance_name, cloud_type).size)
 
     elif cloud_type == "gcp":
-        return int(process_instance(instance_name, "size"))
+        return int(parse_instance(instance_name, cloud_type).size)
 
     elif cloud_type == "local":
         return 1
 
 
+def get_cloud_cpu_count(instance_name, region, cloud_type):
+    """vCPU count of an instance, resolved once per run"""
+    return _counted(lambda: _single_flight(_cpu_counts, (cloud_type, region, instance_name),
+                                           lambda: _resolve_cloud_cpu_count(instance_name, region, cloud_type)))
+
+
+def _counted(lookup):
+    """Return lookup(), counting empty results and exceptions as failures"""
+    global _failures
+    try:
+        value = lookup()
+    except Exception:
+        with _memo_lock:
+            _failures += 1
+        raise
+    if not value:
+        with _memo_lock:
+            _failures += 1
+    return value
+
+
+def lookup_failures():
+    """
+    Number of get_cloud_pricing and get_cloud_cpu_count calls so far in
+    this process that gave no value. Compare two readings to tell whether
+    the calls in between all succeeded.
+    """
+    return _failures
+
+
+def _remember(memo, key, value):
+    """Record a value resolved ahead of time, unless key is already known"""
+    with _memo_lock:
+        if key not in memo:
+            future = memo[key] = Future()
+            future.set_result(value)
+
+
+def remember_instances(instances, region, cloud_type, os_type):
+    """
+    Record a table returned by resolve_instances, in a worker process for
+    instance, so get_cloud_pricing and get_cloud_cpu_count answer from it.
+    Values that could not be resolved are left to be looked up again.
+    """
+    for instance_name, (price, vcpu_count) in instances.items():
+        if price is not None:
+            _remember(_prices, (cloud_type, region, instance_name, os_type), price)
+        if vcpu_count is not None:
+            _remember(_cpu_counts, (cloud_type, region, instance_name), vcpu_count)
+
+
+def provider_limit(cloud_type):
+    """Semaphore bounding the lookups sent to a provider at once, shared by the run"""
+    with _memo_lock:
+        limit = _provider_limits.get(cloud_type)
+    if limit is None:
+        try:
+            size = get_config().get_int("pricing", cloud_type + "_concurrency",
+                                        PROVIDER_CONCURRENCY.get(cloud_type, 1))
+        except Exception:
+            size = PROVIDER_CONCURRENCY.get(cloud_type, 1)
+        with _memo_lock:
+            limit = _provider_limits.setdefault(cloud_type, threading.BoundedSemaphore(max(1, size)))
+    return limit
+
+
+def _price_workers():
+    try:
+        return max(1, get_config().get_int("pricing", "workers", DEFAULT_PRICE_WORKERS))
+    except Exception:
+        return DEFAULT_PRICE_WORKERS
+
+
+def _resolve_instance(instance_name, region, cloud_type, os_type):
+    with provider_limit(cloud_type):
+        try:
+            price = get_cloud_pricing(instance_name, region, cloud_type, os_type)
+        except Exception as exc:
+            custom_logger.debug(str(exc))
+            price = None
+        try:
+            vcpu_count = get_cloud_cpu_count(instance_name, region, cloud_type)
+        except Exception as exc:
+            custom_logger.debug(str(exc))
+            vcpu_count = None
+    return instance_name, (price, vcpu_count)
+
+
+def resolve_instances(instance_names, region, cloud_type, os_type):
+    """
+    Resolve the price and vCPU count of every instance in a run before
+    its results are extracted and summarised.
+
+    Unique instances are resolved concurrently on a bounded thread pool,
+    with each provider limited to its own number of lookups in flight.
+    AWS vCPU counts are described in batches first.
+
+    Summaries do not read the returned table: the prices and counts are
+    recorded in the get_cloud_pricing and get_cloud_cpu_count memos of
+    this process, which answer their later calls without a provider
+    round trip. Other processes are warmed by passing the table to
+    remember_instances.
+
+    :return: dict of instance name -> (price, vCPU count), None for
+             values that could not be resolved
+    """
+    instance_names = sorted(set(instance_names))
+    if not instance_names:
+        return {}
+    custom_logger.info("Fetching prices of " + str(len(instance_names)) + " instance types...")
+
+    if cloud_type == "aws" and not price_cache.offline:
+        with _memo_lock:
+            missing = [name for name in instance_names if (cloud_type, region, name) not in _cpu_counts]
+        for instance_type, vcpu_count in get_instance_vcpu_counts(missing, region).items():
+            _remember(_cpu_counts, (cloud_type, region, instance_type), vcpu_count)
+
+    workers = min(_price_workers(), len(instance_names))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return dict(executor.map(lambda name: _resolve_instance(name, region, cloud_type, os_type),
+                                 instance_names))
+
+
 if __name__ == "__main__":
     print(get_azure_pricing("Standard_D32s_v3","us-east"))
     # print(get_gcp_prices("n2-standard-16",region)
@@ -0,0 +1,164 @@
+"""
+Instance prices kept in SQLite between runs.
+
+Prices are keyed by (cloud, region, instance, os_type). An entry is used
+until it is older than the TTL, taken from cache_ttl_hours in the
+[pricing] section of config.ini. With refresh set, each price is fetched
+again once per run and the stored entry is replaced.
+
+The same database holds the pricing catalog, prices imported from
+provider price lists with --import-prices. Catalog entries do not
+expire; they answer lookups with --offline-prices, or when a provider
+cannot be reached.
+"""
+import os
+import sqlite3
+import threading
+import time
+
+from quisby import custom_logger
+from quisby.util import get_config
+
+home_dir = os.getenv("HOME")
+CACHE_DIR = home_dir + "/.quisby/cache/"
+CACHE_PATH = CACHE_DIR + "pricing.sqlite"
+DEFAULT_TTL_HOURS = 7 * 24
+
+# Rows written per executemany call during an import
+IMPORT_BATCH = 1000
+
+# Set by --refresh-prices
+refresh = False
+# Set by --offline-prices
+offline = False
+
+_lock = threading.Lock()
+_connection = None
+_connection_key = None
+_refreshed = set()
+
+
+def get_ttl():
+    """Cache lifetime in seconds"""
+    try:
+        hours = get_config().get_float("pricing", "cache_ttl_hours", DEFAULT_TTL_HOURS)
+    except Exception:
+        hours = DEFAULT_TTL_HOURS
+    return hours * 60 * 60
+
+
+def _connect():
+    # One connection per process, shared by its threads under _lock
+    global _connection, _connection_key
+    key = (os.getpid(), CACHE_PATH)
+    if _connection is None or _connection_key != key:
+        os.makedirs(os.path.dirname(CACHE_PATH), exist_ok=True)
+        _connection = sqlite3.connect(CACHE_PATH, timeout=30, check_same_thread=False)
+        _connection.execute(
+            "CREATE TABLE IF NOT EXISTS prices ("
+            " cloud TEXT, region TEXT, instance TEXT, os_type TEXT,"
+            " price REAL, fetched_at REAL,"
+            " PRIMARY KEY (cloud, region, instance, os_type))"
+        )
+        _connection.execute(
+            "CREATE TABLE IF NOT EXISTS catalog ("
+            " cloud TEXT, region TEXT, instance TEXT, price REAL, vcpus INTEGER,"
+            " PRIMARY KEY (cloud, region, instance))"
+        )
+        _connection.commit()
+        _connection_key = key
+    return _connection
+
+
+def get_price(cloud, region, instance, os_type):
+    """Cached price, None if missing, expired or due for a refresh"""
+    key = (cloud, region, instance, os_type)
+    try:
+        with _lock:
+            if refresh and key not in _refreshed:
+                return None
+            row = _connect().execute(
+                "SELECT price, fetched_at FROM prices"
+                " WHERE cloud = ? AND region = ? AND instance = ? AND os_type = ?",
+                key,
+            ).fetchone()
+    except sqlite3.Error as exc:
+        custom_logger.debug("Price cache unavailable: " + str(exc))
+        return None
+    if row is None or time.time() - row[1] > get_ttl():
+        return None
+    return row[0]
+
+
+def put_price(cloud, region, instance, os_type, price):
+    """Store a price fetched from the provider"""
+    key = (cloud, region, instance, os_type)
+    try:
+        with _lock:
+            connection = _connect()
+            connection.execute(
+                "INSERT OR REPLACE INTO prices VALUES (?, ?, ?, ?, ?, ?)",
+                key + (float(price), time.time()),
+            )
+            connection.commit()
+            _refreshed.add(key)
+    except sqlite3.Error as exc:
+        custom_logger.debug("Price cache unavailable: " + str(exc))
+
+
+def import_prices(rows):
+    """
+    Replace the catalog entries of each cloud found in rows.
+
+    Rows are consumed as they come, so a generator parsing a large price
+    list is never held in memory. The highest price seen for an entry is
+    kept, as for on-demand prices fetched from the provider.
+
+    :rows: iterable of (cloud, region, instance, price, vcpus)
+    :return: number of rows read
+    """
+    count = 0
+    clouds = set()
+    batch = []
+    with _lock:
+        connection = _connect()
+        try:
+            for row in rows:
+                if row[0] not in clouds:
+                    _write_catalog(connection, batch)
+                    batch = []
+                    connection.execute("DELETE FROM catalog WHERE cloud = ?", (row[0],))
+                    clouds.add(row[0])
+                batch.append(row)
+                count += 1
+                if len(batch) >= IMPORT_BATCH:
+                    _write_catalog(connection, batch)
+                    batch = []
+            _write_catalog(connection, batch)
+            connection.commit()
+        except BaseException:
+            connection.rollback()
+            raise
+    return count
+
+
+def _write_catalog(connection, rows):
+    connection.executemany(
+        "INSERT INTO catalog VALUES (?, ?, ?, ?, ?)"
+        " ON CONFLICT (cloud, region, instance) DO UPDATE SET"
+        " price = max(price, excluded.price), vcpus = coalesce(excluded.vcpus, vcpus)",
+        rows,
+    )
+
+
+def get_catalog_entry(cloud, region, instance):
+    """(price, vcpus) imported for an instance, None if it is not in the catalog"""
+    try:
+        with _lock:
+            return _connect().execute(
+                "SELECT price, vcpus FROM catalog WHERE cloud = ? AND region = ? AND instance = ?",
+                (cloud, region, instance),
+            ).fetchone()
+    except sqlite3.Error as exc:
+        custom_logger.debug("Price cache unavailable: " + str(exc))
+        return None
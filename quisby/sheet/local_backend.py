@@ -0,0 +1,456 @@
+"""
+Offline stand-in for the Google Sheets service.
+
+LocalSheetsService exposes the same spreadsheets() / values() / batchUpdate
+surface as the googleapiclient service, so the helpers in sheet_util run
+unchanged against it. Spreadsheets are modelled in memory as sheets with
+cell grids, charts, conditional formats and named ranges. When a database
+path is given every spreadsheet is also stored in SQLite so local runs can
+be inspected or resumed later.
+"""
+import copy
+import json
+import random
+import re
+import secrets
+import sqlite3
+import threading
+
+from googleapiclient.errors import HttpError
+
+# Grid size Google gives to new sheets
+DEFAULT_ROW_COUNT = 1000
+DEFAULT_COLUMN_COUNT = 26
+
+_A1_RE = re.compile(r"^([A-Za-z]*)(\d*)$")
+
+
+def _error(status, message):
+    import httplib2
+
+    content = json.dumps({"error": {"code": status, "message": message}}).encode()
+    return HttpError(httplib2.Response({"status": status}), content)
+
+
+def _column_index(letters):
+    index = 0
+    for letter in letters.upper():
+        index = index * 26 + ord(letter) - ord("A") + 1
+    return index - 1
+
+
+def _parse_a1(notation):
+    """
+    Convert A1 notation to (start_row, start_col, end_row, end_col)
+
+    Indexes are zero based and the ends exclusive, None marks an open bound
+    as in "A:Z" or "2:5".
+    """
+    parts = notation.split(":")
+    if len(parts) > 2:
+        raise _error(400, f"Unable to parse range: {notation}")
+
+    bounds = []
+    for part in parts:
+        match = _A1_RE.match(part.strip())
+        if not match or not (match.group(1) or match.group(2)):
+            raise _error(400, f"Unable to parse range: {notation}")
+        column = _column_index(match.group(1)) if match.group(1) else None
+        row = int(match.group(2)) - 1 if match.group(2) else None
+        bounds.append((row, column))
+
+    start_row, start_col = bounds[0]
+    end_row, end_col = bounds[-1]
+    return (
+        start_row or 0,
+        start_col or 0,
+        end_row + 1 if end_row is not None else None,
+        end_col + 1 if end_col is not None else None,
+    )
+
+
+def _formatted(value):
+    """Render a stored value the way values.get returns it by default"""
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _extended_value(cell):
+    value = cell.get("userEnteredValue")
+    if not value:
+        return None
+    for key in ("numberValue", "stringValue", "boolValue", "formulaValue"):
+        if key in value:
+            return value[key]
+    return None
+
+
+class LocalRequest:
+    """Deferred call with the execute() interface of an HttpRequest"""
+
+    def __init__(self, method, operation):
+        self.method = method
+        self.operation = operation
+
+    def execute(self, http=None, num_retries=0):
+        return self.operation()
+
+
+class LocalValues:
+    def __init__(self, service):
+        self.service = service
+
+    def get(self, spreadsheetId, range, **kwargs):
+        return LocalRequest("GET", lambda: self.service.read_values(spreadsheetId, range))
+
+    def batchGet(self, spreadsheetId, ranges, **kwargs):
+        if isinstance(ranges, str):
+            ranges = [ranges]
+
+        def operation():
+            return {
+                "spreadsheetId": spreadsheetId,
+                "valueRanges": [self.service.read_values(spreadsheetId, range) for range in ranges],
+            }
+
+        return LocalRequest("GET", operation)
+
+    def append(self, spreadsheetId, range, body, **kwargs):
+        return LocalRequest("POST", lambda: self.service.append_values(spreadsheetId, range, body.get("values", [])))
+
+    def update(self, spreadsheetId, range, body, **kwargs):
+        return LocalRequest("PUT", lambda: self.service.update_values(spreadsheetId, range, body.get("values", [])))
+
+    def clear(self, spreadsheetId, range, body=None, **kwargs):
+        return LocalRequest("POST", lambda: self.service.clear_values(spreadsheetId, range))
+
+
+class LocalSpreadsheets:
+    def __init__(self, service):
+        self.service = service
+
+    def create(self, body, **kwargs):
+        return LocalRequest("POST", lambda: self.service.create(body))
+
+    def get(self, spreadsheetId, **kwargs):
+        return LocalRequest("GET", lambda: self.service.describe(spreadsheetId))
+
+    def batchUpdate(self, spreadsheetId, body, **kwargs):
+        return LocalRequest("POST", lambda: self.service.batch_update(spreadsheetId, body.get("requests", [])))
+
+    def values(self):
+        return LocalValues(self.service)
+
+
+class LocalSheetsService:
+    """
+    In-memory Sheets service, optionally persisted to SQLite
+
+    :path: SQLite database file, None keeps everything in memory
+    """
+
+    def __init__(self, path=None):
+        self.spreadsheets_by_id = {}
+        self.lock = threading.RLock()
+        self.db = None
+        if path:
+            self.db = sqlite3.connect(path, check_same_thread=False)
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS spreadsheets (spreadsheet_id TEXT PRIMARY KEY, document TEXT NOT NULL)"
+            )
+            for spreadsheet_id, document in self.db.execute("SELECT spreadsheet_id, document FROM spreadsheets"):
+                self.spreadsheets_by_id[spreadsheet_id] = json.loads(document)
+
+    def spreadsheets(self):
+        return LocalSpreadsheets(self)
+
+    # Storage
+
+    def _save(self, spreadsheet_id):
+        if self.db is None:
+            return
+        document = json.dumps(self.spreadsheets_by_id[spreadsheet_id])
+        with self.db:
+            self.db.execute(
+                "INSERT OR REPLACE INTO spreadsheets (spreadsheet_id, document) VALUES (?, ?)",
+                (spreadsheet_id, document),
+            )
+
+    def _spreadsheet(self, spreadsheet_id):
+        if spreadsheet_id not in self.spreadsheets_by_id:
+            raise _error(404, f"Requested entity was not found: {spreadsheet_id}")
+        return self.spreadsheets_by_id[spreadsheet_id]
+
+    def _sheet_by_id(self, spreadsheet, sheet_id):
+        for sheet in spreadsheet["sheets"]:
+            if sheet["properties"]["sheetId"] == sheet_id:
+                return sheet
+        raise _error(400, f"No grid with id: {sheet_id}")
+
+    def _new_sheet(self, spreadsheet, properties):
+        properties = copy.deepcopy(properties)
+        titles = [sheet["properties"]["title"] for sheet in spreadsheet["sheets"]]
+        sheet_ids = [sheet["properties"]["sheetId"] for sheet in spreadsheet["sheets"]]
+
+        if "sheetId" not in properties:
+            properties["sheetId"] = 0 if not sheet_ids else random.randint(1, 2 ** 31 - 1)
+        if properties["sheetId"] in sheet_ids:
+            raise _error(400, f"Invalid requests[0].addSheet: A sheet with id {properties['sheetId']} already exists")
+        properties.setdefault("title", f"Sheet{len(titles) + 1}")
+        if properties["title"] in titles:
+            raise _error(
+                400, f"Invalid requests[0].addSheet: A sheet with the name \"{properties['title']}\" already exists"
+            )
+        properties.setdefault("index", len(titles))
+        properties.setdefault("sheetType", "GRID")
+        grid = properties.setdefault("gridProperties", {})
+        grid.setdefault("rowCount", DEFAULT_ROW_COUNT)
+        grid.setdefault("columnCount", DEFAULT_COLUMN_COUNT)
+
+        sheet = {"properties": properties, "charts": [], "conditionalFormats": [], "data": []}
+        spreadsheet["sheets"].append(sheet)
+        return sheet
+
+    def _resolve(self, spreadsheet, range):
+        """Split a range into its sheet and (start_row, start_col, end_row, end_col)"""
+        sheets = {sheet["properties"]["title"]: sheet for sheet in spreadsheet["sheets"]}
+        if range in sheets:
+            return sheets[range], (0, 0, None, None)
+        if "!" in range:
+            title, notation = range.rsplit("!", 1)
+            if title.startswith("'") and title.endswith("'"):
+                title = title[1:-1].replace("''", "'")
+            if title not in sheets:
+                raise _error(400, f"Unable to parse range: {range}")
+            return sheets[title], _parse_a1(notation)
+        return spreadsheet["sheets"][0], _parse_a1(range)
+
+    # Cell grid
+
+    def _grow(self, sheet, rows, columns):
+        grid = sheet["properties"]["gridProperties"]
+        grid["rowCount"] = max(grid["rowCount"], rows)
+        grid["columnCount"] = max(grid["columnCount"], columns)
+
+    def _write(self, sheet, start_row, start_col, values):
+        data = sheet["data"]
+        for row_offset, row in enumerate(values):
+            row_index = start_row + row_offset
+            while len(data) <= row_index:
+                data.append([])
+            cells = data[row_index]
+            for col_offset, value in enumerate(row):
+                col_index = start_col + col_offset
+                while len(cells) <= col_index:
+                    cells.append(None)
+                cells[col_index] = value
+        width = max([len(row) for row in values], default=0)
+        self._grow(sheet, start_row + len(values), start_col + width)
+
+    def _clear(self, sheet, bounds):
+        start_row, start_col, end_row, end_col = bounds
+        for cells in sheet["data"][start_row:end_row]:
+            for col_index in range(start_col, len(cells) if end_col is None else min(end_col, len(cells))):
+                cells[col_index] = None
+
+    def _read(self, sheet, bounds):
+        start_row, start_col, end_row, end_col = bounds
+        values = []
+        for cells in sheet["data"][start_row:end_row]:
+            row = [_formatted(value) for value in cells[start_col:end_col]]
+            while row and row[-1] == "":
+                row.pop()
+            values.append(row)
+        while values and not values[-1]:
+            values.pop()
+        return values
+
+    # Spreadsheet operations
+
+    def create(self, body):
+        with self.lock:
+            spreadsheet_id = secrets.token_urlsafe(33)
+            spreadsheet = {
+                "spreadsheetId": spreadsheet_id,
+                "properties": copy.deepcopy(body.get("properties", {})),
+                "sheets": [],
+                "namedRanges": [],
+            }
+            spreadsheet["properties"].setdefault("title", "Untitled spreadsheet")
+            sheets = body.get("sheets") or [{"properties": {}}]
+            if isinstance(sheets, dict):
+                sheets = [sheets]
+            for sheet in sheets:
+                self._new_sheet(spreadsheet, sheet.get("properties", {}))
+
+            self.spreadsheets_by_id[spreadsheet_id] = spreadsheet
+            self._save(spreadsheet_id)
+            return self.describe(spreadsheet_id)
+
+    def describe(self, spreadsheet_id):
+        with self.lock:
+            spreadsheet = self._spreadsheet(spreadsheet_id)
+            sheets = []
+            for sheet in spreadsheet["sheets"]:
+                resource = {"properties": copy.deepcopy(sheet["properties"])}
+                if sheet["charts"]:
+                    resource["charts"] = copy.deepcopy(sheet["charts"])
+                if sheet["conditionalFormats"]:
+                    resource["conditionalFormats"] = copy.deepcopy(sheet["conditionalFormats"])
+                sheets.append(resource)
+
+            response = {
+                "spreadsheetId": spreadsheet_id,
+                "properties": copy.deepcopy(spreadsheet["properties"]),
+                "sheets": sheets,
+            }
+            if spreadsheet["namedRanges"]:
+                response["namedRanges"] = copy.deepcopy(spreadsheet["namedRanges"])
+            return response
+
+    def read_values(self, spreadsheet_id, range):
+        with self.lock:
+            sheet, bounds = self._resolve(self._spreadsheet(spreadsheet_id), range)
+            response = {"range": range, "majorDimension": "ROWS"}
+            values = self._read(sheet, bounds)
+            if values:
+                response["values"] = values
+            return response
+
+    def append_values(self, spreadsheet_id, range, values):
+        with self.lock:
+            sheet, (start_row, start_col, end_row, end_col) = self._resolve(self._spreadsheet(spreadsheet_id), range)
+            # Append below the last row holding data within the range
+            last_row = start_row - 1
+            for row_index, cells in enumerate(sheet["data"][start_row:end_row], start_row):
+                if any(value not in (None, "") for value in cells[start_col:end_col]):
+                    last_row = row_index
+            self._write(sheet, last_row + 1, start_col, values)
+            self._save(spreadsheet_id)
+            return {
+                "spreadsheetId": spreadsheet_id,
+                "updates": {"spreadsheetId": spreadsheet_id, "updatedRows": len(values)},
+            }
+
+    def update_values(self, spreadsheet_id, range, values):
+        with self.lock:
+            sheet, (start_row, start_col, _, _) = self._resolve(self._spreadsheet(spreadsheet_id), range)
+            self._write(sheet, start_row, start_col, values)
+            self._save(spreadsheet_id)
+            return {"spreadsheetId": spreadsheet_id, "updatedRows": len(values)}
+
+    def clear_values(self, spreadsheet_id, range):
+        with self.lock:
+            sheet, bounds = self._resolve(self._spreadsheet(spreadsheet_id), range)
+            self._clear(sheet, bounds)
+            self._save(spreadsheet_id)
+            return {"spreadsheetId": spreadsheet_id, "clearedRange": range}
+
+    def batch_update(self, spreadsheet_id, requests):
+        if isinstance(requests, dict):
+            requests = [requests]
+
+        with self.lock:
+            spreadsheet = self._spreadsheet(spreadsheet_id)
+            # A failing batch leaves the spreadsheet untouched, as the API does
+            snapshot = json.dumps(spreadsheet)
+            replies = []
+            try:
+                for request in requests:
+                    (kind, params), = request.items()
+                    handler = getattr(self, "_apply_" + kind, None)
+                    if handler is None:
+                        raise _error(400, f"Unsupported request in local sheet backend: {kind}")
+                    replies.append(handler(spreadsheet, params))
+            except Exception:
+                self.spreadsheets_by_id[spreadsheet_id] = json.loads(snapshot)
+                raise
+
+            self._save(spreadsheet_id)
+            return {"spreadsheetId": spreadsheet_id, "replies": replies}
+
+    # batchUpdate requests
+
+    def _apply_addSheet(self, spreadsheet, params):
+        sheet = self._new_sheet(spreadsheet, params.get("properties", {}))
+        return {"addSheet": {"properties": copy.deepcopy(sheet["properties"])}}
+
+    def _apply_addChart(self, spreadsheet, params):
+        chart = copy.deepcopy(params["chart"])
+        anchor = chart.get("position", {}).get("overlayPosition", {}).get("anchorCell", {})
+        sheet = self._sheet_by_id(spreadsheet, anchor.get("sheetId"))
+        chart.setdefault("chartId", random.randint(1, 2 ** 31 - 1))
+        sheet["charts"].append(chart)
+        return {"addChart": {"chart": copy.deepcopy(chart)}}
+
+    def _apply_deleteEmbeddedObject(self, spreadsheet, params):
+        for sheet in spreadsheet["sheets"]:
+            for chart in sheet["charts"]:
+                if chart["chartId"] == params["objectId"]:
+                    sheet["charts"].remove(chart)
+                    return {}
+        raise _error(400, f"Invalid requests[0].deleteEmbeddedObject: No object with id {params['objectId']}")
+
+    def _apply_updateCells(self, spreadsheet, params):
+        if "range" in params:
+            grid_range = params["range"]
+            sheet = self._sheet_by_id(spreadsheet, grid_range["sheetId"])
+            start_row = grid_range.get("startRowIndex", 0)
+            start_col = grid_range.get("startColumnIndex", 0)
+            bounds = (start_row, start_col, grid_range.get("endRowIndex"), grid_range.get("endColumnIndex"))
+        else:
+            start = params["start"]
+            sheet = self._sheet_by_id(spreadsheet, start["sheetId"])
+            start_row = start.get("rowIndex", 0)
+            start_col = start.get("columnIndex", 0)
+            bounds = None
+
+        fields = params.get("fields", "")
+        if "userEnteredValue" not in fields and fields != "*":
+            return {}
+
+        if "rows" in params:
+            values = [[_extended_value(cell) for cell in row.get("values", [])] for row in params["rows"]]
+            self._write(sheet, start_row, start_col, values)
+        elif bounds is not None:
+            # No rows means the fields are cleared over the whole range
+            self._clear(sheet, bounds)
+        return {}
+
+    def _apply_appendDimension(self, spreadsheet, params):
+        sheet = self._sheet_by_id(spreadsheet, params["sheetId"])
+        grid = sheet["properties"]["gridProperties"]
+        key = "rowCount" if params["dimension"] == "ROWS" else "columnCount"
+        grid[key] += params["length"]
+        return {}
+
+    def _apply_addNamedRange(self, spreadsheet, params):
+        named_range = copy.deepcopy(params["namedRange"])
+        named_range.setdefault("namedRangeId", secrets.token_hex(8))
+        spreadsheet["namedRanges"].append(named_range)
+        return {"addNamedRange": {"namedRange": copy.deepcopy(named_range)}}
+
+    def _apply_addConditionalFormatRule(self, spreadsheet, params):
+        rule = copy.deepcopy(params["rule"])
+        sheet = self._sheet_by_id(spreadsheet, rule["ranges"][0]["sheetId"])
+        sheet["conditionalFormats"].insert(params.get("index", len(sheet["conditionalFormats"])), rule)
+        return {}
+
+    def _apply_updateConditionalFormatRule(self, spreadsheet, params):
+        sheet = self._sheet_by_id(spreadsheet, params["sheetId"])
+        if params["index"] >= len(sheet["conditionalFormats"]):
+            raise _error(400, f"Invalid requests[0].updateConditionalFormatRule: No rule at index {params['index']}")
+        sheet["conditionalFormats"][params["index"]] = copy.deepcopy(params["rule"])
+        return {}
+
+    def _apply_deleteConditionalFormatRule(self, spreadsheet, params):
+        sheet = self._sheet_by_id(spreadsheet, params["sheetId"])
+        if params["index"] >= len(sheet["conditionalFormats"]):
+            raise _error(400, f"Invalid requests[0].deleteConditionalFormatRule: No rule at index {params['index']}")
+        del sheet["conditionalFormats"][params["index"]]
+        return {}
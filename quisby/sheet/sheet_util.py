@@ -1,7 +1,263 @@
+import copy
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
 from quisby import custom_logger
-from googleapiclient.discovery import build
-from quisby.sheet.sheetapi import sheet, creds
-from quisby.util import read_config
+from googleapiclient.errors import HttpError
+from quisby.sheet import sheetapi
+from quisby.sheet.local_backend import LocalRequest
+from quisby.util import get_config, read_config
+
+# Upper bound on the number of addChart requests sent in a single batchUpdate
+MAX_CHARTS_PER_BATCH = 50
+
+# Google Sheets and Drive per-minute quotas used when [quota] is absent from config.ini
+DEFAULT_REQUESTS_PER_MINUTE = {"read": 60, "write": 60, "drive": 12000}
+
+# Responses worth retrying with exponential backoff
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+# A 5xx may come back after the request was applied, so requests that add
+# something (append, batchUpdate, create) are only retried on 429
+REJECTED_STATUS_CODES = (429,)
+# Sheets calls that can safely be sent twice, besides GET and PUT (values.update)
+IDEMPOTENT_ACTIONS = (":clear", ":batchClear")
+MAX_RETRIES = 6
+BACKOFF_BASE_SECONDS = 1
+BACKOFF_MAX_SECONDS = 64
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket refilled at a fixed per-minute rate.
+
+    The bucket starts full so short bursts go out immediately, after which
+    callers are paced at the configured quota.
+
+    :requests_per_minute: quota the bucket is refilled to every minute
+    """
+
+    def __init__(self, requests_per_minute):
+        self.capacity = float(requests_per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available and consume it"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(kind):
+    """
+    Return the shared limiter for "read" or "write" Sheets requests, or
+    "drive" requests.
+
+    Quotas come from the [quota] section of config.ini
+    (read_requests_per_minute, write_requests_per_minute,
+    drive_requests_per_minute) and fall back to the Google default
+    per-user quotas.
+    """
+    with _limiters_lock:
+        if kind not in _limiters:
+            try:
+                requests_per_minute = get_config().get_int(
+                    "quota", kind + "_requests_per_minute", DEFAULT_REQUESTS_PER_MINUTE[kind]
+                )
+            except Exception:
+                requests_per_minute = DEFAULT_REQUESTS_PER_MINUTE[kind]
+            _limiters[kind] = RateLimiter(requests_per_minute)
+        return _limiters[kind]
+
+
+_local = threading.local()
+
+
+def _thread_http():
+    """httplib2 connections can't be shared, give each thread its own"""
+    if not hasattr(_local, "http"):
+        import google_auth_httplib2
+        import httplib2
+
+        _local.http = google_auth_httplib2.AuthorizedHttp(sheetapi.get_credentials(), http=httplib2.Http())
+    return _local.http
+
+
+def _request_kind(request):
+    """Limiter and retried status codes for a googleapiclient request"""
+    method = getattr(request, "method", "POST")
+    path = urlparse(getattr(request, "uri", "")).path
+    kind = "drive" if path.startswith("/drive/") else "read" if method == "GET" else "write"
+    if method in ("GET", "PUT") or path.endswith(IDEMPOTENT_ACTIONS):
+        return kind, RETRY_STATUS_CODES
+    return kind, REJECTED_STATUS_CODES
+
+
+def execute_request(request):
+    """
+    Execute a Google API request under the shared quota.
+
+    Sheets GET requests draw from the read bucket, other Sheets requests
+    from the write bucket and Drive requests from the drive bucket.
+    Rejected requests (429) are retried with jittered exponential backoff
+    before the error is raised to the caller, and so are 5xx responses to
+    requests that can be repeated safely: reads, values.update and clear.
+    Safe to call from several threads, each one uses its own HTTP
+    connection.
+
+    :request: googleapiclient HttpRequest, e.g. sheet.get(...), or a
+              LocalRequest, which is executed directly
+    """
+    if isinstance(request, LocalRequest):
+        # The offline backend has no quota to share
+        return request.execute()
+
+    kind, retry_status_codes = _request_kind(request)
+    limiter = get_rate_limiter(kind)
+
+    for attempt in range(MAX_RETRIES + 1):
+        limiter.acquire()
+        try:
+            return request.execute(http=_thread_http())
+        except HttpError as exc:
+            if exc.resp.status not in retry_status_codes or attempt == MAX_RETRIES:
+                raise
+            delay = random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+            custom_logger.warning(
+                f"Google API returned {exc.resp.status}, retrying in {delay:.1f}s "
+                f"(attempt {attempt + 1}/{MAX_RETRIES})"
+            )
+            time.sleep(delay)
+
+
+# Spreadsheet metadata needed by the graph and sheet helpers
+METADATA_FIELDS = (
+    "spreadsheetId,properties.title,"
+    "sheets(properties(sheetId,title,gridProperties(rowCount,columnCount)),charts(chartId),"
+    "conditionalFormats(ranges,booleanRule))"
+)
+
+# spreadsheetId -> {"title": str,
+#                   "sheets": {title: {"sheetId", "charts", "conditionalFormats", "rowCount", "columnCount"}}}
+_metadata = {}
+_metadata_lock = threading.RLock()
+
+# spreadsheetId -> sheet ids picked by replace_sheet_contents for sheets not created yet
+_reserved_sheet_ids = {}
+
+# batchUpdate errors caused by a sheet added, or a chart deleted, since the
+# metadata was cached
+STALE_METADATA_ERRORS = ("already exists", "No object with id", "No grid with id")
+
+
+def _parse_metadata(spreadsheet):
+    sheets = {}
+    for sheet_info in spreadsheet.get("sheets", []):
+        properties = sheet_info["properties"]
+        grid = properties.get("gridProperties", {})
+        sheets[properties["title"]] = {
+            "sheetId": properties["sheetId"],
+            "charts": [chart["chartId"] for chart in sheet_info.get("charts", [])],
+            "conditionalFormats": sheet_info.get("conditionalFormats", []),
+            "rowCount": grid.get("rowCount", 0),
+            "columnCount": grid.get("columnCount", 0),
+        }
+    return {"title": spreadsheet.get("properties", {}).get("title", ""), "sheets": sheets}
+
+
+def get_metadata(spreadsheetId):
+    """
+    Return the cached metadata of a spreadsheet, fetching it on first use.
+
+    The cache is kept up to date locally by the helpers in this module
+    whenever they add sheets or charts, so it is only refetched after
+    invalidate_metadata().
+    """
+    with _metadata_lock:
+        if spreadsheetId not in _metadata:
+            response = execute_request(sheetapi.spreadsheets().get(spreadsheetId=spreadsheetId, fields=METADATA_FIELDS))
+            _metadata[spreadsheetId] = _parse_metadata(response)
+        return _metadata[spreadsheetId]
+
+
+def invalidate_metadata(spreadsheetId=None):
+    """Drop cached metadata for one spreadsheet, or for all of them"""
+    with _metadata_lock:
+        if spreadsheetId is None:
+            _metadata.clear()
+        else:
+            _metadata.pop(spreadsheetId, None)
+
+
+def _sheet_metadata(spreadsheetId, test_name):
+    sheets = get_metadata(spreadsheetId)["sheets"]
+    if test_name not in sheets:
+        # The sheet may have been added outside of this process
+        invalidate_metadata(spreadsheetId)
+        sheets = get_metadata(spreadsheetId)["sheets"]
+    if test_name not in sheets:
+        raise ValueError(f"Sheet '{test_name}' not found in spreadsheet {spreadsheetId}")
+    return sheets[test_name]
+
+
+def get_spreadsheet_title(spreadsheetId):
+    return get_metadata(spreadsheetId)["title"]
+
+
+def get_sheet_titles(spreadsheetId):
+    return list(get_metadata(spreadsheetId)["sheets"])
+
+
+def get_sheet_id(spreadsheetId, test_name):
+    return _sheet_metadata(spreadsheetId, test_name)["sheetId"]
+
+
+def get_chart_ids(spreadsheetId, test_name):
+    return list(_sheet_metadata(spreadsheetId, test_name)["charts"])
+
+
+def get_conditional_formats(spreadsheetId, test_name):
+    return copy.deepcopy(_sheet_metadata(spreadsheetId, test_name)["conditionalFormats"])
+
+
+def record_conditional_formats(spreadsheetId, test_name, rules):
+    """Replace the cached conditional format rules of a sheet after changing them"""
+    with _metadata_lock:
+        _sheet_metadata(spreadsheetId, test_name)["conditionalFormats"] = rules
+
+
+def _record_charts(spreadsheetId, replies):
+    """Add the chart ids returned by an addChart batchUpdate to the cache"""
+    with _metadata_lock:
+        if spreadsheetId not in _metadata:
+            return
+        sheets_by_id = {info["sheetId"]: info for info in _metadata[spreadsheetId]["sheets"].values()}
+        for reply in replies:
+            chart = reply.get("addChart", {}).get("chart")
+            if not chart:
+                continue
+            anchor = chart.get("position", {}).get("overlayPosition", {}).get("anchorCell", {})
+            info = sheets_by_id.get(anchor.get("sheetId"))
+            if info is None:
+                # Chart placed somewhere we can't attribute, refetch next time
+                _metadata.pop(spreadsheetId, None)
+                return
+            info["charts"].append(chart["chartId"])
 
 
 def check_sheet_exists(sheet_info, test_name):
@@ -16,9 +272,9 @@ def check_sheet_exists(sheet_info, test_name):
 def permit_users(spreadsheetId, notification):
     custom_logger.info("Providing write access to specified users")
     users = read_config("access", "users").split(",")
-    if users == ['']:
+    if users == [''] or sheetapi.is_local():
         return
-    drive_api = build('drive', 'v3', credentials=creds)
+    drive_api = sheetapi.get_drive_service()
     for user in users:
         try:
             domain_permission = {
@@ -33,7 +289,7 @@ def permit_users(spreadsheetId, notification):
                 fields="id"
             )
 
-            req.execute()
+            execute_request(req)
         except Exception as exc:
             custom_logger.debug(str(exc))
             custom_logger.error("Unable to provide access to this user : "+user)
@@ -59,8 +315,10 @@ def create_spreadsheet(spreadsheet_name, test_name, notification):
         },
     }
 
-    spreadsheet = sheet.create(body=spreadsheet).execute()
+    spreadsheet = execute_request(sheetapi.spreadsheets().create(body=spreadsheet))
     spreadsheetid = spreadsheet["spreadsheetId"]
+    with _metadata_lock:
+        _metadata[spreadsheetid] = _parse_metadata(spreadsheet)
     permit_users(spreadsheetid, notification)
     return spreadsheetid
 
@@ -69,9 +327,9 @@ def get_sheet(spreadsheetId, test_name,range="!a:z"):
 
     if test_name == []:
         #create sheet
-        return sheet.get(spreadsheetId=spreadsheetId).execute()
+        return execute_request(sheetapi.spreadsheets().get(spreadsheetId=spreadsheetId))
     else:
-        return sheet.get(spreadsheetId=spreadsheetId,ranges=test_name+range).execute()
+        return execute_request(sheetapi.spreadsheets().get(spreadsheetId=spreadsheetId,ranges=test_name+range))
 
 
 def create_sheet(spreadsheetId, test_name):
@@ -82,34 +340,192 @@ def create_sheet(spreadsheetId, test_name):
     :spreadsheetId
     :test_name: range to graph up the data, it will be mostly sheet name
     """
-    sheet_info = get_sheet(spreadsheetId, [])["sheets"]
-
-    # Create sheet if it doesn't exit
-    if not check_sheet_exists(sheet_info, test_name):
-        custom_logger.info("Sheet for this benchmark doesn't exist. Creating...")
-        sheet_count = len(sheet_info)
-
-        requests = {
-            "addSheet": {
-                "properties": {
-                    "sheetId": sheet_count + 1,
-                    "title": test_name,
-                    "gridProperties": {
-                        "frozenRowCount": 1,
-                    },
+    # Sheet ids are picked locally, so sheets are added one at a time
+    with _metadata_lock:
+        sheet_info = get_metadata(spreadsheetId)["sheets"]
+
+        # Create sheet if it doesn't exit
+        if test_name not in sheet_info:
+            custom_logger.info("Sheet for this benchmark doesn't exist. Creating...")
+            sheet_id = max([info["sheetId"] for info in sheet_info.values()], default=0) + 1
+
+            requests = {
+                "addSheet": {
+                    "properties": {
+                        "sheetId": sheet_id,
+                        "title": test_name,
+                        "gridProperties": {
+                            "frozenRowCount": 1,
+                        },
+                    }
                 }
             }
-        }
 
-        body = {"requests": requests}
+            body = {"requests": requests}
+
+            response = execute_request(sheetapi.spreadsheets().batchUpdate(spreadsheetId=spreadsheetId, body=body))
+            properties = response["replies"][0]["addSheet"]["properties"]
+            grid = properties.get("gridProperties", {})
+            sheet_info[test_name] = {
+                "sheetId": properties["sheetId"],
+                "charts": [],
+                "conditionalFormats": [],
+                "rowCount": grid.get("rowCount", 0),
+                "columnCount": grid.get("columnCount", 0),
+            }
+
+
+def _is_stale_metadata(exc):
+    """Whether a batchUpdate was rejected because the cached metadata is out of date"""
+    return exc.resp.status == 400 and any(message in str(exc) for message in STALE_METADATA_ERRORS)
+
+
+def replace_sheet_contents(spreadsheet_id, test_name, rows):
+    """
+    Replace the charts and data of a benchmark sheet with rows
+
+    Creating the sheet when it is missing, deleting its charts and clearing
+    its values are sent as a single batchUpdate, followed by one values
+    append for the new rows. A batchUpdate rejected because the cached
+    metadata is out of date is retried once with fresh metadata.
+
+    :spreadsheet_id
+    :test_name: sheet title, it will be mostly the benchmark name
+    :rows: list of rows to write starting at A1
+    """
+    for attempt in range(2):
+        with _metadata_lock:
+            sheet_info = get_metadata(spreadsheet_id)["sheets"]
+            requests = []
+            new_sheet_id = None
+
+            deleted_charts = []
+
+            if test_name in sheet_info:
+                sheet_id = sheet_info[test_name]["sheetId"]
+                deleted_charts = list(sheet_info[test_name]["charts"])
+                for chart_id in deleted_charts:
+                    requests.append({"deleteEmbeddedObject": {"objectId": chart_id}})
+            else:
+                custom_logger.info("Sheet for this benchmark doesn't exist. Creating...")
+                # Sheet ids are picked locally, reserved until the sheet is created
+                reserved = _reserved_sheet_ids.setdefault(spreadsheet_id, set())
+                sheet_id = new_sheet_id = max([info["sheetId"] for info in sheet_info.values()] + list(reserved),
+                                              default=0) + 1
+                reserved.add(new_sheet_id)
+                requests.append(
+                    {
+                        "addSheet": {
+                            "properties": {
+                                "sheetId": sheet_id,
+                                "title": test_name,
+                                "gridProperties": {
+                                    "frozenRowCount": 1,
+                                },
+                            }
+                        }
+                    }
+                )
+
+            # Without rows, updateCells clears the given fields over the whole sheet
+            requests.append({"updateCells": {"range": {"sheetId": sheet_id}, "fields": "userEnteredValue"}})
+
+        invalidate_values(spreadsheet_id)
+        try:
+            response = execute_request(
+                sheetapi.spreadsheets().batchUpdate(spreadsheetId=spreadsheet_id, body={"requests": requests})
+            )
+        except HttpError as exc:
+            if attempt or not _is_stale_metadata(exc):
+                raise
+            # A sheet or chart changed since the metadata was cached, refetch and retry once
+            custom_logger.warning("Spreadsheet changed since it was read, retrying with fresh metadata")
+            invalidate_metadata(spreadsheet_id)
+            continue
+        finally:
+            if new_sheet_id is not None:
+                with _metadata_lock:
+                    _reserved_sheet_ids[spreadsheet_id].discard(new_sheet_id)
+        break
+
+    with _metadata_lock:
+        cached = _metadata.get(spreadsheet_id)
+        if cached is None or cached["sheets"] is not sheet_info:
+            # Refetched while the batch was in flight, possibly from before it
+            invalidate_metadata(spreadsheet_id)
+        else:
+            if new_sheet_id is None:
+                # Charts added by other threads since the request was built are kept
+                sheet_info[test_name]["charts"] = [chart_id for chart_id in sheet_info[test_name]["charts"]
+                                                   if chart_id not in deleted_charts]
+            else:
+                properties = response["replies"][0]["addSheet"]["properties"]
+                grid = properties.get("gridProperties", {})
+                sheet_info[test_name] = {
+                    "sheetId": properties["sheetId"],
+                    "charts": [],
+                    "conditionalFormats": [],
+                    "rowCount": grid.get("rowCount", 0),
+                    "columnCount": grid.get("columnCount", 0),
+                }
+            # values.append grows the grid when the rows don't fit
+            sheet_info[test_name]["rowCount"] = max(sheet_info[test_name]["rowCount"], len(rows))
+
+    return append_to_sheet(spreadsheet_id, rows, test_name)
 
-        sheet.batchUpdate(spreadsheetId=spreadsheetId, body=body).execute()
+
+# spreadsheetId -> {range: values} filled by prefetch_sheets()
+_values = {}
+_values_lock = threading.Lock()
+
+
+def prefetch_sheets(spreadsheetId, ranges):
+    """
+    Fetch several ranges of a spreadsheet with a single values.batchGet
+
+    The values are kept in memory and served by read_sheet() for the same
+    range string until a write to the spreadsheet invalidates them.
+
+    :spreadsheetId
+    :ranges: list of ranges, mostly benchmark sheet titles, or a dict from
+             the range read_sheet() will be given to the range to fetch
+    """
+    if not isinstance(ranges, dict):
+        ranges = {range: range for range in ranges}
+    if not ranges:
+        return
+    keys = list(ranges)
+    request = sheetapi.spreadsheets().values().batchGet(spreadsheetId=spreadsheetId,
+                                                        ranges=[ranges[key] for key in keys])
+    result = execute_request(request)
+    # valueRanges are returned in the order the ranges were requested
+    fetched = {
+        key: value_range.get("values", [])
+        for key, value_range in zip(keys, result.get("valueRanges", []))
+    }
+    with _values_lock:
+        _values.setdefault(spreadsheetId, {}).update(fetched)
+
+
+def invalidate_values(spreadsheetId=None):
+    """Drop prefetched values for one spreadsheet, or for all of them"""
+    with _values_lock:
+        if spreadsheetId is None:
+            _values.clear()
+        else:
+            _values.pop(spreadsheetId, None)
 
 
 def read_sheet(spreadsheet_Id, range="A:Z"):
+    with _values_lock:
+        cached = _values.get(spreadsheet_Id, {}).get(range)
+    if cached is not None:
+        # Callers modify the rows they get back, keep the cached copy intact
+        return copy.deepcopy(cached)
+
     # TODO : check for the previous api
-    request=sheet.values().batchGet(spreadsheetId=spreadsheet_Id, ranges=range)
-    result=request.execute()
+    request=sheetapi.spreadsheets().values().batchGet(spreadsheetId=spreadsheet_Id, ranges=range)
+    result=execute_request(request)
     values = result.get("valueRanges", [])[0].get('values',[])
     return values
 
@@ -117,24 +533,24 @@ def read_sheet(spreadsheet_Id, range="A:Z"):
 def append_to_sheet(spreadsheet_Id, results, range="A:F"):
     """"""
 
+    invalidate_values(spreadsheet_Id)
     body = {"values": results}
 
-    response = (
-        sheet.values()
+    response = execute_request(
+        sheetapi.spreadsheets().values()
         .append(
             spreadsheetId=spreadsheet_Id,
             range=range,
             valueInputOption="USER_ENTERED",
             body=body,
         )
-        .execute()
     )
     return response
 
 
 def apply_named_range(spreadsheetId, name, range="A:Z"):
 
-    sheetId = get_sheet(spreadsheetId, range)["sheets"][0]["properties"]["sheetId"]
+    sheetId = get_sheet_id(spreadsheetId, range.split("!")[0])
 
     sheet_range = range.split("!")[1].split(":")
 
@@ -158,31 +574,30 @@ def apply_named_range(spreadsheetId, name, range="A:Z"):
         ]
     }
 
-    response = (
-        service.spreadsheets()
-        .batchUpdate(spreadsheetId=spreadsheetId, body=body)
-        .execute()
+    response = execute_request(
+        sheetapi.spreadsheets().batchUpdate(spreadsheetId=spreadsheetId, body=body)
     )
 
     custom_logger.info(response)
 
 
 def clear_sheet_data(spreadsheetid, range):
-    sheet.values().clear(spreadsheetId=spreadsheetid, range=range, body={}).execute()
+    invalidate_values(spreadsheetid)
+    execute_request(sheetapi.spreadsheets().values().clear(spreadsheetId=spreadsheetid, range=range, body={}))
 
 
 def clear_sheet_charts(spreadsheetid, range):
 
-    sheet_properties = get_sheet(spreadsheetid, range)
+    sheet_info = _sheet_metadata(spreadsheetid, range)
 
-    if "charts" in sheet_properties["sheets"][0]:
-        for chart in sheet_properties["sheets"][0]["charts"]:
+    for chart_id in list(sheet_info["charts"]):
 
-            requests = {"deleteEmbeddedObject": {"objectId": chart["chartId"]}}
+        requests = {"deleteEmbeddedObject": {"objectId": chart_id}}
 
-            body = {"requests": requests}
+        body = {"requests": requests}
 
-            sheet.batchUpdate(spreadsheetId=spreadsheetid, body=body).execute()
+        execute_request(sheetapi.spreadsheets().batchUpdate(spreadsheetId=spreadsheetid, body=body))
+        sheet_info["charts"].remove(chart_id)
 
 
 def get_named_range(spreadsheetId, range="A:F"):
@@ -193,8 +608,8 @@ def get_named_range(spreadsheetId, range="A:F"):
 
 def append_empty_row_sheet(spreadsheetId, rows,range):
     
-    sheetId = get_sheet(spreadsheetId, range)["sheets"][0]["properties"]["sheetId"]
-
+    sheet_info = _sheet_metadata(spreadsheetId, range)
+    sheetId = sheet_info["sheetId"]
 
     body = {
         "requests": [
@@ -208,11 +623,13 @@ def append_empty_row_sheet(spreadsheetId, rows,range):
         ]
     }
 
-    sheet.batchUpdate(spreadsheetId=spreadsheetId, body=body).execute()
+    execute_request(sheetapi.spreadsheets().batchUpdate(spreadsheetId=spreadsheetId, body=body))
+    sheet_info["rowCount"] += rows
 
 
 def append_empty_col_sheet(spreadsheetId, cols, range):
-    sheetId = get_sheet(spreadsheetId, range)["sheets"][0]["properties"]["sheetId"]
+    sheet_info = _sheet_metadata(spreadsheetId, range)
+    sheetId = sheet_info["sheetId"]
 
     body = {
         "requests": [
@@ -226,4 +643,37 @@ def append_empty_col_sheet(spreadsheetId, cols, range):
         ]
     }
 
-    sheet.batchUpdate(spreadsheetId=spreadsheetId, body=body).execute()
\ No newline at end of file
+    execute_request(sheetapi.spreadsheets().batchUpdate(spreadsheetId=spreadsheetId, body=body))
+    sheet_info["columnCount"] += cols
+
+
+class ChartWriter:
+    """
+    Accumulates addChart requests for a spreadsheet and sends them together.
+
+    Graph modules push every chart they build with add() and call flush()
+    once the sheet is done, so a sheet costs one batchUpdate per
+    MAX_CHARTS_PER_BATCH charts instead of one call per chart.
+
+    :spreadsheetId
+    :batch_size: maximum number of requests sent per batchUpdate
+    """
+
+    def __init__(self, spreadsheetId, batch_size=MAX_CHARTS_PER_BATCH):
+        self.spreadsheetId = spreadsheetId
+        self.batch_size = batch_size
+        self.requests = []
+
+    def add(self, request):
+        self.requests.append(request)
+
+    def flush(self):
+        """Send all pending requests and return the batchUpdate replies"""
+        replies = []
+        while self.requests:
+            body = {"requests": self.requests[:self.batch_size]}
+            response = execute_request(sheetapi.spreadsheets().batchUpdate(spreadsheetId=self.spreadsheetId, body=body))
+            _record_charts(self.spreadsheetId, response.get("replies", []))
+            replies.extend(response.get("replies", []))
+            del self.requests[:self.batch_size]
+        return replies
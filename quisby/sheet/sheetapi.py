@@ -1,11 +1,11 @@
-from googleapiclient.discovery import build
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
+import json
 import os
 import sys
+import threading
+import time
 
 from quisby import custom_logger
+from quisby.sheet.local_backend import LocalSheetsService
 
 home_dir = os.getenv("HOME")
 CONFIG_DIR = home_dir + '/.quisby/config/'
@@ -16,6 +16,16 @@ SCOPES = [
     'https://www.googleapis.com/auth/drive'
 ]
 DISCOVERY_SERVICE_URL = 'https://sheets.googleapis.com/$discovery/rest?version=v4'
+DRIVE_DISCOVERY_URL = 'https://www.googleapis.com/discovery/v1/apis/drive/v3/rest'
+
+# Discovery documents are kept here and refetched once they are a week old
+CACHE_DIR = home_dir + '/.quisby/cache/'
+DISCOVERY_CACHE_TTL = 7 * 24 * 60 * 60
+
+# QUISBY_SHEET_BACKEND=local swaps Google Sheets for LocalSheetsService,
+# stored in QUISBY_LOCAL_SHEETS_DB when set and in memory otherwise
+BACKEND_ENV = 'QUISBY_SHEET_BACKEND'
+LOCAL_DB_ENV = 'QUISBY_LOCAL_SHEETS_DB'
 
 
 def check_google_credentials_exist():
@@ -26,25 +36,166 @@ def check_google_credentials_exist():
         sys.exit(1)
 
 
-check_google_credentials_exist()
+def _read_discovery_document(path, name, version):
+    """Return the cached document at path, or None if it is missing or for another API"""
+    try:
+        with open(path) as cache_file:
+            document = cache_file.read()
+        parsed = json.loads(document)
+    except (OSError, ValueError):
+        return None
+    if parsed.get("name") != name or parsed.get("version") != version:
+        return None
+    return document
+
+
+def load_discovery_document(name, version, url):
+    """
+    Return the discovery document of a Google API, using the on-disk cache
+
+    A cached copy younger than DISCOVERY_CACHE_TTL is used as is, otherwise
+    the document is refetched from url. If that fails the stale copy, or the
+    one bundled with googleapiclient, is used instead.
+
+    :name: API name, e.g. "sheets"
+    :version: API version, e.g. "v4"
+    :url: discovery URL to refresh the cache from
+    """
+    path = os.path.join(CACHE_DIR, f"discovery-{name}-{version}.json")
+    cached = _read_discovery_document(path, name, version)
+    if cached is not None and time.time() - os.path.getmtime(path) < DISCOVERY_CACHE_TTL:
+        return cached
+
+    try:
+        import httplib2
+
+        response, content = httplib2.Http(timeout=30).request(url)
+        if response.status != 200:
+            raise RuntimeError(f"HTTP {response.status}")
+        document = content.decode("utf-8")
+        parsed = json.loads(document)
+        if parsed.get("name") != name or parsed.get("version") != version:
+            raise ValueError(f"got {parsed.get('name')} {parsed.get('version')}")
+    except Exception as exc:
+        from googleapiclient.discovery_cache import get_static_doc
+
+        document = cached or get_static_doc(name, version)
+        if document is None:
+            raise
+        custom_logger.warning(f"Failed to refresh {name} {version} discovery document ({exc}), using a local copy")
+        return document
+
+    # Write through a temporary file so concurrent runs never read a partial document
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as cache_file:
+        cache_file.write(document)
+    os.replace(tmp_path, path)
+    return document
+
+
+def build_google_service():
+    """Authorize with the stored OAuth token and build the Sheets service"""
+    # Imported here so commands that never reach Google don't pay for them
+    from googleapiclient.discovery import build_from_document
+    from google.auth.transport.requests import Request
+    from google.oauth2.credentials import Credentials
+    from google_auth_oauthlib.flow import InstalledAppFlow
+
+    check_google_credentials_exist()
+
+    creds = None
+
+    # If token already exists, load it
+    if os.path.exists(TOKEN_FILE):
+        creds = Credentials.from_authorized_user_file(TOKEN_FILE, SCOPES)
+
+    # If no valid creds, do the OAuth flow
+    if not creds or not creds.valid:
+        if creds and creds.expired and creds.refresh_token:
+            creds.refresh(Request())
+        else:
+            flow = InstalledAppFlow.from_client_secrets_file(OAUTH_CLIENT_FILE, SCOPES)
+            creds = flow.run_local_server(port=0)
+        # Save credentials for next run
+        with open(TOKEN_FILE, 'w') as token:
+            token.write(creds.to_json())
+
+    # Build the Sheets service
+    return creds, build_from_document(load_discovery_document("sheets", "v4", DISCOVERY_SERVICE_URL), credentials=creds)
+
+
+_service = None
+_creds = None
+_service_lock = threading.Lock()
+
+
+def set_backend(backend, credentials=None):
+    """
+    Route all sheet calls through backend
+
+    :backend: object with a googleapiclient style spreadsheets() resource,
+              e.g. LocalSheetsService
+    :credentials: Google credentials, only needed for the live service
+    """
+    global _service, _creds
+    with _service_lock:
+        _service = backend
+        _creds = credentials
+
+
+def get_service():
+    """
+    Return the active sheet service, creating it on first use
+
+    Authentication and discovery only happen here, so importing this module
+    is free for commands that never talk to Google Sheets.
+    """
+    global _service, _creds
+    with _service_lock:
+        if _service is None:
+            if os.getenv(BACKEND_ENV, "google") == "local":
+                _service = LocalSheetsService(os.getenv(LOCAL_DB_ENV))
+            else:
+                _creds, _service = build_google_service()
+        return _service
+
+
+_drive_service = None
+
+
+def get_drive_service():
+    """Return the Drive service used for sharing, built once from the cached discovery document"""
+    global _drive_service
+    from googleapiclient.discovery import build_from_document
+
+    credentials = get_credentials()
+    with _service_lock:
+        if _drive_service is None:
+            document = load_discovery_document("drive", "v3", DRIVE_DISCOVERY_URL)
+            _drive_service = build_from_document(document, credentials=credentials)
+        return _drive_service
+
+
+def get_credentials():
+    get_service()
+    return _creds
+
+
+def spreadsheets():
+    return get_service().spreadsheets()
 
-creds = None
 
-# If token already exists, load it
-if os.path.exists(TOKEN_FILE):
-    creds = Credentials.from_authorized_user_file(TOKEN_FILE, SCOPES)
+def is_local():
+    return isinstance(get_service(), LocalSheetsService)
 
-# If no valid creds, do the OAuth flow
-if not creds or not creds.valid:
-    if creds and creds.expired and creds.refresh_token:
-        creds.refresh(Request())
-    else:
-        flow = InstalledAppFlow.from_client_secrets_file(OAUTH_CLIENT_FILE, SCOPES)
-        creds = flow.run_local_server(port=0)
-    # Save credentials for next run
-    with open(TOKEN_FILE, 'w') as token:
-        token.write(creds.to_json())
 
-# Build the Sheets service
-service = build("sheets", "v4", credentials=creds, discoveryServiceUrl=DISCOVERY_SERVICE_URL)
-sheet = service.spreadsheets()
+def __getattr__(name):
+    # Module level service, sheet and creds used to be built at import time
+    if name == "service":
+        return get_service()
+    if name == "sheet":
+        return spreadsheets()
+    if name == "creds":
+        return get_credentials()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,97 +1,265 @@
+import functools
 import re
-from configparser import ConfigParser
+import threading
+from configparser import ConfigParser, NoOptionError, NoSectionError
 import os
+import shutil
+from types import MappingProxyType
 
 home_dir = os.getenv("HOME")
 config_location = None
 
 invalid_compare_list = ["pig"]
 
+_UNSET = object()
+
 
 def create_parser():
     configur = ConfigParser()
     return configur
 
 
+class ConfigSnapshot:
+    """
+    Read-only view of config.ini, parsed once.
+
+    Lookups behave like ConfigParser.get(): option names are case
+    insensitive and a missing section or option raises NoSectionError or
+    NoOptionError unless a fallback is given.
+    """
+
+    def __init__(self, path, sections, mtime=None):
+        self.path = path
+        self.mtime = mtime
+        self._sections = MappingProxyType(
+            {name: MappingProxyType(dict(values)) for name, values in sections.items()}
+        )
+
+    @classmethod
+    def load(cls, path):
+        mtime = os.path.getmtime(path)
+        configur = create_parser()
+        with open(path) as configfile:
+            configur.read_file(configfile)
+        return cls(path, {section: dict(configur.items(section)) for section in configur.sections()}, mtime)
+
+    def sections(self):
+        return list(self._sections)
+
+    def get(self, section, key, fallback=_UNSET):
+        if section not in self._sections:
+            if fallback is _UNSET:
+                raise NoSectionError(section)
+            return fallback
+        values = self._sections[section]
+        if key.lower() not in values:
+            if fallback is _UNSET:
+                raise NoOptionError(key, section)
+            return fallback
+        return values[key.lower()]
+
+    def get_int(self, section, key, fallback=_UNSET):
+        value = self.get(section, key, fallback)
+        return value if value is fallback else int(value)
+
+    def get_float(self, section, key, fallback=_UNSET):
+        value = self.get(section, key, fallback)
+        return value if value is fallback else float(value)
+
+    def get_bool(self, section, key, fallback=_UNSET):
+        value = self.get(section, key, fallback)
+        if value is fallback:
+            return value
+        if value.lower() not in ConfigParser.BOOLEAN_STATES:
+            raise ValueError(f"Not a boolean: {value}")
+        return ConfigParser.BOOLEAN_STATES[value.lower()]
+
+    def get_list(self, section, key, fallback=_UNSET):
+        """Comma separated value as a list, empty items dropped"""
+        value = self.get(section, key, fallback)
+        if value is fallback:
+            return value
+        return [item.strip() for item in value.split(",") if item.strip()]
+
+
+_snapshot = None
+# Guards loading the snapshot and read-modify-write cycles on the config file
+_config_lock = threading.Lock()
+
+
+def get_config(reload=False):
+    """
+    Return the config.ini snapshot, parsing the file on first use.
+
+    The snapshot is parsed again when config_location changes and, with
+    reload=True, when the file was modified on disk since it was loaded.
+    """
+    global _snapshot
+    snapshot = _snapshot
+    if snapshot is not None and snapshot.path == config_location:
+        if not reload or os.path.getmtime(config_location) == snapshot.mtime:
+            return snapshot
+
+    with _config_lock:
+        snapshot = _snapshot
+        if (snapshot is None or snapshot.path != config_location
+                or (reload and os.path.getmtime(config_location) != snapshot.mtime)):
+            _snapshot = ConfigSnapshot.load(config_location)
+        return _snapshot
+
+
 def read_config(section, key):
-    global config_location
-    configur = create_parser()
-    with open(config_location) as configfile:
-        configur.read(config_location)
-        if configur.get(section,key) is not None:
-            return configur.get(section,key)
-        else:
-            return None
+    return get_config().get(section, key)
+
+
+THRESHOLD_FILE = "threshold.ini"
+DEFAULT_THRESHOLD = "5"
+
+# threshold.ini snapshot and the config_location it was resolved for
+_thresholds = (None, None)
+
+
+def threshold_location():
+    """
+    Path of threshold.ini, looked up next to config.ini first, then in the
+    package and in the source tree it was installed from. None if there is
+    no such file.
+    """
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    candidates = [package_dir, os.path.dirname(package_dir)]
+    if config_location:
+        candidates.insert(0, os.path.dirname(os.path.abspath(config_location)))
+    for directory in candidates:
+        path = os.path.join(directory, THRESHOLD_FILE)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def get_thresholds():
+    """
+    Return the threshold.ini snapshot. The file is located and parsed
+    once, and again only when config_location changes.
+    """
+    global _thresholds
+    location, thresholds = _thresholds
+    if thresholds is not None and location == config_location:
+        return thresholds
+    with _config_lock:
+        location, thresholds = _thresholds
+        if thresholds is None or location != config_location:
+            path = threshold_location()
+            thresholds = ConfigSnapshot.load(path) if path else ConfigSnapshot(None, {})
+            _thresholds = (config_location, thresholds)
+        return thresholds
 
 
 def read_value(section, key):
-    global config_location
-    configur = create_parser()
-    with open("threshold.ini") as configfile:
-        configur.read("threshold.ini")
-        if configur.get(section, key) is not None:
-            return configur.get(section, key)
-        else:
-            return None
+    value = get_thresholds().get(section, key, None)
+    return value if value else None
 
 
-def write_config(section,key,value):
-    configur = create_parser()
-    global config_location
-    configur.read(config_location)
-    configur.set(section, key, value)
-    with open(config_location,"w") as configfile:
-        configur.write(configfile)
+def get_threshold(test_name, default=DEFAULT_THRESHOLD):
+    """%Diff threshold for a sheet, default when threshold.ini leaves it empty"""
+    return read_value("percent_threshold", test_name) or default
 
 
-def process_instance(instance_name, *args):
-    cloud_type = read_config("cloud","cloud_type")
-    """Process the instance name to extract cloud details based on regex patterns."""
-    if "local" in instance_name:
-        cloud_type = "local"
-        machine = "local"
-    else:
-        machine = instance_name
-
-    # Define regex patterns based on cloud type
-    patterns = {
+def write_config(section,key,value):
+    """
+    Set a value in config.ini and in the current snapshot.
+
+    The file is replaced atomically, so readers see either the old or
+    the new contents, and the snapshot is swapped in one step.
+    """
+    global _snapshot
+    with _config_lock:
+        configur = create_parser()
+        configur.read(config_location)
+        configur.set(section, key, value)
+        tmp_location = f"{config_location}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_location,"w") as configfile:
+                configur.write(configfile)
+            if os.path.exists(config_location):
+                shutil.copymode(config_location, tmp_location)
+            os.replace(tmp_location, config_location)
+        except BaseException:
+            # Leave config.ini as it was, without a stray temporary file
+            if os.path.exists(tmp_location):
+                os.remove(tmp_location)
+            raise
+        _snapshot = ConfigSnapshot.load(config_location)
+
+
+INSTANCE_FIELDS = ("family", "version", "sub_family", "feature", "size", "bool_xlarge", "machine_type")
+
+# Instance name patterns per cloud, compiled once
+INSTANCE_PATTERNS = {
+    cloud: re.compile(pattern, flags=re.IGNORECASE) for cloud, pattern in {
         "azure": r"Standard_(?P<family>\w)(?P<size>\d+)(?P<feature>\w*)_(?P<version>\w\d)",
         "aws": r"(?P<family>\w)(?P<version>\d)(?P<feature>\w+)?.(?P<size>\d+)?(?P<bool_xlarge>x)?(?P<machine_type>\w+)",
         "gcp": r"(?P<family>\w)(?P<version>\d)(?P<sub_family>\w)?-(?P<feature>\w+)?-(?P<size>\d+)?",
         "local": r"(?P<family>\D+)"
-    }
+    }.items()
+}
+
+
+class InstanceName:
+    """
+    Parsed instance name, fields missing from the cloud pattern or
+    from the name are None.
+
+    :name: instance name as given
+    :cloud: cloud type the name was parsed for
+    :matched: False if the name did not match the cloud pattern
+    """
 
-    # Select the pattern based on the cloud type
-    pattern = patterns.get(cloud_type, r"")
+    __slots__ = ("name", "cloud", "matched") + INSTANCE_FIELDS
 
-    # Apply the regex
-    regex_match = re.match(pattern, machine, flags=re.IGNORECASE)
-    if not regex_match:
-        return None
-    return regex_match.group(*args)
+    def __init__(self, name, cloud, match=None):
+        self.name = name
+        self.cloud = cloud
+        self.matched = match is not None
+        groups = match.groupdict() if match else {}
+        for field in INSTANCE_FIELDS:
+            setattr(self, field, groups.get(field))
 
+    def key(self, *fields):
+        """Tuple of the given fields, used as sort and group key"""
+        return tuple(getattr(self, field) for field in fields)
 
-def process_group(label_name, *args):
-    cloud_type = read_config("cloud","cloud_type")
-    if cloud_type == "azure":
-        pattern = r"Standard_(?P<family>\w)(?P<sub_family>\D)?(?P<size>\d+)(?P<feature>\w+)?_(?P<accel_type>\w\d)?_?(?P<version>\w\d)"
+    def __eq__(self, other):
+        return isinstance(other, InstanceName) and (self.cloud, self.name) == (other.cloud, other.name)
 
-    if cloud_type == "aws":
-        pattern = r"(?P<family>\w)(?P<version>\d)(?P<feature>\w+)?.(?P<size>\d+)?(?P<bool_xlarge>x)?(?P<machine_type>\w+)"
+    def __hash__(self):
+        return hash((self.cloud, self.name))
 
-    if cloud_type == "gcp":
-        pattern = r"(?P<family>\w)(?P<version>\d)(?P<sub_family>\w)?-(?P<feature>\w+)?-(?P<size>\d+)?"
+    def __repr__(self):
+        return "InstanceName({!r}, {!r})".format(self.cloud, self.name)
 
-    if cloud_type == "local":
-        pattern = r"(?P<family>\D+)(?P<size>\d+)"
-        regex_match = re.match(pattern, label_name, flags=re.IGNORECASE)
-        if "size" in args:
-            return regex_match.group(2)
-        else:
-            return regex_match.group(1)
 
-    regex_match = re.match(pattern, label_name, flags=re.IGNORECASE)
-    return regex_match.group(*args)
+@functools.lru_cache(maxsize=4096)
+def _parse_instance(cloud_type, instance_name):
+    if "local" in instance_name:
+        cloud_type = "local"
+        machine = "local"
+    else:
+        machine = instance_name
+    pattern = INSTANCE_PATTERNS.get(cloud_type)
+    return InstanceName(instance_name, cloud_type, pattern.match(machine) if pattern else None)
+
+
+def parse_instance(instance_name, cloud_type=None):
+    """
+    Parse an instance name for the configured cloud.
+
+    Results are cached per (cloud, name) so sort and group keys can call
+    this for every comparison.
+    """
+    if cloud_type is None:
+        cloud_type = read_config("cloud", "cloud_type")
+    return _parse_instance(cloud_type, instance_name)
+
 
 def mk_int(string):
     """Convert string to an integer, return 1 for 'local' or empty strings."""
@@ -117,64 +285,98 @@ def percentage_deviation(item1,item2):
     return round(percentage_deviation, 6)
 
 
+def _float_block(rows):
+    """2-D float array of the cells, NaN where a cell is not a number"""
+    import numpy as np
+
+    block = np.full((len(rows), len(rows[0]) if rows else 0), np.nan)
+    for index, row in enumerate(rows):
+        try:
+            block[index] = np.fromiter(map(float, row), dtype=float, count=len(row))
+        except (TypeError, ValueError):
+            # Header rows and rows holding "fail" cells
+            for column, cell in enumerate(row):
+                try:
+                    block[index, column] = float(cell)
+                except (TypeError, ValueError):
+                    pass
+    return block
+
+
+def deviation_block(block1, block2):
+    """
+    Percentage deviation of block2 from block1, cell by cell.
+
+    :block1, block2: aligned lists of rows
+    :return: float array, NaN where either cell is not a number or is zero
+    """
+    import numpy as np
+
+    values1 = _float_block(block1)
+    values2 = _float_block(block2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        deviation = np.round((values2 - values1) / values1 * 100, 6)
+    deviation[(values1 == 0) | (values2 == 0)] = np.nan
+    return deviation
+
+
+def _deviation_label(item1, item2):
+    # Text shown when no deviation can be computed, the header gets %Diff
+    if item1 == "fail" or item2 == "fail" or str(item1) == str(0) or str(item2) == str(0):
+        return "Failed"
+    return "%Diff"
+
+
+def interleave_with_deviation(block1, block2):
+    """
+    Interleave two aligned blocks as value, value, %diff columns.
+
+    :block1, block2: lists of rows of the same shape
+    :return: list of rows, with a label instead of the %diff where it
+             cannot be computed
+    """
+    import numpy as np
+
+    if not block1:
+        return []
+    deviation = deviation_block(block1, block2)
+    rows, columns = deviation.shape
+
+    merged = np.empty((rows, columns * 3), dtype=object)
+    merged[:, 0::3] = np.array(block1, dtype=object).reshape(rows, columns)
+    merged[:, 1::3] = np.array(block2, dtype=object).reshape(rows, columns)
+    merged[:, 2::3] = deviation.astype(object)
+    for row, column in zip(*np.nonzero(np.isnan(deviation))):
+        merged[row, column * 3 + 2] = _deviation_label(block1[row][column], block2[row][column])
+    return merged.tolist()
+
+
 def merge_lists_alternately(results, list1, list2):
     if list1[0] != list2[0]:
         return results
-    merger_list = [list1[0]]
-    for item1, item2 in zip(list1[1:], list2[1:]):
-        merger_list.append(item1)
-        merger_list.append(item2)
-        try:
-            dev = percentage_deviation(item1, item2)
-            if dev >= 0:
-                merger_list.append(dev)
-            else:
-                merger_list.append(dev)
-        except Exception as exc:
-            if item1 == "fail" or item2 == "fail" or str(item1) == str(0) or str(item2) == str(0):
-                merger_list.append("Failed")
-            else:
-                merger_list.append("%Diff")
-    results.append(merger_list)
-
-    # row = [None] * (len(item1[1:]) + len(item2[1:]))
-    # row[::2] = item1[1:]
-    # row[1::2] = item2[1:]
-    # results.append([item2[0]] + row)
-
+    size = min(len(list1), len(list2)) - 1
+    merged = interleave_with_deviation([list1[1:size + 1]], [list2[1:size + 1]])
+    results.append([list1[0]] + (merged[0] if merged else []))
     return results
 
 
-def combine_two_array_alternating(results, value, ele):
-    indexer = []
-    test_name = read_config("test", "test_name")
+def combine_two_array_alternating(results, value, ele, test_name=None):
+    if test_name is None:
+        test_name = read_config("test", "test_name")
 
-    for lindex, item1 in enumerate(value[0][1:]):
+    # Pair columns whose headers share the part before the first "-"
+    if test_name in invalid_compare_list:
+        indexer = [(lindex, rindex) for lindex in range(len(value[0]) - 1) for rindex in range(len(ele[0]) - 1)]
+    else:
+        columns = {}
         for rindex, item2 in enumerate(ele[0][1:]):
-            if item1.split("-", 1)[0] == item2.split("-", 1)[0]:
-                indexer.append([lindex, rindex])
-            elif test_name in invalid_compare_list:
-                indexer.append([lindex, rindex])
-
-    for list1, list2 in zip(value, ele):
-        holder_list = [list1[0]]
-
-        for index in indexer:
-            item1 = list1[index[0] + 1]
-            item2 = list2[index[1] + 1]
-            holder_list.append(item1)
-            holder_list.append(item2)
-            try:
-                dev = percentage_deviation(item1, item2)
-                if dev >= 0:
-                    holder_list.append(dev)
-                else:
-                    holder_list.append(dev)
-            except Exception as exc:
-                if item1 == "fail" or item2 == "fail" or str(item1) == str(0) or str(item2) == str(0):
-                    holder_list.append("Failed")
-                else:
-                    holder_list.append("%Diff")
-        results.append(holder_list)
+            columns.setdefault(item2.split("-", 1)[0], []).append(rindex)
+        indexer = [(lindex, rindex) for lindex, item1 in enumerate(value[0][1:])
+                   for rindex in columns.get(item1.split("-", 1)[0], [])]
+
+    rows = list(zip(value, ele))
+    block1 = [[list1[lindex + 1] for lindex, _ in indexer] for list1, _ in rows]
+    block2 = [[list2[rindex + 1] for _, rindex in indexer] for _, list2 in rows]
+    for (list1, _), merged in zip(rows, interleave_with_deviation(block1, block2)):
+        results.append([list1[0]] + merged)
     return results
-
@@ -20,6 +20,7 @@ setup(
         'google-auth-oauthlib==0.4.4',
         'google-auth==1.31.0',
         'googleapis-common-protos==1.53.0',
+        'numpy==1.26.2',
         'oauthlib==3.1.1',
         'requests-oauthlib==1.3.0',
         'requests==2.25.1',
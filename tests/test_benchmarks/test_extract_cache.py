@@ -0,0 +1,103 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from quisby.benchmarks import extract_cache
+from quisby.benchmarks.version_util import ResultFile, open_result, shared_result
+from quisby.pricing import cloud_pricing, price_cache
+
+SETTINGS = ("aws", "us-east-1", "rhel")
+
+
+class TestExtractCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.cache_dir = extract_cache.CACHE_DIR
+        extract_cache.CACHE_DIR = os.path.join(self.tmp.name, "extract")
+        self.path = os.path.join(self.tmp.name, "results.csv")
+        self.write("# Results version: v1.1.2743\nscore:1\n")
+
+    def tearDown(self):
+        extract_cache.CACHE_DIR = self.cache_dir
+        extract_cache.enabled = True
+        price_cache.refresh = False
+        price_cache.offline = False
+
+    def write(self, content):
+        with open(self.path, "w") as file:
+            file.write(content)
+
+    def key(self, system_name="m5.xlarge"):
+        return extract_cache.cache_key("coremark", ResultFile(self.path), system_name, "9.5", settings=SETTINGS)
+
+    def test_round_trip(self):
+        rows = [["System name", "Score"], ["m5.xlarge", 1.0]]
+        self.assertIsNone(extract_cache.get(self.key()))
+        extract_cache.put(self.key(), rows)
+        self.assertEqual(extract_cache.get(self.key()), rows)
+        self.assertIsNone(extract_cache.get(self.key("m5.2xlarge")))
+        self.assertEqual(self.key()[5], (extract_cache.PARSER_VERSION, "1.1"))
+
+    def test_changed_file(self):
+        extract_cache.put(self.key(), [["m5.xlarge", 1.0]])
+        self.write("# Results version: v1.1.2743\nscore:2\n")
+        self.assertIsNone(extract_cache.get(self.key()))
+
+    def test_empty_rows_not_stored(self):
+        extract_cache.put(self.key(), [])
+        self.assertIsNone(extract_cache.get(self.key()))
+        self.assertIsNone(extract_cache.cache_key("coremark", ResultFile("/nonexistent.csv"), "m5.xlarge", "9.5"))
+
+    def test_file_read_once(self):
+        with patch("builtins.open", wraps=open) as mock_open:
+            result_file = ResultFile(self.path)
+            extract_cache.cache_key("coremark", result_file, "m5.xlarge", "9.5", settings=SETTINGS)
+            with shared_result(result_file):
+                self.assertIs(open_result(self.path), result_file)
+        self.assertEqual(mock_open.call_count, 1)
+        self.assertIsNot(open_result(self.path), result_file)
+
+    def test_offline_prices_in_key(self):
+        key = self.key()
+        price_cache.offline = True
+        self.assertNotEqual(self.key(), key)
+
+    def test_failed_pricing_not_reused(self):
+        self.addCleanup(cloud_pricing._prices.clear)
+        self.addCleanup(cloud_pricing._cpu_counts.clear)
+        cloud_pricing.remember_instances({"m5.xlarge": (0.192, 4)}, "us-east-1", "aws", "rhel")
+        calls = []
+
+        def extract(test_name, path, system_name, os_release):
+            calls.append(system_name)
+            return [[system_name, cloud_pricing.get_cloud_pricing(system_name, "us-east-1", "aws", "rhel")]]
+
+        # The provider can't be reached for m5.2xlarge
+        with patch.object(extract_cache, "_pricing_settings", return_value=SETTINGS), \
+                patch.object(cloud_pricing, "_resolve_cloud_pricing", return_value=None):
+            for _ in range(2):
+                self.assertEqual(extract_cache.cached_extract(extract, "coremark", self.path, "m5.xlarge", "9.5"),
+                                 [["m5.xlarge", 0.192]])
+                self.assertEqual(extract_cache.cached_extract(extract, "coremark", self.path, "m5.2xlarge", "9.5"),
+                                 [["m5.2xlarge", None]])
+        # The priced row came from the cache the second time, the unpriced one was extracted again
+        self.assertEqual(calls, ["m5.xlarge", "m5.2xlarge", "m5.2xlarge"])
+
+    def test_refresh_and_expiry(self):
+        key = self.key()
+        extract_cache.put(key, [["m5.xlarge", 1.0]])
+        price_cache.refresh = True
+        self.assertIsNone(extract_cache.get(key))
+        price_cache.refresh = False
+        past = time.time() - price_cache.get_ttl() - 1
+        with patch("time.time", return_value=past):
+            extract_cache.put(key, [["m5.xlarge", 1.0]])
+        self.assertIsNone(extract_cache.get(key))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,40 @@
+import os
+import unittest
+from unittest.mock import patch
+
+from quisby.benchmarks.version_util import ResultFile, get_version_info, version_dispatch
+
+
+class TestResultFile(unittest.TestCase):
+
+    def get_sample_data_path(self, filename):
+        return os.path.join(os.path.dirname(__file__), 'data', 'auto_hpl', filename)
+
+    def test_single_read(self):
+        path = self.get_sample_data_path("valid_data.csv")
+        with patch("builtins.open", wraps=open) as mock_open:
+            result_file = ResultFile(path)
+            info = result_file.version_info
+            lines = result_file.readlines()
+        self.assertEqual(mock_open.call_count, 1)
+        self.assertEqual(info['raw'], '1.0')
+        self.assertEqual(info['normalized'], '1.0')
+        self.assertEqual(info['metadata']['Host'], 'c4a-standard-16')
+        self.assertEqual(info, get_version_info(path))
+        self.assertTrue(lines[0].startswith("# Test general meta start"))
+        self.assertEqual(next(result_file.body()), "# Test meta data start\n")
+
+    def test_unreadable_file(self):
+        result_file = ResultFile("/path/to/nonexistent/file.csv")
+        self.assertEqual(result_file.version_info, {'raw': None, 'normalized': '1.0', 'metadata': {}})
+        with self.assertRaises(FileNotFoundError):
+            result_file.readlines()
+
+    def test_version_dispatch_passes_result_file(self):
+        path = self.get_sample_data_path("valid_data.csv")
+        result = version_dispatch(path, {'1.0': lambda result_file: {'lines': len(result_file.readlines())}})
+        self.assertEqual(result, {'lines': 17, 'csv_version': '1.0'})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+
+from quisby.ordering import SERIES_FIELDS, extract_prefix_and_number, group_by_family, name_key, sort_by_size
+
+
+class TestOrdering(unittest.TestCase):
+
+    def test_group_by_family_aws(self):
+        rows = [["", [name]] for name in ("m5.4xlarge", "c6i.large", "m5.xlarge", "m5.2xlarge", "c6i.xlarge")]
+        groups = group_by_family(rows, (1, 0), cloud_type="aws")
+        self.assertEqual(
+            [[row[1][0] for row in items] for _, items in groups],
+            [["c6i.large", "c6i.xlarge"], ["m5.xlarge", "m5.2xlarge", "m5.4xlarge"]],
+        )
+        self.assertEqual(groups[0][0], ("c", "6", "i", "large"))
+
+    def test_group_by_family_fields(self):
+        rows = [["Standard_D8s_v5"], ["Standard_D4s_v4"], ["Standard_D2s_v5"]]
+        by_version = group_by_family(rows, (0,), cloud_type="azure")
+        self.assertEqual([len(items) for _, items in by_version], [1, 2])
+        across_versions = group_by_family(rows, (0,), {"azure": ("family", "feature")}, cloud_type="azure")
+        self.assertEqual([[row[0] for row in items] for _, items in across_versions],
+                         [["Standard_D2s_v5", "Standard_D4s_v4", "Standard_D8s_v5"]])
+        self.assertEqual(len(group_by_family(rows, (0,), SERIES_FIELDS, cloud_type="azure")), 2)
+
+    def test_sort_by_size_is_stable(self):
+        rows = [["n2-standard-8", 1], ["n2-standard-2", 2], ["n2-standard-8", 3]]
+        self.assertEqual([row[1] for row in sort_by_size(rows, (0,), cloud_type="gcp")], [2, 1, 3])
+
+    def test_unparsable_rows_are_skipped(self):
+        rows = [["", ["m5.4xlarge"]], ["", []], ["", [None]], ["", ["m5.xlarge"]]]
+        with self.assertLogs("quisby_logger", level="ERROR"):
+            groups = group_by_family(rows, (1, 0), cloud_type="aws")
+        self.assertEqual([[row[1][0] for row in items] for _, items in groups], [["m5.xlarge", "m5.4xlarge"]])
+        with self.assertLogs("quisby_logger", level="ERROR"):
+            self.assertEqual([row[1][0] for row in sort_by_size(rows, (1, 0), cloud_type="aws")],
+                             ["m5.xlarge", "m5.4xlarge"])
+
+    def test_extract_prefix_and_number(self):
+        self.assertEqual(extract_prefix_and_number("Standard_D8s_v5"), ("Standard_D", "s_v5"))
+        self.assertEqual(extract_prefix_and_number("local"), (None, None))
+
+    def test_name_key(self):
+        self.assertEqual(name_key("m5.xlarge", "aws"), ("m5", "xlarge"))
+        self.assertEqual(name_key("n2-standard-16", "gcp"), ("n2", 16))
+        self.assertEqual(name_key("Standard_D8s_v5", "azure"), ("Standard_D", "s_v5", 8))
+
+
+if __name__ == "__main__":
+    unittest.main()
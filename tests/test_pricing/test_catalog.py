@@ -0,0 +1,106 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from quisby.pricing import catalog, cloud_pricing, price_cache
+
+AWS_OFFER = {
+    "formatVersion": "v1.0",
+    "offerCode": "AmazonEC2",
+    "products": {
+        "SKU1": {"sku": "SKU1", "attributes": {
+            "instanceType": "m5.xlarge", "regionCode": "us-east-1", "vcpu": "4", "tenancy": "Shared",
+            "operatingSystem": "Linux", "capacitystatus": "Used", "preInstalledSw": "NA"}},
+        "SKU2": {"sku": "SKU2", "attributes": {
+            "instanceType": "m5.xlarge", "regionCode": "us-east-1", "vcpu": "4", "tenancy": "Shared",
+            "operatingSystem": "Windows", "capacitystatus": "Used", "preInstalledSw": "NA"}},
+    },
+    "terms": {
+        "OnDemand": {
+            "SKU1": {"SKU1.JRTCKXETXF": {"sku": "SKU1", "priceDimensions": {
+                "SKU1.JRTCKXETXF.6YS6EN2CT7": {"unit": "Hrs", "pricePerUnit": {"USD": "0.1920000000"}}}}},
+            "SKU2": {"SKU2.JRTCKXETXF": {"sku": "SKU2", "priceDimensions": {
+                "SKU2.JRTCKXETXF.6YS6EN2CT7": {"unit": "Hrs", "pricePerUnit": {"USD": "0.3760000000"}}}}},
+        },
+        "Reserved": {"SKU1": {"SKU1.4NA7Y494T4": {"sku": "SKU1", "priceDimensions": {}}}},
+    },
+}
+
+AWS_CSV = """\
+"FormatVersion","v1.0"
+"Disclaimer","This pricing list is for informational purposes only."
+"Publication Date","2025-01-01T00:00:00Z"
+"Version","20250101000000"
+"OfferCode","AmazonEC2"
+"SKU","TermType","Unit","PricePerUnit","Currency","Instance Type","vCPU","Tenancy","Operating System","CapacityStatus","Pre Installed S/W","Region Code"
+"SKU3","OnDemand","Hrs","0.0850000000","USD","c6i.large","2","Shared","Linux","Used","NA","us-west-2"
+"SKU3","Reserved","Quantity","400","USD","c6i.large","2","Shared","Linux","Used","NA","us-west-2"
+"SKU4","OnDemand","Hrs","0.1200000000","USD","c6i.large","2","Dedicated","Linux","Used","NA","us-west-2"
+"""
+
+
+class TestJsonStream(unittest.TestCase):
+
+    def test_members_across_chunks(self):
+        chunk_size = catalog.CHUNK_SIZE
+        catalog.CHUNK_SIZE = 7
+        self.addCleanup(setattr, catalog, "CHUNK_SIZE", chunk_size)
+        stream = catalog.JsonStream(io.StringIO('{"a": 12345, "b": {"c": [1, 2], "d": "x,}"}, "e": {}}'))
+        seen = []
+        for key in stream.members():
+            if key == "b":
+                for inner in stream.members():
+                    seen.append((inner, stream.value()))
+            elif key == "e":
+                stream.skip()
+            else:
+                seen.append((key, stream.value()))
+        self.assertEqual(seen, [("a", 12345), ("c", [1, 2]), ("d", "x,}")])
+
+
+class TestImportCatalog(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.cache_path = price_cache.CACHE_PATH
+        price_cache.CACHE_PATH = os.path.join(self.tmp.name, "pricing.sqlite")
+
+    def tearDown(self):
+        price_cache.CACHE_PATH = self.cache_path
+        price_cache.offline = False
+
+    def write(self, name, content):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "w") as file:
+            file.write(content if isinstance(content, str) else json.dumps(content))
+        return path
+
+    def test_aws_offer_json(self):
+        self.assertEqual(catalog.import_catalog(self.write("offer.json", AWS_OFFER)), 1)
+        self.assertEqual(price_cache.get_catalog_entry("aws", "us-east-1", "m5.xlarge"), (0.192, 4))
+
+    def test_aws_offer_csv(self):
+        self.assertEqual(catalog.import_catalog(self.write("offer.csv", AWS_CSV)), 1)
+        self.assertEqual(price_cache.get_catalog_entry("aws", "us-west-2", "c6i.large"), (0.085, 2))
+
+    def test_import_replaces_cloud(self):
+        catalog.import_catalog(self.write("offer.json", AWS_OFFER))
+        catalog.import_catalog(self.write("offer.csv", AWS_CSV))
+        self.assertIsNone(price_cache.get_catalog_entry("aws", "us-east-1", "m5.xlarge"))
+
+    def test_offline_lookups(self):
+        catalog.import_catalog(self.write("gcp.json", {"gcp_price_list": {
+            "CP-COMPUTEENGINE-N2-PREDEFINED-VM-CORE": {"us-east1": 0.03, "cores": "shared"}}}))
+        catalog.import_catalog(self.write("azure.json", {"offers": {
+            "linux-d8sv5-standard": {"prices": {"perhour": {"us-east": {"value": 0.384}}}}}}))
+        price_cache.offline = True
+        self.assertAlmostEqual(cloud_pricing.get_catalog_pricing("n2-standard-8", "us-east1", "gcp"), 0.24)
+        self.assertEqual(cloud_pricing.get_catalog_pricing("Standard_D8s_v5", "us-east", "azure"), 0.384)
+        self.assertIsNone(cloud_pricing.get_catalog_pricing("m5.xlarge", "us-east-1", "aws"))
+
+
+if __name__ == "__main__":
+    unittest.main()
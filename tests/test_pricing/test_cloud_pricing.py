@@ -0,0 +1,223 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from quisby.pricing import cloud_pricing, price_cache
+
+
+class TestSingleFlight(unittest.TestCase):
+
+    def test_concurrent_callers_share_one_lookup(self):
+        memo, calls = {}, []
+
+        def resolve():
+            calls.append(threading.get_ident())
+            time.sleep(0.05)
+            return 0.5
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(lambda _: cloud_pricing._single_flight(memo, "m5.xlarge", resolve), range(16)))
+        self.assertEqual(results, [0.5] * 16)
+        self.assertEqual(len(calls), 1)
+
+    def test_errors_are_not_kept(self):
+        memo, calls = {}, []
+
+        def resolve():
+            calls.append(1)
+            if len(calls) == 1:
+                raise ConnectionError("pricing endpoint unreachable")
+            return 0.25
+
+        with self.assertRaises(ConnectionError):
+            cloud_pricing._single_flight(memo, "n2-standard-8", resolve)
+        self.assertEqual(cloud_pricing._single_flight(memo, "n2-standard-8", resolve), 0.25)
+        self.assertEqual(cloud_pricing._single_flight(memo, "n2-standard-8", resolve), 0.25)
+        self.assertEqual(len(calls), 2)
+
+
+class TestGcpIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache_dir = price_cache.CACHE_DIR
+        price_cache.CACHE_DIR = self.tmp.name + "/"
+        cloud_pricing._gcp_index = cloud_pricing._gcp_skus = None
+        pricelist = {"gcp_price_list": {
+            "CP-COMPUTEENGINE-N2-PREDEFINED-VM-CORE": {"us-east1": 0.03, "europe-west4": 0.035, "cores": "shared"},
+            "CP-COMPUTEENGINE-E2-PREDEFINED-VM-CORE": {"us-east1": 0.02},
+        }}
+        with open(os.path.join(self.tmp.name, cloud_pricing.GCP_PRICELIST_FILE), "w") as cache_file:
+            json.dump(pricelist, cache_file)
+
+    def tearDown(self):
+        price_cache.CACHE_DIR = self.cache_dir
+        cloud_pricing._gcp_index = cloud_pricing._gcp_skus = None
+        self.tmp.cleanup()
+
+    def test_prices_from_cached_pricelist(self):
+        self.assertAlmostEqual(cloud_pricing.get_gcp_prices("n2-standard-8", "us-east1"), 0.24)
+        self.assertAlmostEqual(cloud_pricing.get_gcp_prices("e2-standard-4", "us-east1"), 0.08)
+        self.assertIsNone(cloud_pricing.get_gcp_prices("e2-standard-4", "europe-west4"))
+        self.assertIsNone(cloud_pricing.get_gcp_prices("c2d-standard-4", "us-east1"))
+        self.assertIsNone(cloud_pricing.get_gcp_prices("n2-standard-8", "cores"))
+
+    def test_resolve_instances(self):
+        self.addCleanup(cloud_pricing._prices.clear)
+        self.addCleanup(cloud_pricing._cpu_counts.clear)
+        self.addCleanup(setattr, price_cache, "CACHE_PATH", price_cache.CACHE_PATH)
+        price_cache.CACHE_PATH = os.path.join(self.tmp.name, "pricing.sqlite")
+        table = cloud_pricing.resolve_instances(["n2-standard-8", "e2-standard-4", "n2-standard-8", "c2d-standard-4"],
+                                                "us-east1", "gcp", "rhel")
+        self.assertEqual(sorted(table), ["c2d-standard-4", "e2-standard-4", "n2-standard-8"])
+        self.assertAlmostEqual(table["n2-standard-8"][0], 0.24)
+        self.assertEqual(table["n2-standard-8"][1], 8)
+        self.assertEqual(table["c2d-standard-4"], (None, 4))
+
+    def test_remember_instances(self):
+        self.addCleanup(cloud_pricing._prices.clear)
+        self.addCleanup(cloud_pricing._cpu_counts.clear)
+        cloud_pricing.remember_instances({"m5.xlarge": (0.192, 4), "m6i.large": (None, 2)}, "us-east-1", "aws", "rhel")
+        self.assertEqual(cloud_pricing.get_cloud_pricing("m5.xlarge", "us-east-1", "aws", "rhel"), 0.192)
+        self.assertEqual(cloud_pricing.get_cloud_cpu_count("m6i.large", "us-east-1", "aws"), 2)
+        self.assertNotIn(("aws", "us-east-1", "m6i.large", "rhel"), cloud_pricing._prices)
+
+
+class TestAzureIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.json_path = cloud_pricing.json_path
+        self.fetch_from_url = cloud_pricing.fetch_from_url
+        cloud_pricing.json_path = os.path.join(self.tmp.name, "azure_prices.json")
+        cloud_pricing._azure_index = cloud_pricing._azure_mtime = None
+        self.fetched = threading.Event()
+        cloud_pricing.fetch_from_url = self.fetch
+
+    def tearDown(self):
+        cloud_pricing.json_path = self.json_path
+        cloud_pricing.fetch_from_url = self.fetch_from_url
+        cloud_pricing._azure_index = cloud_pricing._azure_mtime = None
+        self.tmp.cleanup()
+
+    def fetch(self):
+        self.fetched.set()
+        return self.prices(0.5)
+
+    def prices(self, value):
+        return {"offers": {"linux-d8sv5-standard": {"prices": {"perhour": {"us-east": {"value": value}}}}}}
+
+    def write(self, value, mtime):
+        with open(cloud_pricing.json_path, "w") as file:
+            json.dump(self.prices(value), file)
+        os.utime(cloud_pricing.json_path, (mtime, mtime))
+
+    def test_index_follows_file(self):
+        self.write(0.4, time.time())
+        self.assertEqual(cloud_pricing.get_azure_pricing("Standard_D8s_v5", "us-east"), 0.4)
+        self.write(0.45, time.time() + 1)
+        self.assertEqual(cloud_pricing.get_azure_pricing("Standard_D8s_v5", "us-east"), 0.45)
+        self.assertFalse(self.fetched.is_set())
+
+    def test_stale_file_refreshes_in_background(self):
+        self.write(0.4, time.time() - price_cache.get_ttl() - 60)
+        self.assertEqual(cloud_pricing.get_azure_pricing("Standard_D8s_v5", "us-east"), 0.4)
+        self.assertTrue(self.fetched.wait(5))
+        for _ in range(50):
+            if not cloud_pricing._azure_refreshing:
+                break
+            time.sleep(0.01)
+        self.assertEqual(cloud_pricing.get_azure_pricing("Standard_D8s_v5", "us-east"), 0.5)
+
+    def test_missing_file_is_fetched(self):
+        self.assertEqual(cloud_pricing.get_azure_pricing("Standard_D8s_v5", "us-east"), 0.5)
+        self.assertTrue(os.path.exists(cloud_pricing.json_path))
+
+
+class TestRetries(unittest.TestCase):
+
+    def setUp(self):
+        self.addCleanup(setattr, cloud_pricing, "BACKOFF_BASE_SECONDS", cloud_pricing.BACKOFF_BASE_SECONDS)
+        cloud_pricing.BACKOFF_BASE_SECONDS = 0
+
+    def test_transient_errors_are_retried(self):
+        calls = []
+
+        def call():
+            calls.append(1)
+            if len(calls) < 3:
+                raise requests.ConnectionError("connection reset")
+            return 0.5
+
+        self.assertEqual(cloud_pricing.with_retries(call, "prices"), 0.5)
+        self.assertEqual(len(calls), 3)
+
+    def test_other_errors_are_raised(self):
+        calls = []
+
+        def call():
+            calls.append(1)
+            raise KeyError("linux-d8sv5-standard")
+
+        with self.assertRaises(KeyError):
+            cloud_pricing.with_retries(call, "prices")
+        self.assertEqual(len(calls), 1)
+
+
+class FakeEc2:
+    """describe_instance_types paginator that rejects unknown types like EC2 does"""
+
+    vcpus = {"m5.xlarge": 4, "m5.2xlarge": 8, "c6i.large": 2}
+
+    def __init__(self):
+        self.calls = []
+
+    def get_paginator(self, operation):
+        return self
+
+    def paginate(self, InstanceTypes):
+        return [self.describe_instance_types(InstanceTypes)]
+
+    def describe_instance_types(self, InstanceTypes):
+        self.calls.append(list(InstanceTypes))
+        if any(name not in self.vcpus for name in InstanceTypes):
+            raise ValueError("InvalidInstanceType")
+        return {"InstanceTypes": [{"InstanceType": name, "VCpuInfo": {"DefaultVCpus": self.vcpus[name]}}
+                                  for name in InstanceTypes]}
+
+
+class TestAwsPrefetch(unittest.TestCase):
+
+    def setUp(self):
+        self.ec2 = FakeEc2()
+        cloud_pricing._aws_clients[(os.getpid(), "ec2", "us-east-1")] = self.ec2
+
+    def tearDown(self):
+        cloud_pricing._aws_clients.clear()
+        cloud_pricing._cpu_counts.clear()
+
+    def test_vcpu_counts_are_batched(self):
+        names = ["m5.xlarge", "m5.2xlarge", "c6i.large"]
+        self.assertEqual(cloud_pricing.get_instance_vcpu_counts(names, "us-east-1"),
+                         {"m5.xlarge": 4, "m5.2xlarge": 8, "c6i.large": 2})
+        self.assertEqual(self.ec2.calls, [names])
+
+    def test_unknown_type_falls_back_to_single_calls(self):
+        names = ["m5.xlarge", "bogus.large"]
+        self.assertEqual(cloud_pricing.get_instance_vcpu_counts(names, "us-east-1"), {"m5.xlarge": 4})
+        self.assertEqual(len(self.ec2.calls), 3)
+
+    def test_prefetched_counts_are_reused(self):
+        cloud_pricing._remember(cloud_pricing._cpu_counts, ("aws", "us-east-1", "m5.xlarge"), 4)
+        self.assertEqual(cloud_pricing.get_cloud_cpu_count("m5.xlarge", "us-east-1", "aws"), 4)
+        self.assertEqual(self.ec2.calls, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+import os
+import tempfile
+import time
+import unittest
+
+from quisby.pricing import price_cache
+
+
+class TestPriceCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.cache_path = price_cache.CACHE_PATH
+        price_cache.CACHE_PATH = os.path.join(self.tmp.name, "pricing.sqlite")
+        price_cache.refresh = False
+        price_cache._refreshed.clear()
+
+    def tearDown(self):
+        price_cache.CACHE_PATH = self.cache_path
+        price_cache.refresh = False
+        price_cache._refreshed.clear()
+
+    def test_put_and_get(self):
+        self.assertIsNone(price_cache.get_price("aws", "us-east-1", "m5.xlarge", "rhel"))
+        price_cache.put_price("aws", "us-east-1", "m5.xlarge", "rhel", 0.192)
+        self.assertEqual(price_cache.get_price("aws", "us-east-1", "m5.xlarge", "rhel"), 0.192)
+        self.assertIsNone(price_cache.get_price("aws", "us-west-2", "m5.xlarge", "rhel"))
+
+    def test_expired_entry(self):
+        price_cache.put_price("gcp", "us-east1", "n2-standard-8", "rhel", 0.38)
+        price_cache._connect().execute("UPDATE prices SET fetched_at = ?", (time.time() - price_cache.get_ttl() - 1,))
+        self.assertIsNone(price_cache.get_price("gcp", "us-east1", "n2-standard-8", "rhel"))
+
+    def test_refresh_fetches_once_per_run(self):
+        price_cache.put_price("azure", "us-east", "Standard_D8s_v5", "rhel", 0.4)
+        price_cache._refreshed.clear()
+        price_cache.refresh = True
+        self.assertIsNone(price_cache.get_price("azure", "us-east", "Standard_D8s_v5", "rhel"))
+        price_cache.put_price("azure", "us-east", "Standard_D8s_v5", "rhel", 0.41)
+        self.assertEqual(price_cache.get_price("azure", "us-east", "Standard_D8s_v5", "rhel"), 0.41)
+
+
+if __name__ == "__main__":
+    unittest.main()
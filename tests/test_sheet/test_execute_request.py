@@ -0,0 +1,57 @@
+import unittest
+from unittest.mock import patch
+
+import httplib2
+from googleapiclient.errors import HttpError
+from quisby.sheet import sheet_util
+
+SHEETS = "https://sheets.googleapis.com/v4/spreadsheets/abc"
+
+
+class FakeRequest:
+    """googleapiclient HttpRequest failing with status until it is sent attempts times"""
+
+    def __init__(self, method, uri, status, attempts=2):
+        self.method = method
+        self.uri = uri
+        self.status = status
+        self.attempts = attempts
+        self.calls = 0
+
+    def execute(self, http=None):
+        self.calls += 1
+        if self.calls < self.attempts:
+            raise HttpError(httplib2.Response({"status": self.status}), b'{"error": {"message": "failed"}}')
+        return {}
+
+
+@patch.object(sheet_util.time, "sleep", lambda delay: None)
+@patch.object(sheet_util, "_thread_http", lambda: None)
+class TestExecuteRequest(unittest.TestCase):
+
+    def test_5xx_retried_when_safe(self):
+        for method, uri in (("GET", SHEETS), ("PUT", SHEETS + "/values/coremark!A1?valueInputOption=RAW"),
+                            ("POST", SHEETS + "/values/coremark:clear")):
+            request = FakeRequest(method, uri, 503)
+            sheet_util.execute_request(request)
+            self.assertEqual(request.calls, 2, uri)
+
+    def test_5xx_not_retried_when_unsafe(self):
+        for uri in (SHEETS + "/values/coremark:append", SHEETS + ":batchUpdate"):
+            request = FakeRequest("POST", uri, 503)
+            with self.assertRaises(HttpError):
+                sheet_util.execute_request(request)
+            self.assertEqual(request.calls, 1, uri)
+
+            request = FakeRequest("POST", uri, 429)
+            sheet_util.execute_request(request)
+            self.assertEqual(request.calls, 2, uri)
+
+    def test_drive_has_its_own_limiter(self):
+        request = FakeRequest("POST", "https://www.googleapis.com/drive/v3/files/abc/permissions?fields=id", 500)
+        self.assertEqual(sheet_util._request_kind(request), ("drive", sheet_util.REJECTED_STATUS_CODES))
+        self.assertEqual(sheet_util._request_kind(FakeRequest("GET", SHEETS, 500))[0], "read")
+
+
+if __name__ == "__main__":
+    unittest.main()
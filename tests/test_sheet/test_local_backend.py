@@ -0,0 +1,223 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import pytest
+from googleapiclient.errors import HttpError
+from quisby.formatting.add_formatting import ConditionalFormatBuilder
+from quisby.sheet import sheetapi, sheet_util
+from quisby.sheet.local_backend import LocalSheetsService
+
+
+@pytest.fixture(autouse=True)
+def local_backend(monkeypatch):
+    """Keep these tests off Google and leave the sheet backend and caches as they were"""
+    monkeypatch.setenv(sheetapi.BACKEND_ENV, "local")
+    # set_backend() changes these, monkeypatch puts the previous values back
+    monkeypatch.setattr(sheetapi, "_service", sheetapi._service)
+    monkeypatch.setattr(sheetapi, "_creds", sheetapi._creds)
+    yield
+    sheet_util.invalidate_metadata()
+    sheet_util.invalidate_values()
+
+
+class TestLocalSheetsService(unittest.TestCase):
+
+    def setUp(self):
+        self.service = LocalSheetsService()
+        self.sheet = self.service.spreadsheets()
+        spreadsheet = self.sheet.create(body={"properties": {"title": "test"},
+                                              "sheets": {"properties": {"sheetId": 0, "title": "summary"}}}).execute()
+        self.spreadsheet_id = spreadsheet["spreadsheetId"]
+
+    def test_create_and_get(self):
+        spreadsheet = self.sheet.get(spreadsheetId=self.spreadsheet_id).execute()
+        self.assertEqual(spreadsheet["properties"]["title"], "test")
+        self.assertEqual(spreadsheet["sheets"][0]["properties"]["title"], "summary")
+        self.assertEqual(spreadsheet["sheets"][0]["properties"]["gridProperties"]["rowCount"], 1000)
+
+    def test_append_and_read_values(self):
+        values = self.sheet.values()
+        values.append(spreadsheetId=self.spreadsheet_id, range="summary",
+                      valueInputOption="USER_ENTERED", body={"values": [["name", "score"], ["a", 1.0]]}).execute()
+        values.append(spreadsheetId=self.spreadsheet_id, range="summary",
+                      valueInputOption="USER_ENTERED", body={"values": [["b", 2.5]]}).execute()
+
+        result = values.batchGet(spreadsheetId=self.spreadsheet_id, ranges=["summary", "summary!B2:B3"]).execute()
+        self.assertEqual(result["valueRanges"][0]["values"], [["name", "score"], ["a", "1"], ["b", "2.5"]])
+        self.assertEqual(result["valueRanges"][1]["values"], [["1"], ["2.5"]])
+
+        values.clear(spreadsheetId=self.spreadsheet_id, range="summary", body={}).execute()
+        result = values.get(spreadsheetId=self.spreadsheet_id, range="summary").execute()
+        self.assertNotIn("values", result)
+
+    def test_charts(self):
+        chart = {"spec": {"title": "chart"},
+                 "position": {"overlayPosition": {"anchorCell": {"sheetId": 0, "rowIndex": 0, "columnIndex": 0}}}}
+        response = self.sheet.batchUpdate(spreadsheetId=self.spreadsheet_id,
+                                          body={"requests": [{"addChart": {"chart": chart}}]}).execute()
+        chart_id = response["replies"][0]["addChart"]["chart"]["chartId"]
+        spreadsheet = self.sheet.get(spreadsheetId=self.spreadsheet_id).execute()
+        self.assertEqual([c["chartId"] for c in spreadsheet["sheets"][0]["charts"]], [chart_id])
+
+        self.sheet.batchUpdate(spreadsheetId=self.spreadsheet_id,
+                               body={"requests": [{"deleteEmbeddedObject": {"objectId": chart_id}}]}).execute()
+        spreadsheet = self.sheet.get(spreadsheetId=self.spreadsheet_id).execute()
+        self.assertNotIn("charts", spreadsheet["sheets"][0])
+
+    def test_failed_batch_is_not_applied(self):
+        requests = [{"addSheet": {"properties": {"sheetId": 1, "title": "streams"}}},
+                    {"deleteEmbeddedObject": {"objectId": 42}}]
+        with self.assertRaises(HttpError) as context:
+            self.sheet.batchUpdate(spreadsheetId=self.spreadsheet_id, body={"requests": requests}).execute()
+        self.assertEqual(context.exception.resp.status, 400)
+        spreadsheet = self.sheet.get(spreadsheetId=self.spreadsheet_id).execute()
+        self.assertEqual(len(spreadsheet["sheets"]), 1)
+
+    def test_sqlite_persistence(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "sheets.sqlite")
+            service = LocalSheetsService(path)
+            spreadsheet = service.spreadsheets().create(body={"properties": {"title": "saved"}}).execute()
+            service.spreadsheets().values().append(spreadsheetId=spreadsheet["spreadsheetId"], range="Sheet1",
+                                                   body={"values": [["x"]]}).execute()
+            service.db.close()
+
+            reopened = LocalSheetsService(path)
+            result = reopened.spreadsheets().values().get(spreadsheetId=spreadsheet["spreadsheetId"],
+                                                          range="Sheet1").execute()
+            self.assertEqual(result["values"], [["x"]])
+            reopened.db.close()
+
+
+class TestSheetUtilOffline(unittest.TestCase):
+
+    def setUp(self):
+        sheetapi.set_backend(LocalSheetsService())
+        sheet_util.invalidate_metadata()
+        sheet_util.invalidate_values()
+        spreadsheet = sheetapi.spreadsheets().create(body={"properties": {"title": "offline"}}).execute()
+        self.spreadsheet_id = spreadsheet["spreadsheetId"]
+
+    def test_replace_sheet_contents(self):
+        rows = [["System name", "score"], ["m5.xlarge", "10"]]
+        sheet_util.replace_sheet_contents(self.spreadsheet_id, "coremark", rows)
+        self.assertIn("coremark", sheet_util.get_sheet_titles(self.spreadsheet_id))
+        self.assertEqual(sheet_util.read_sheet(self.spreadsheet_id, "coremark"), rows)
+
+        sheet_util.replace_sheet_contents(self.spreadsheet_id, "coremark", rows[:1])
+        self.assertEqual(sheet_util.read_sheet(self.spreadsheet_id, "coremark"), rows[:1])
+
+    def test_stale_metadata_is_retried(self):
+        sheet_util.replace_sheet_contents(self.spreadsheet_id, "coremark", [["System name", "score"]])
+        sheet_id = sheet_util.get_sheet_id(self.spreadsheet_id, "coremark")
+        chart = {"spec": {"title": "chart"},
+                 "position": {"overlayPosition": {"anchorCell": {"sheetId": sheet_id}}}}
+        sheet = sheetapi.spreadsheets()
+        response = sheet.batchUpdate(spreadsheetId=self.spreadsheet_id,
+                                     body={"requests": [{"addChart": {"chart": chart}}]}).execute()
+        chart_id = response["replies"][0]["addChart"]["chart"]["chartId"]
+        sheet_util.invalidate_metadata()
+        self.assertEqual(sheet_util.get_chart_ids(self.spreadsheet_id, "coremark"), [chart_id])
+        # Deleted behind the cache's back
+        sheet.batchUpdate(spreadsheetId=self.spreadsheet_id,
+                          body={"requests": [{"deleteEmbeddedObject": {"objectId": chart_id}}]}).execute()
+
+        sheet_util.replace_sheet_contents(self.spreadsheet_id, "coremark", [["System name", "score"], ["a", "1"]])
+        self.assertEqual(sheet_util.read_sheet(self.spreadsheet_id, "coremark"), [["System name", "score"], ["a", "1"]])
+
+    def test_metadata_refetched_during_write(self):
+        execute_request = sheet_util.execute_request
+        refetched = []
+
+        def refetch_first(request):
+            if not refetched:
+                # Another thread refetches the metadata while the batchUpdate is in flight
+                refetched.append(True)
+                sheet_util.invalidate_metadata(self.spreadsheet_id)
+                sheet_util.get_metadata(self.spreadsheet_id)
+            return execute_request(request)
+
+        sheet_util.get_metadata(self.spreadsheet_id)
+        with patch.object(sheet_util, "execute_request", refetch_first):
+            sheet_util.replace_sheet_contents(self.spreadsheet_id, "coremark", [["System name"]])
+        self.assertIn("coremark", sheet_util.get_sheet_titles(self.spreadsheet_id))
+
+    def test_other_errors_are_not_retried(self):
+        import httplib2
+
+        calls = []
+
+        def forbidden(request):
+            calls.append(request)
+            raise HttpError(httplib2.Response({"status": 403}), b'{"error": {"message": "Permission denied"}}')
+
+        sheet_util.get_metadata(self.spreadsheet_id)
+        with patch.object(sheet_util, "execute_request", forbidden):
+            with self.assertRaises(HttpError):
+                sheet_util.replace_sheet_contents(self.spreadsheet_id, "coremark", [["System name"]])
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(sheet_util._reserved_sheet_ids[self.spreadsheet_id], set())
+
+    def test_prefetch_under_read_range(self):
+        rows = [["System name", "score"], ["m5.xlarge", "10"]]
+        sheet_util.replace_sheet_contents(self.spreadsheet_id, " coremark ", rows)
+        sheet_util.prefetch_sheets(self.spreadsheet_id, {"coremark": " coremark "})
+        # Served from memory, under the stripped title the compare functions use
+        with patch.object(sheet_util, "execute_request", side_effect=AssertionError("not prefetched")):
+            self.assertEqual(sheet_util.read_sheet(self.spreadsheet_id, "coremark"), rows)
+
+    def test_conditional_formats_are_not_duplicated(self):
+        sheet_util.replace_sheet_contents(self.spreadsheet_id, "streams", [["System name", "a", "b", "%Diff"]] * 5)
+        for rows, threshold in ((5, "5"), (5, "5"), (8, "5"), (8, "10")):
+            formatting = ConditionalFormatBuilder(self.spreadsheet_id, "streams", rows)
+            formatting.add_diff_rule(3, threshold)
+            formatting.add_diff_rule(3, threshold)
+            formatting.add_diff_rule(6, threshold)
+            formatting.flush()
+
+        sheet_util.invalidate_metadata()
+        rules = sheet_util.get_conditional_formats(self.spreadsheet_id, "streams")
+        self.assertEqual(sorted(rule["ranges"][0]["startColumnIndex"] for rule in rules), [3, 6])
+        self.assertEqual({rule["ranges"][0]["endRowIndex"] for rule in rules}, {8})
+        self.assertEqual({rule["booleanRule"]["condition"]["values"][0]["userEnteredValue"] for rule in rules},
+                         {"-10"})
+
+    def test_other_rules_on_diff_column_are_kept(self):
+        sheet_util.replace_sheet_contents(self.spreadsheet_id, "streams", [["System name", "a", "b", "%Diff"]] * 5)
+        sheet_id = sheet_util.get_sheet_id(self.spreadsheet_id, "streams")
+        column = {"sheetId": sheet_id, "startRowIndex": 0, "endRowIndex": 5,
+                  "startColumnIndex": 3, "endColumnIndex": 4}
+        user_rules = [
+            {"ranges": [column], "gradientRule": {"minpoint": {"color": {"red": 1}, "type": "MIN"},
+                                                  "maxpoint": {"color": {"green": 1}, "type": "MAX"}}},
+            {"ranges": [column], "booleanRule": {"condition": {"type": "NUMBER_GREATER",
+                                                               "values": [{"userEnteredValue": "10"}]},
+                                                 "format": {"backgroundColor": {"green": 1}}}},
+            {"ranges": [column], "booleanRule": {"condition": {"type": "NUMBER_LESS_THAN_EQ",
+                                                               "values": [{"userEnteredValue": "-20"}]},
+                                                 "format": {"textFormat": {"bold": True}}}},
+        ]
+        sheetapi.spreadsheets().batchUpdate(
+            spreadsheetId=self.spreadsheet_id,
+            body={"requests": [{"addConditionalFormatRule": {"rule": rule, "index": 0}} for rule in user_rules]}
+        ).execute()
+        sheet_util.invalidate_metadata()
+
+        for threshold in ("5", "10"):
+            formatting = ConditionalFormatBuilder(self.spreadsheet_id, "streams", 5)
+            formatting.add_diff_rule(3, threshold)
+            formatting.flush()
+
+        sheet_util.invalidate_metadata()
+        rules = sheet_util.get_conditional_formats(self.spreadsheet_id, "streams")
+        self.assertEqual(len(rules), 4)
+        for rule in user_rules:
+            self.assertIn(rule, rules)
+        ours = [rule for rule in rules if rule not in user_rules]
+        self.assertEqual(ours[0]["booleanRule"]["condition"]["values"][0]["userEnteredValue"], "-10")
+
+
+if __name__ == "__main__":
+    unittest.main()
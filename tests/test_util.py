@@ -0,0 +1,188 @@
+import os
+import tempfile
+import unittest
+from configparser import NoOptionError, NoSectionError
+from unittest.mock import patch
+
+from quisby import util
+from quisby.util import ConfigSnapshot, combine_two_array_alternating, merge_lists_alternately, parse_instance
+
+CONFIG = """\
+[test]
+test_name = streams
+OS_RELEASE = 9.5
+
+[pricing]
+cache_ttl_hours = 24
+workers = 4
+offline = yes
+clouds = aws, ,gcp
+
+[spreadsheet]
+spreadsheet_id =
+"""
+
+
+class ConfigTestCase(unittest.TestCase):
+    """Points config_location at a scratch config.ini, restoring the module state afterwards"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "config.ini")
+        with open(self.path, "w") as configfile:
+            configfile.write(CONFIG)
+        saved = (util.config_location, util._snapshot, util._thresholds)
+        self.addCleanup(self.restore, saved)
+        util.config_location = self.path
+        util._snapshot = None
+
+    @staticmethod
+    def restore(saved):
+        util.config_location, util._snapshot, util._thresholds = saved
+
+
+class TestConfigSnapshot(ConfigTestCase):
+
+    def test_typed_accessors(self):
+        config = util.get_config()
+        self.assertEqual(config.get("test", "os_release"), "9.5")
+        self.assertEqual(config.get_int("pricing", "workers"), 4)
+        self.assertEqual(config.get_float("pricing", "cache_ttl_hours"), 24.0)
+        self.assertIs(config.get_bool("pricing", "offline"), True)
+        self.assertEqual(config.get_list("pricing", "clouds"), ["aws", "gcp"])
+        self.assertEqual(config.get_int("pricing", "aws_concurrency", 4), 4)
+        self.assertIsNone(config.get("cloud", "region", None))
+        with self.assertRaises(NoSectionError):
+            config.get("cloud", "region")
+        with self.assertRaises(NoOptionError):
+            config.get_int("pricing", "gcp_concurrency")
+        with self.assertRaises(ValueError):
+            config.get_bool("test", "test_name")
+
+    def test_snapshot_is_read_only(self):
+        config = util.get_config()
+        with self.assertRaises(TypeError):
+            config._sections["test"]["test_name"] = "fio_run"
+        self.assertIs(util.get_config(), config)
+
+    def test_reload_after_edit(self):
+        config = util.get_config()
+        with open(self.path, "a") as configfile:
+            configfile.write("\n[cloud]\nregion = us-east-1\n")
+        # Make sure the edit is seen whatever the mtime resolution
+        os.utime(self.path, (config.mtime + 10, config.mtime + 10))
+
+        self.assertIs(util.get_config(), config)
+        reloaded = util.get_config(reload=True)
+        self.assertIsNot(reloaded, config)
+        self.assertEqual(util.read_config("cloud", "region"), "us-east-1")
+        self.assertIs(util.get_config(reload=True), reloaded)
+
+
+class TestWriteConfig(ConfigTestCase):
+
+    def test_write_config(self):
+        util.get_config()
+        util.write_config("spreadsheet", "spreadsheet_id", "abc")
+        self.assertEqual(util.read_config("spreadsheet", "spreadsheet_id"), "abc")
+        on_disk = ConfigSnapshot.load(self.path)
+        self.assertEqual(on_disk.get("spreadsheet", "spreadsheet_id"), "abc")
+        self.assertEqual(on_disk.get("test", "test_name"), "streams")
+        self.assertEqual(os.listdir(self.tmp.name), ["config.ini"])
+
+    def test_failed_write_leaves_complete_file(self):
+        with open(self.path) as configfile:
+            before = configfile.read()
+        with patch("os.replace", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                util.write_config("spreadsheet", "spreadsheet_id", "abc")
+        with open(self.path) as configfile:
+            self.assertEqual(configfile.read(), before)
+        self.assertEqual(os.listdir(self.tmp.name), ["config.ini"])
+        self.assertEqual(util.get_config().get("spreadsheet", "spreadsheet_id"), "")
+
+
+class TestThresholds(ConfigTestCase):
+
+    def setUp(self):
+        super().setUp()
+        util._thresholds = (None, None)
+        with open(os.path.join(self.tmp.name, util.THRESHOLD_FILE), "w") as threshold_file:
+            threshold_file.write("[percent_threshold]\nstreams = 3\ncoremark =\n")
+
+    def test_threshold_next_to_config(self):
+        self.assertEqual(util.get_threshold("streams"), "3")
+        self.assertEqual(util.get_threshold("coremark"), util.DEFAULT_THRESHOLD)
+        self.assertEqual(util.get_threshold("uperf"), util.DEFAULT_THRESHOLD)
+        self.assertEqual(util.get_threshold("uperf", "10"), "10")
+
+    def test_snapshot_taken_once(self):
+        with patch.object(ConfigSnapshot, "load", wraps=ConfigSnapshot.load) as load:
+            thresholds = util.get_thresholds()
+            for test_name in ("streams", "coremark", "uperf"):
+                util.get_threshold(test_name)
+        self.assertEqual(load.call_count, 1)
+        self.assertIs(util.get_thresholds(), thresholds)
+
+        # Edits are not picked up until config_location changes
+        with open(os.path.join(self.tmp.name, util.THRESHOLD_FILE), "w") as threshold_file:
+            threshold_file.write("[percent_threshold]\nstreams = 7\n")
+        self.assertEqual(util.get_threshold("streams"), "3")
+        util.config_location = os.path.join(self.tmp.name, ".", "config.ini")
+        self.assertEqual(util.get_threshold("streams"), "7")
+
+
+class TestParseInstance(unittest.TestCase):
+
+    FIELDS = ("family", "version", "feature", "size", "bool_xlarge", "machine_type")
+
+    def test_aws(self):
+        self.assertEqual(parse_instance("m6i.24xlarge", "aws").key(*self.FIELDS), ("m", "6", "i", "24", "x", "large"))
+        self.assertEqual(parse_instance("m5.xlarge", "aws").key(*self.FIELDS), ("m", "5", None, None, "x", "large"))
+        self.assertEqual(parse_instance("c6gn.2xlarge", "aws").feature, "gn")
+
+    def test_azure(self):
+        instance = parse_instance("Standard_E64ds_v4", "azure")
+        self.assertEqual(instance.key("family", "size", "feature", "version"), ("E", "64", "ds", "v4"))
+        self.assertIsNone(instance.machine_type)
+
+    def test_gcp(self):
+        self.assertEqual(parse_instance("n2-standard-16", "gcp").key("family", "version", "sub_family", "feature", "size"),
+                         ("n", "2", None, "standard", "16"))
+        self.assertEqual(parse_instance("c2d-highcpu-4", "gcp").key("family", "version", "sub_family", "size"),
+                         ("c", "2", "d", "4"))
+
+    def test_local_and_unmatched(self):
+        instance = parse_instance("local", "aws")
+        self.assertEqual((instance.cloud, instance.family, instance.size), ("local", "local", None))
+        instance = parse_instance("bogus", "gcp")
+        self.assertFalse(instance.matched)
+        self.assertIsNone(instance.size)
+
+    def test_parsed_once(self):
+        self.assertIs(parse_instance("Standard_D8s_v5", "azure"), parse_instance("Standard_D8s_v5", "azure"))
+        self.assertNotEqual(parse_instance("n2-standard-8", "gcp"), parse_instance("n2-standard-8", "aws"))
+
+
+class TestComparisonMerge(unittest.TestCase):
+
+    def test_merge_lists_alternately(self):
+        results = merge_lists_alternately([], ["m5.xlarge", "10", "fail", "0", "4"],
+                                          ["m5.xlarge", "11", "3", "2", "0.0"])
+        self.assertEqual(results, [["m5.xlarge", "10", "11", 10.0, "fail", "3", "Failed",
+                                    "0", "2", "Failed", "4", "0.0", "%Diff"]])
+        self.assertEqual(merge_lists_alternately([], ["a", "1"], ["b", "1"]), [])
+
+    def test_combine_two_array_alternating(self):
+        value = [["System", "read-9.5", "write-9.5"], ["m5", "100", "50"]]
+        ele = [["System", "write-9.6", "read-9.6"], ["m5", "40", "125"]]
+        results = combine_two_array_alternating([], value, ele, "fio")
+        self.assertEqual(results, [
+            ["System", "read-9.5", "read-9.6", "%Diff", "write-9.5", "write-9.6", "%Diff"],
+            ["m5", "100", "125", 25.0, "50", "40", -20.0],
+        ])
+
+
+if __name__ == "__main__":
+    unittest.main()